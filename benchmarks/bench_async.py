@@ -0,0 +1,77 @@
+"""Latency benchmark for AsyncAuditLogger under concurrent coroutines.
+
+Usage: python benchmarks/bench_async.py --events 5000 --concurrency 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from auditlog.aio import AsyncAuditLogger
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def _run(db_path: str, events: int, concurrency: int, profile: str | None) -> dict:
+    latencies: list[float] = []
+    per_worker = events // concurrency
+
+    async with AsyncAuditLogger(db_path, profile=profile) as logger:
+
+        async def worker(worker_id: int) -> None:
+            for seq in range(per_worker):
+                started = time.perf_counter()
+                await logger.append(
+                    actor=f"svc-{worker_id}",
+                    action="request",
+                    target="api",
+                    result="ok",
+                    context={"seq": seq},
+                )
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(worker_id) for worker_id in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "benchmark": "async_append",
+        "events": len(latencies),
+        "concurrency": concurrency,
+        "profile": profile,
+        "seconds": round(elapsed, 4),
+        "events_per_sec": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 3),
+            "p50": round(_percentile(latencies, 0.50) * 1000, 3),
+            "p95": round(_percentile(latencies, 0.95) * 1000, 3),
+            "p99": round(_percentile(latencies, 0.99) * 1000, 3),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--profile", default=None, help="Connection profile (durable, balanced, fast).")
+    parser.add_argument("--db", default=None, help="DB path; defaults to a temporary file.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or os.path.join(tmp, "bench.db")
+        result = asyncio.run(_run(db_path, args.events, args.concurrency, args.profile))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Size and throughput comparison of the plain and compact (dictionary-encoded) layouts.
+
+Usage: python benchmarks/bench_compact.py --events 100000 --actors 2000 --actions 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from auditlog.service import AuditLogger
+
+
+def _events(count: int, actors: int, actions: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "ts": f"2025-01-01T00:{index // 3600 % 60:02d}:{index % 60:02d}Z",
+            "actor": f"user-{rng.randrange(actors):05d}@example.com",
+            "action": f"service.resource.action-{rng.randrange(actions):03d}",
+            "target": f"arn:resource:tenant-{rng.randrange(50):02d}",
+            "result": "success" if rng.random() < 0.95 else "denied",
+            "context": {"seq": index},
+        }
+        for index in range(count)
+    ]
+
+
+def _run_layout(db_path: str, events: list[dict], *, compact: bool, batch: int, queries: int) -> dict:
+    logger = AuditLogger(db_path, compact=compact, profile="fast")
+    started = time.perf_counter()
+    for offset in range(0, len(events), batch):
+        logger.append_many(events[offset : offset + batch])
+    append_seconds = time.perf_counter() - started
+    logger.conn.execute("VACUUM")
+
+    actors = sorted({event["actor"] for event in events})
+    latencies: list[float] = []
+    for index in range(queries):
+        started = time.perf_counter()
+        logger.query(actor=actors[index % len(actors)], limit=100)
+        latencies.append(time.perf_counter() - started)
+
+    logger.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    logger.conn.close()
+    return {
+        "db_bytes": os.path.getsize(db_path),
+        "appends_per_sec": round(len(events) / append_seconds, 1),
+        "query_actor_ms": {
+            "p50": round(statistics.median(latencies) * 1000, 3),
+            "mean": round(statistics.fmean(latencies) * 1000, 3),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--actors", type=int, default=2_000)
+    parser.add_argument("--actions", type=int, default=40)
+    parser.add_argument("--batch", type=int, default=5_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    events = _events(args.events, args.actors, args.actions, args.seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for layout in ("plain", "compact"):
+            results[layout] = _run_layout(
+                os.path.join(tmp, f"{layout}.db"),
+                events,
+                compact=layout == "compact",
+                batch=args.batch,
+                queries=args.queries,
+            )
+    results["size_ratio"] = round(results["compact"]["db_bytes"] / results["plain"]["db_bytes"], 3)
+    print(json.dumps({"benchmark": "compact_layout", "events": args.events, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
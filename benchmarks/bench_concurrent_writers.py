@@ -0,0 +1,40 @@
+"""Stress test: several processes append to one database at once, then the chain is verified.
+
+Usage: python benchmarks/bench_concurrent_writers.py --processes 8 --events 2000 --batch-size 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+
+from auditlog.bench import run_concurrent_writers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--events", type=int, default=2_000, help="Events appended by each process.")
+    parser.add_argument("--batch-size", type=int, default=1, help="1 for single appends, else append_many size.")
+    parser.add_argument("--profile", default="balanced", help="Connection profile (durable, balanced, fast).")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.processes:
+            results.append(
+                run_concurrent_writers(
+                    os.path.join(tmp, f"writers-{count}.db"),
+                    processes=count,
+                    events=args.events,
+                    batch_size=args.batch_size,
+                    profile=args.profile,
+                )
+            )
+    print(json.dumps({"benchmark": "concurrent_writers", "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Append, query and verify throughput on a synthetic event stream.
+
+Usage: python benchmarks/bench_suite.py --events 100000 --output results.json
+       python benchmarks/bench_suite.py --events 100000 --baseline results.json
+
+With --baseline, each metric is also reported as a ratio to the stored run
+(above 1.0 is better for throughput, below 1.0 is better for latency).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Any
+
+from auditlog.bench import run_benchmarks
+
+
+def _metrics(report: dict[str, Any]) -> dict[str, float]:
+    metrics = {
+        "append.single_per_sec": report["append"]["single_per_sec"],
+        "append.batched_per_sec": report["append"]["batched_per_sec"],
+        "verify.rows_per_sec": report["verify"]["rows_per_sec"],
+    }
+    for name, latency in report["query_latency_ms"].items():
+        metrics[f"query.{name}.p50_ms"] = latency["p50"]
+        metrics[f"query.{name}.p99_ms"] = latency["p99"]
+    return metrics
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any]) -> dict[str, float]:
+    """Return current/baseline ratios for every metric present in both reports."""
+    before, after = _metrics(baseline), _metrics(current)
+    return {name: round(after[name] / before[name], 3) for name in after if before.get(name)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--single-events", type=int, default=2_000)
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--context-bytes", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--profile", default=None, help="Connection profile (durable, balanced, fast).")
+    parser.add_argument("--compact", action="store_true", help="Use the dictionary-encoded layout.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file.")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON report to compare against.")
+    args = parser.parse_args()
+
+    report = run_benchmarks(
+        events=args.events,
+        single_events=args.single_events,
+        batch_size=args.batch_size,
+        context_bytes=args.context_bytes,
+        queries=args.queries,
+        workers=args.workers,
+        profile=args.profile,
+        compact=args.compact,
+        seed=args.seed,
+    )
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            report["compared_to_baseline"] = compare(json.load(handle), report)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
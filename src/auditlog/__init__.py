@@ -1,5 +1,49 @@
 """auditlog package."""
 
-from auditlog.service import AuditLogger
+from __future__ import annotations
 
-__all__ = ["AuditLogger"]
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from auditlog.aio import AsyncAuditLogger
+    from auditlog.events import AuditEvent
+    from auditlog.metrics import Metrics
+    from auditlog.service import AuditLogger
+    from auditlog.shards import ShardedAuditLogger
+    from auditlog.verify import VerifyReport
+    from auditlog.writer import AsyncAuditWriter
+
+__all__ = [
+    "AsyncAuditLogger",
+    "AsyncAuditWriter",
+    "AuditEvent",
+    "AuditLogger",
+    "Metrics",
+    "ShardedAuditLogger",
+    "VerifyReport",
+]
+
+# Public names are resolved on first access so that importing a submodule (for
+# example ``auditlog.cli``) does not pay for asyncio and multiprocessing up front.
+_EXPORTS = {
+    "AsyncAuditLogger": "auditlog.aio",
+    "AsyncAuditWriter": "auditlog.writer",
+    "AuditEvent": "auditlog.events",
+    "AuditLogger": "auditlog.service",
+    "Metrics": "auditlog.metrics",
+    "ShardedAuditLogger": "auditlog.shards",
+    "VerifyReport": "auditlog.verify",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'auditlog' has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -0,0 +1,137 @@
+"""asyncio front end for the audit logging pipeline."""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Iterable, Mapping, TypeVar
+
+from auditlog.events import check_appendable
+from auditlog.service import AuditLogger, _utc_now
+from auditlog.verify import VerifyReport
+
+T = TypeVar("T")
+
+
+class AsyncAuditLogger:
+    """Run ``AuditLogger`` on a dedicated executor thread for asyncio services.
+
+    Appends from concurrent coroutines are queued and coalesced: while one batch is
+    being committed, new events accumulate and go out together in the next
+    ``append_many`` call, so many coroutines share a single commit. Events are chained
+    in the order their ``append`` calls were made.
+    """
+
+    def __init__(self, db_path: str, *, max_batch: int = 500, **logger_kwargs: Any) -> None:
+        self.max_batch = max_batch
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="auditlog-aio")
+        # The single executor thread opens, and therefore owns, the SQLite connection.
+        self._logger = self._executor.submit(AuditLogger, db_path, **logger_kwargs)
+        self._pending: list[tuple[dict, asyncio.Future[dict]]] = []
+        self._drain_task: asyncio.Task[None] | None = None
+
+    async def _run(self, func: Callable[[AuditLogger], T]) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(self._logger.result()))
+
+    async def append(
+        self,
+        *,
+        actor: str,
+        action: str,
+        target: str,
+        result: str,
+        context: dict,
+        ts: str | None = None,
+        idempotency_key: str | None = None,
+    ) -> dict:
+        event = {
+            "ts": ts or _utc_now(),
+            "actor": actor,
+            "action": action,
+            "target": target,
+            "result": result,
+            "context": context,
+        }
+        if idempotency_key is not None:
+            event["idempotency_key"] = idempotency_key
+        # Reject a bad event before it joins, and could fail, a shared batch.
+        check_appendable(event)
+        return await self._enqueue(event)
+
+    async def append_many(self, events: Iterable[Mapping[str, Any]]) -> list[dict]:
+        """Append events contiguously; nothing is queued if any of them is invalid."""
+        batch = [{**event, "ts": event.get("ts") or _utc_now()} for event in events]
+        for event in batch:
+            check_appendable(event)
+        return list(await asyncio.gather(*(self._enqueue(event) for event in batch)))
+
+    def _enqueue(self, event: dict) -> asyncio.Future[dict]:
+        future: asyncio.Future[dict] = asyncio.get_running_loop().create_future()
+        self._pending.append((event, future))
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.get_running_loop().create_task(self._drain())
+        return future
+
+    async def _drain(self) -> None:
+        while self._pending:
+            batch = self._pending[: self.max_batch]
+            del self._pending[: self.max_batch]
+            events = [event for event, _ in batch]
+            try:
+                records = await self._run(lambda logger: logger.append_many(events))
+            except Exception as exc:
+                if len(batch) == 1:
+                    if not batch[0][1].done():
+                        batch[0][1].set_exception(exc)
+                    continue
+                # The batch was rolled back; retry one by one so only the bad event fails.
+                for event, future in batch:
+                    try:
+                        record = await self._run(lambda logger: logger.append_many([event])[0])
+                    except Exception as event_exc:
+                        if not future.done():
+                            future.set_exception(event_exc)
+                    else:
+                        if not future.done():
+                            future.set_result(record)
+                continue
+            for (_, future), record in zip(batch, records):
+                if not future.done():
+                    future.set_result(record)
+
+    async def query(self, **filters: Any) -> list[Any]:
+        return await self._run(lambda logger: logger.query(**filters))
+
+    async def iter_events(self, *, chunk_size: int = 1000, **filters: Any) -> AsyncIterator[Any]:
+        """Stream events; each chunk is fetched on the executor thread."""
+        events = await self._run(lambda logger: logger.iter_events(chunk_size=chunk_size, **filters))
+        while True:
+            chunk = await self._run(lambda _: list(islice(events, chunk_size)))
+            for event in chunk:
+                yield event
+            if len(chunk) < chunk_size:
+                return
+
+    async def verify(self, **options: Any) -> VerifyReport:
+        return await self._run(lambda logger: logger.verify(**options))
+
+    async def verify_chain(self, **options: Any) -> list[str]:
+        return await self._run(lambda logger: logger.verify_chain(**options))
+
+    async def flush(self) -> None:
+        """Wait until every append issued so far is committed."""
+        while self._drain_task is not None and not self._drain_task.done():
+            await asyncio.shield(self._drain_task)
+
+    async def close(self) -> None:
+        await self.flush()
+        await self._run(lambda logger: logger.conn.close())
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> AsyncAuditLogger:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
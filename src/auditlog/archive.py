@@ -0,0 +1,155 @@
+"""Compressed, read-only segment files for archived audit events."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import operator
+import os
+import sqlite3
+import stat
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from auditlog.storage import CREATE_TABLE_SQL, EVENT_COLUMNS, Condition, aggregate_events
+
+SEGMENT_SUFFIX = ".ndjson.gz"
+
+
+def segment_dir(db_path: str) -> str:
+    """Return the default segment directory that sits next to a DB file."""
+    return db_path + ".segments"
+
+
+def segment_filename(first_id: int, last_id: int) -> str:
+    return f"segment-{first_id:012d}-{last_id:012d}{SEGMENT_SUFFIX}"
+
+
+def file_sha256(path: str) -> str:
+    """Return the SHA-256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_segment(path: str, rows: Iterable[tuple]) -> dict[str, Any]:
+    """Write rows as gzip-compressed NDJSON, fsync it and make it read-only.
+
+    The file is written under a temporary name and renamed into place, so a crash
+    never leaves a partial segment behind. Returns the segment summary, including
+    the smallest and largest ``ts`` so readers can skip it for time-bounded queries.
+    """
+    summary: dict[str, Any] = {"row_count": 0}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as handle:
+            for row in rows:
+                if summary["row_count"] == 0:
+                    summary.update(first_id=row[0], first_prev_hash=row[7], first_ts=row[1])
+                    summary.update(min_ts=row[1], max_ts=row[1])
+                summary.update(last_id=row[0], last_event_hash=row[8], last_ts=row[1])
+                summary.update(min_ts=min(summary["min_ts"], row[1]), max_ts=max(summary["max_ts"], row[1]))
+                summary["row_count"] += 1
+                line = json.dumps(dict(zip(EVENT_COLUMNS, row)), ensure_ascii=False, separators=(",", ":"))
+                handle.write(line.encode("utf-8") + b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+
+    os.replace(tmp_path, path)
+    os.chmod(path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+    summary["file_sha256"] = file_sha256(path)
+    return summary
+
+
+def iter_segment(path: str) -> Iterator[tuple]:
+    """Yield the rows of a segment file as tuples in ``EVENT_COLUMNS`` order."""
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        for line in handle:
+            record = json.loads(line)
+            yield tuple(record[column] for column in EVENT_COLUMNS)
+
+
+def row_matches(
+    row: tuple,
+    *,
+    actor: str | None = None,
+    action: str | None = None,
+    after_id: int | None = None,
+    before_id: int | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    where: Sequence[Condition] = (),
+) -> bool:
+    """Apply ``build_query`` filter semantics to an archived row."""
+    row_id, ts, row_actor, row_action = row[0], row[1], row[2], row[3]
+    return (
+        (actor is None or row_actor == actor)
+        and (action is None or row_action == action)
+        and (after_id is None or row_id > after_id)
+        and (before_id is None or row_id < before_id)
+        and (since is None or ts >= since)
+        and (until is None or ts < until)
+        and (not where or context_matches(row[6], where))
+    )
+
+
+_COMPARISONS: dict[str, Callable[[Any, Any], bool]] = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+def _sql_value(value: Any) -> Any:
+    # What json_extract hands SQLite: booleans as integers, containers as JSON text.
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return value
+
+
+def context_matches(context_json: str, where: Sequence[Condition]) -> bool:
+    """Evaluate ``parse_where`` conditions on one row's context the way SQLite would."""
+    context = json.loads(context_json)
+    for path, op, expected in where:
+        current: Any = context
+        for key in path[2:].split("."):
+            current = current.get(key) if isinstance(current, dict) else None
+        left, right = _sql_value(current), _sql_value(expected)
+        if right is None:
+            if (left is None) != (op == "="):
+                return False
+            continue
+        if left is None:
+            return False
+        if isinstance(left, str) != isinstance(right, str):
+            # SQLite orders every number before any text, and the two are never equal.
+            left, right = (1, 0) if isinstance(left, str) else (0, 1)
+        if not _COMPARISONS[op](left, right):
+            return False
+    return True
+
+
+def aggregate_segment(path: str, **spec: Any) -> list[tuple]:
+    """Aggregate one segment file with the same SQL used for live rows.
+
+    The rows are loaded into a scratch in-memory database, so grouping, buckets and
+    context filters behave exactly as they do in ``aggregate_events``.
+    """
+    scratch = sqlite3.connect(":memory:")
+    try:
+        scratch.execute(CREATE_TABLE_SQL)
+        scratch.executemany(
+            "INSERT INTO audit_events (" + ", ".join(EVENT_COLUMNS) + ") VALUES ("
+            + ", ".join("?" * len(EVENT_COLUMNS)) + ")",
+            iter_segment(path),
+        )
+        return aggregate_events(scratch, **spec)
+    finally:
+        scratch.close()
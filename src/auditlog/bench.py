@@ -0,0 +1,228 @@
+"""Synthetic workloads for measuring append, query and verify throughput."""
+
+from __future__ import annotations
+
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+import tracemalloc
+from itertools import islice
+from typing import Any, Callable, Iterator
+
+from auditlog.service import AuditLogger
+
+SCHEMA_VERSION = 1
+
+# Filters timed by the query benchmark; values are filled in from the generated data.
+QUERY_FILTERS = ("none", "actor", "action", "actor+action", "since", "after_id")
+
+
+def synthetic_events(
+    count: int,
+    *,
+    actors: int = 1_000,
+    actions: int = 30,
+    context_bytes: int = 64,
+    seed: int = 0,
+) -> Iterator[dict[str, Any]]:
+    """Yield ``count`` reproducible events with a padded context of about ``context_bytes``."""
+    rng = random.Random(seed)
+    padding = "x" * max(0, context_bytes - 32)
+    for index in range(count):
+        day, second = divmod(index, 86_400)
+        yield {
+            "ts": f"2025-01-{1 + day % 28:02d}T{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}Z",
+            "actor": f"user-{rng.randrange(actors)}",
+            "action": f"action-{rng.randrange(actions)}",
+            "target": f"resource-{rng.randrange(10_000)}",
+            "result": "ok" if rng.random() < 0.9 else "denied",
+            "context": {"seq": index, "ip": f"10.0.{rng.randrange(256)}.{rng.randrange(256)}", "pad": padding},
+        }
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+
+    def pick(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 3)
+
+    return {"p50": pick(0.50), "p99": pick(0.99), "mean": round(statistics.fmean(ordered) * 1000, 3)}
+
+
+def _timed(func: Callable[[], Any]) -> tuple[float, Any]:
+    started = time.perf_counter()
+    value = func()
+    return time.perf_counter() - started, value
+
+
+def _row_footprint(logger: AuditLogger, *, as_dict: bool, limit: int) -> dict[str, float]:
+    """Time materializing ``limit`` rows (best of three), then measure their traced size per row."""
+
+    def load() -> list:
+        return list(islice(logger.iter_events(chunk_size=5_000, as_dict=as_dict), limit))
+
+    seconds = min(_timed(load)[0] for _ in range(3))
+    tracemalloc.start()
+    try:
+        rows = load()
+        held, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"rows_per_sec": round(len(rows) / seconds, 1), "bytes_per_row": round(held / max(len(rows), 1), 1)}
+
+
+def run_benchmarks(
+    *,
+    events: int = 100_000,
+    single_events: int = 2_000,
+    batch_size: int = 5_000,
+    context_bytes: int = 64,
+    queries: int = 200,
+    workers: int = 1,
+    profile: str | None = None,
+    compact: bool = False,
+    seed: int = 0,
+    directory: str | None = None,
+) -> dict[str, Any]:
+    """Run the append, query and verify benchmarks on fresh databases and return a report.
+
+    Single appends go to their own database so their commits do not inflate the
+    batched run. Everything is generated from ``seed``, so runs are comparable
+    across versions.
+    """
+    options = {"profile": profile, "compact": compact}
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        single = AuditLogger(os.path.join(tmp, "single.db"), **options)
+        single_stream = list(synthetic_events(single_events, context_bytes=context_bytes, seed=seed))
+        single_seconds, _ = _timed(lambda: [single.append(**event) for event in single_stream])
+        single.conn.close()
+
+        logger = AuditLogger(os.path.join(tmp, "bench.db"), **options)
+        generated = list(synthetic_events(events, context_bytes=context_bytes, seed=seed))
+
+        def append_batches() -> None:
+            for offset in range(0, len(generated), batch_size):
+                logger.append_many(generated[offset : offset + batch_size])
+
+        batch_seconds, _ = _timed(append_batches)
+
+        rng = random.Random(seed)
+        samples = [generated[rng.randrange(len(generated))] for _ in range(queries)]
+        filters: dict[str, Callable[[dict], dict[str, Any]]] = {
+            "none": lambda event: {},
+            "actor": lambda event: {"actor": event["actor"]},
+            "action": lambda event: {"action": event["action"]},
+            "actor+action": lambda event: {"actor": event["actor"], "action": event["action"]},
+            "since": lambda event: {"since": event["ts"]},
+            "after_id": lambda event: {"after_id": event["context"]["seq"]},
+        }
+        query_latency: dict[str, dict[str, float]] = {}
+        for name in QUERY_FILTERS:
+            latencies = [_timed(lambda: logger.query(limit=100, **filters[name](event)))[0] for event in samples]
+            query_latency[name] = _percentiles(latencies)
+
+        footprint_rows = min(events, 50_000)
+        footprint = {
+            "rows": footprint_rows,
+            "record": _row_footprint(logger, as_dict=False, limit=footprint_rows),
+            "dict": _row_footprint(logger, as_dict=True, limit=footprint_rows),
+        }
+
+        verify_seconds, report = _timed(lambda: logger.verify(workers=workers))
+        db_bytes = os.path.getsize(logger.db_path)
+        logger.conn.close()
+
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "parameters": {
+            "events": events,
+            "single_events": single_events,
+            "batch_size": batch_size,
+            "context_bytes": context_bytes,
+            "queries": queries,
+            "workers": workers,
+            "profile": profile,
+            "compact": compact,
+            "seed": seed,
+        },
+        "append": {
+            "single_per_sec": round(single_events / single_seconds, 1),
+            "batched_per_sec": round(events / batch_seconds, 1),
+        },
+        "query_latency_ms": query_latency,
+        "row_footprint": footprint,
+        "verify": {
+            "ok": report.ok,
+            "rows": report.rows_scanned,
+            "rows_per_sec": round(report.rows_scanned / verify_seconds, 1),
+        },
+        "db_bytes": db_bytes,
+    }
+
+
+def _writer_process(db_path: str, start: Any, events: int, batch_size: int, seed: int, profile: str | None) -> None:
+    logger = AuditLogger(db_path, profile=profile)
+    stream = list(synthetic_events(events, seed=seed))
+    start.wait()
+    if batch_size == 1:
+        for event in stream:
+            logger.append(**event)
+    else:
+        for offset in range(0, len(stream), batch_size):
+            logger.append_many(stream[offset : offset + batch_size])
+    logger.conn.close()
+
+
+def run_concurrent_writers(
+    db_path: str,
+    *,
+    processes: int = 4,
+    events: int = 1_000,
+    batch_size: int = 1,
+    profile: str | None = None,
+) -> dict[str, Any]:
+    """Append from ``processes`` separate writer processes at once, then verify the chain.
+
+    Every process appends ``events`` events (one at a time, or ``batch_size`` per
+    ``append_many``). Returns the combined throughput and the verification result.
+    """
+    import multiprocessing
+
+    AuditLogger(db_path, profile=profile).conn.close()
+    context = multiprocessing.get_context()
+    start = context.Event()
+    workers = [
+        context.Process(target=_writer_process, args=(db_path, start, events, batch_size, seed, profile))
+        for seed in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    started = time.perf_counter()
+    start.set()
+    for worker in workers:
+        worker.join()
+    seconds = time.perf_counter() - started
+
+    logger = AuditLogger(db_path, profile=profile)
+    report = logger.verify()
+    logger.conn.close()
+    return {
+        "processes": processes,
+        "events": processes * events,
+        "batch_size": batch_size,
+        "failed_processes": sum(worker.exitcode != 0 for worker in workers),
+        "events_per_sec": round(processes * events / seconds, 1),
+        "verify_ok": report.ok,
+        "rows": report.rows_scanned,
+        "issues": report.issues[:5],
+    }
+
@@ -2,28 +2,107 @@
 
 from __future__ import annotations
 
+import atexit
 import json
+import os
+import sys
+from typing import TYPE_CHECKING, Any, Iterator, TextIO
 
 import typer
 from rich.console import Console
-from rich.table import Table
 
-from auditlog.service import AuditLogger
+from auditlog.events import normalize_event
+from auditlog.merkle import check_proof
+from auditlog.metrics import Metrics, load_snapshot, save_snapshot, write_prometheus
+
+if TYPE_CHECKING:
+    from auditlog.client import AuditClient
+    from auditlog.service import AuditLogger
+    from auditlog.shards import ShardedAuditLogger
+
+# The service, storage (and with it sqlite3), verification, table rendering and
+# sharding are imported where they are used, so short-lived invocations start
+# faster and ``--socket`` clients never load SQLite at all.
 
 app = typer.Typer(help="Append, query, and verify tamper-evident audit logs stored in SQLite.")
 console = Console()
 
+_connection: dict[str, Any] = {"profile": None, "pragmas": None, "metrics": None}
 
-@app.command()
-def append(
-    db: str = typer.Option(..., "--db", help="Path to SQLite DB file."),
-    actor: str = typer.Option(..., "--actor", help="Actor identifier (user/service)."),
-    action: str = typer.Option(..., "--action", help="Action name (e.g. login, export)."),
-    target: str = typer.Option(..., "--target", help="Target resource identifier."),
-    result: str = typer.Option(..., "--result", help="Result status (e.g. ok, denied)."),
-    context: str = typer.Option(..., "--context", help="JSON object string for context fields."),
+
+@app.callback()
+def main(
+    profile: str | None = typer.Option(
+        None, "--profile", help="Connection profile: durable, balanced or fast (WAL, sync, cache, mmap)."
+    ),
+    pragmas: str | None = typer.Option(
+        None, "--pragmas", help="Explicit pragma overrides, e.g. 'synchronous=NORMAL,cache_size=-64000'."
+    ),
+    metrics_file: str | None = typer.Option(
+        None, "--metrics-file", help="Accumulate stage timings in this JSON file (or $AUDITLOG_METRICS_FILE)."
+    ),
 ) -> None:
-    """Append one event to the audit log."""
+    """Configure how every command opens the SQLite database."""
+    overrides: dict[str, str] = {}
+    for item in (pragmas or "").split(","):
+        if not item.strip():
+            continue
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise typer.BadParameter(f"--pragmas entries must look like name=value, got {item!r}.")
+        overrides[name.strip()] = value.strip()
+
+    if profile is not None or overrides:
+        from auditlog.storage import resolve_pragmas
+
+        try:
+            resolve_pragmas(profile, overrides)
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc)) from exc
+    _connection.update(profile=profile, pragmas=overrides)
+
+    metrics_file = metrics_file or os.environ.get("AUDITLOG_METRICS_FILE")
+    if metrics_file:
+        metrics = Metrics()
+        _connection["metrics"] = metrics
+        atexit.register(save_snapshot, metrics, metrics_file)
+
+
+def _open_logger(db: str, **kwargs: Any) -> AuditLogger:
+    from auditlog.service import AuditLogger
+
+    return AuditLogger(
+        db, profile=_connection["profile"], pragmas=_connection["pragmas"], metrics=_connection["metrics"], **kwargs
+    )
+
+
+def _open_target(db: str | None, socket_path: str | None) -> AuditLogger | AuditClient:
+    """Open the DB directly, or connect to a running daemon when ``--socket`` is given."""
+    if (db is None) == (socket_path is None):
+        raise typer.BadParameter("pass exactly one of --db or --socket.")
+    if socket_path is None:
+        return _open_logger(db)
+
+    from auditlog.client import AuditClient
+
+    try:
+        return AuditClient(socket_path)
+    except OSError as exc:
+        raise typer.BadParameter(f"cannot connect to {socket_path}: {exc}") from exc
+
+
+def _open_shards(root: str, partition: str | None = None) -> ShardedAuditLogger:
+    from auditlog.shards import ShardedAuditLogger
+
+    try:
+        return ShardedAuditLogger(
+            root, partition=partition, profile=_connection["profile"], pragmas=_connection["pragmas"]
+        )
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+
+def _parse_context(context: str) -> dict[str, Any]:
     try:
         context_obj = json.loads(context)
     except json.JSONDecodeError as exc:
@@ -31,28 +110,180 @@ def append(
 
     if not isinstance(context_obj, dict):
         raise typer.BadParameter("--context must decode to a JSON object.")
+    return context_obj
+
+
+def _parse_event_line(line: str, lineno: int) -> dict[str, Any]:
+    """Decode and validate one NDJSON event line."""
+    try:
+        event = json.loads(line)
+    except json.JSONDecodeError as exc:
+        raise typer.BadParameter(f"line {lineno}: invalid JSON: {exc}") from exc
+
+    try:
+        return normalize_event(event)
+    except ValueError as exc:
+        raise typer.BadParameter(f"line {lineno}: {exc}") from exc
+
+
+def _check_where(where: list[str] | None) -> list[str]:
+    from auditlog.storage import parse_where
+
+    for expression in where or ():
+        try:
+            parse_where(expression)
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc)) from exc
+    return where or []
+
+
+def _iter_ndjson_events(stream: TextIO) -> Iterator[dict[str, Any]]:
+    for lineno, line in enumerate(stream, start=1):
+        if line.strip():
+            yield _parse_event_line(line, lineno)
+
 
-    logger = AuditLogger(db)
+@app.command()
+def append(
+    db: str | None = typer.Option(None, "--db", help="Path to SQLite DB file."),
+    actor: str = typer.Option(..., "--actor", help="Actor identifier (user/service)."),
+    action: str = typer.Option(..., "--action", help="Action name (e.g. login, export)."),
+    target: str = typer.Option(..., "--target", help="Target resource identifier."),
+    result: str = typer.Option(..., "--result", help="Result status (e.g. ok, denied)."),
+    context: str = typer.Option(..., "--context", help="JSON object string for context fields."),
+    socket_path: str | None = typer.Option(None, "--socket", help="Send to a running 'auditlog serve' instead."),
+    idempotency_key: str | None = typer.Option(
+        None, "--idempotency-key", help="Retry-safe key; a repeated key returns the original event."
+    ),
+) -> None:
+    """Append one event to the audit log."""
+    context_obj = _parse_context(context)
+    logger = _open_target(db, socket_path)
     record = logger.append(
         actor=actor,
         action=action,
         target=target,
         result=result,
         context=context_obj,
+        idempotency_key=idempotency_key,
     )
+    if record.get("duplicate"):
+        console.print(f"Duplicate of event id={record['id']} hash={record['event_hash']}")
+        return
     console.print(f"Appended event id={record['id']} hash={record['event_hash']}")
 
 
+@app.command("append-batch")
+def append_batch(
+    db: str | None = typer.Option(None, "--db", help="Path to SQLite DB file."),
+    file: str = typer.Option("-", "--file", help="NDJSON file with one event per line ('-' for stdin)."),
+    batch_size: int = typer.Option(5000, "--batch-size", min=1, help="Events written per transaction."),
+    socket_path: str | None = typer.Option(None, "--socket", help="Send to a running 'auditlog serve' instead."),
+) -> None:
+    """Append NDJSON events, writing each batch in a single transaction."""
+    logger = _open_target(db, socket_path)
+    stream = sys.stdin if file == "-" else open(file, encoding="utf-8")
+    total = 0
+    first: dict | None = None
+    last: dict | None = None
+
+    try:
+        batch: list[dict[str, Any]] = []
+        for event in _iter_ndjson_events(stream):
+            batch.append(event)
+            if len(batch) >= batch_size:
+                records = logger.append_many(batch)
+                first, last = first or records[0], records[-1]
+                total += len(records)
+                batch = []
+        if batch:
+            records = logger.append_many(batch)
+            first, last = first or records[0], records[-1]
+            total += len(records)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    if first is None or last is None:
+        console.print("Appended 0 events")
+        return
+    console.print(f"Appended {total} events ids={first['id']}-{last['id']} hash={last['event_hash']}")
+
+
+@app.command("import")
+def import_events(
+    db: str = typer.Option(..., "--db", help="Path to SQLite DB file."),
+    file: str = typer.Option(..., "--file", help="NDJSON/JSON-lines or CSV file, optionally gzip-compressed."),
+    format: str | None = typer.Option(None, "--format", help="ndjson or csv (default: from the file name)."),
+    batch_size: int = typer.Option(10_000, "--batch-size", min=1, help="Events written per transaction."),
+    restart: bool = typer.Option(False, "--restart", help="Ignore the offset saved by an earlier run of this file."),
+    skip_verify: bool = typer.Option(False, "--skip-verify", help="Do not verify the chain afterwards."),
+) -> None:
+    """Bulk-append a file of events, resuming after the last committed batch of an earlier run."""
+    from auditlog.importer import ImportReport, import_file
+
+    progress_console = Console(stderr=True)
+
+    def show_progress(report: ImportReport) -> None:
+        done = "" if report.compressed else f" ({report.offset / max(report.size, 1):.0%})"
+        progress_console.print(
+            f"imported {report.events} events, line {report.lines}{done}, {report.events_per_sec:.0f} events/s"
+        )
+
+    logger = _open_logger(db, checkpoint_key=_checkpoint_key())
+    try:
+        report = import_file(
+            logger, file, format=format, batch_size=batch_size, resume=not restart, progress=show_progress
+        )
+    except (OSError, ValueError) as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+    if report.resumed_from:
+        console.print(f"Resumed after byte {report.resumed_from} committed by an earlier run")
+    if report.events:
+        ids = f" ids={report.first_id}-{report.last_id}" if report.first_id is not None else ""
+        skipped = f", {report.duplicates} duplicates skipped" if report.duplicates else ""
+        console.print(
+            f"Imported {report.events} events{ids}{skipped} "
+            f"in {report.seconds:.1f}s ({report.events_per_sec:.0f} events/s)"
+        )
+    else:
+        console.print("Imported 0 events")
+    if skip_verify:
+        return
+
+    verified = logger.verify(since_checkpoint=True)
+    if not verified.ok:
+        console.print("FAIL")
+        for issue in verified.issues:
+            console.print(f"- {issue}")
+        raise typer.Exit(1)
+    logger.record_checkpoint(verified)
+    console.print(f"OK: verified {verified.rows_scanned} rows")
+
+
 @app.command("query")
 def query_cmd(
     db: str = typer.Option(..., "--db", help="Path to SQLite DB file."),
     actor: str | None = typer.Option(None, "--actor", help="Filter by actor."),
     action: str | None = typer.Option(None, "--action", help="Filter by action."),
     limit: int = typer.Option(20, "--limit", min=1, help="Maximum rows to return."),
+    explain: bool = typer.Option(False, "--explain", help="Print the SQLite query plan instead of rows."),
+    where: list[str] | None = typer.Option(
+        None, "--where", help="Context filter such as 'context.ip=10.0.0.5' or 'context.rows>1000'; repeatable."
+    ),
 ) -> None:
     """Query audit events."""
-    logger = AuditLogger(db)
-    events = logger.query(actor=actor, action=action, limit=limit)
+    conditions = _check_where(where)
+    logger = _open_logger(db)
+    if explain:
+        for detail in logger.explain_query(actor=actor, action=action, limit=limit, where=conditions):
+            console.print(detail)
+        return
+
+    events = logger.query(actor=actor, action=action, limit=limit, where=conditions)
+
+    from rich.table import Table
 
     table = Table(title="Audit Events")
     table.add_column("id", justify="right")
@@ -82,13 +313,346 @@ def query_cmd(
 
 
 @app.command()
-def verify(
+def export(
     db: str = typer.Option(..., "--db", help="Path to SQLite DB file."),
+    format: str = typer.Option("ndjson", "--format", help="Output format: ndjson or csv."),
+    actor: str | None = typer.Option(None, "--actor", help="Filter by actor."),
+    action: str | None = typer.Option(None, "--action", help="Filter by action."),
+    after_id: int | None = typer.Option(None, "--after-id", help="Only rows with id greater than this."),
+    before_id: int | None = typer.Option(None, "--before-id", help="Only rows with id less than this."),
+    since: str | None = typer.Option(None, "--since", help="Only rows with ts >= this value."),
+    until: str | None = typer.Option(None, "--until", help="Only rows with ts < this value."),
+    where: list[str] | None = typer.Option(
+        None, "--where", help="Context filter such as 'context.ip=10.0.0.5' or 'context.rows>1000'; repeatable."
+    ),
 ) -> None:
-    """Verify hash-chain integrity; exits 1 when tampering is detected."""
-    logger = AuditLogger(db)
-    issues = logger.verify_chain()
+    """Stream matching events to stdout in id order as NDJSON or CSV."""
+    if format not in ("ndjson", "csv"):
+        raise typer.BadParameter("--format must be 'ndjson' or 'csv'.")
+
+    conditions = _check_where(where)
+    logger = _open_logger(db)
+    events = logger.iter_events(
+        actor=actor,
+        action=action,
+        after_id=after_id,
+        before_id=before_id,
+        since=since,
+        until=until,
+        where=conditions,
+        as_dict=False,
+    )
+
+    if format == "csv":
+        import csv
+
+        from auditlog.storage import EVENT_COLUMNS
 
+        writer = csv.writer(sys.stdout)
+        writer.writerow(EVENT_COLUMNS)
+        # AuditEvent records are tuples in EVENT_COLUMNS order.
+        writer.writerows(events)
+        return
+
+    for event in events:
+        sys.stdout.write(json.dumps(event.as_dict(), ensure_ascii=False) + "\n")
+
+
+@app.command("stats-report")
+def stats_report(
+    db: str = typer.Option(..., "--db", help="Path to SQLite DB file."),
+    group_by: list[str] | None = typer.Option(
+        None, "--group-by", help="actor, action, target, result or context.<key>; repeatable."
+    ),
+    bucket: str | None = typer.Option(None, "--bucket", help="Time bucket: minute, hour, day or month."),
+    rate_of: str | None = typer.Option(None, "--rate-of", help="Also report the share of rows with this result."),
+    actor: str | None = typer.Option(None, "--actor", help="Filter by actor."),
+    action: str | None = typer.Option(None, "--action", help="Filter by action."),
+    since: str | None = typer.Option(None, "--since", help="Only rows with ts >= this value."),
+    until: str | None = typer.Option(None, "--until", help="Only rows with ts < this value."),
+    where: list[str] | None = typer.Option(None, "--where", help="Context filter such as 'context.ip=10.0.0.5'."),
+    top: int | None = typer.Option(None, "--top", min=1, help="Keep only the first N rows."),
+    format: str = typer.Option("table", "--format", help="Output format: table, csv or json."),
+) -> None:
+    """Aggregate event counts by group and time bucket, e.g. events per actor per hour."""
+    if format not in ("table", "csv", "json"):
+        raise typer.BadParameter("--format must be 'table', 'csv' or 'json'.")
+
+    conditions = _check_where(where)
+    logger = _open_logger(db)
+    try:
+        report = logger.aggregate(
+            group_by=group_by or [],
+            bucket=bucket,
+            rate_of=rate_of,
+            actor=actor,
+            action=action,
+            since=since,
+            until=until,
+            where=conditions,
+            top=top,
+        )
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+    if format == "json":
+        print(json.dumps(report, ensure_ascii=False))
+        return
+    if format == "csv":
+        import csv
+
+        writer = csv.writer(sys.stdout)
+        writer.writerow(report["columns"])
+        writer.writerows(report["rows"])
+        return
+
+    from rich.table import Table
+
+    table = Table(title="Event counts")
+    for column in report["columns"]:
+        table.add_column(column, justify="right" if column in ("count", "matching", "rate") else "left")
+    for row in report["rows"]:
+        table.add_row(*("" if value is None else str(value) for value in row))
+    console.print(table)
+
+
+@app.command("index-context")
+def index_context(
+    db: str = typer.Option(..., "--db", help="Path to SQLite DB file."),
+    key: str | None = typer.Option(None, "--key", help="Context key to index, e.g. ip or geo.country."),
+    drop: bool = typer.Option(False, "--drop", help="Drop the index for --key instead of creating it."),
+) -> None:
+    """Declare (or drop) an expression index on a context key; lists indexed keys without --key."""
+    logger = _open_logger(db)
+    if key is None:
+        if drop:
+            raise typer.BadParameter("--drop needs --key.")
+        for indexed in logger.context_indexes():
+            console.print(f"context.{indexed}")
+        return
+    try:
+        if drop:
+            dropped = logger.drop_context_index(key)
+            console.print(f"Dropped index for {key}" if dropped else f"No index declared for {key}")
+            return
+        name = logger.index_context_key(key)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    console.print(f"Indexed {key} as {name}")
+
+
+@app.command()
+def seal(
+    db: str = typer.Option(..., "--db", help="Path to SQLite DB file."),
+    block_size: int = typer.Option(1024, "--block-size", min=1, help="Events per Merkle block."),
+    partial: bool = typer.Option(False, "--partial", help="Also seal a final block smaller than --block-size."),
+) -> None:
+    """Seal unsealed events into hash-chained Merkle blocks."""
+    logger = _open_logger(db)
+    blocks = logger.seal_blocks(block_size=block_size, partial=partial)
+    for block in blocks:
+        console.print(
+            f"Sealed block id={block['id']} ids={block['first_id']}-{block['last_id']} root={block['merkle_root']}"
+        )
+    if not blocks:
+        console.print("Nothing to seal")
+
+
+@app.command()
+def serve(
+    db: str = typer.Option(..., "--db", help="Path to SQLite DB file."),
+    socket_path: str | None = typer.Option(None, "--socket", help="Unix socket path to listen on."),
+    http: str | None = typer.Option(None, "--http", help="HTTP listen address, e.g. 127.0.0.1:8080."),
+    batch_size: int = typer.Option(500, "--batch-size", min=1, help="Most events per group commit."),
+    max_latency: float = typer.Option(0.005, "--max-latency", help="Seconds a batch waits to fill up."),
+    verify_workers: int | None = typer.Option(
+        None, "--verify-workers", min=1, help="Most processes one verify request may use (default: CPU count)."
+    ),
+) -> None:
+    """Own the DB and serve ingest, query, verify and stats over a Unix socket and/or HTTP."""
+    import signal
+    import threading
+
+    from auditlog.server import AuditHTTPServer, AuditServer, IngestService
+
+    if socket_path is None and http is None:
+        raise typer.BadParameter("pass --socket, --http or both.")
+    address: tuple[str, int] | None = None
+    if http is not None:
+        host, sep, port = http.rpartition(":")
+        if not sep or not port.isdigit():
+            raise typer.BadParameter(f"--http must look like HOST:PORT, got {http!r}.")
+        address = (host or "127.0.0.1", int(port))
+
+    service = IngestService(
+        db,
+        batch_size=batch_size,
+        max_latency=max_latency,
+        max_verify_workers=verify_workers,
+        profile=_connection["profile"],
+        pragmas=_connection["pragmas"],
+        metrics=_connection["metrics"],
+    )
+    servers: list[Any] = []
+    try:
+        if socket_path is not None:
+            servers.append(AuditServer(socket_path, service))
+            console.print(f"Serving {db} on {socket_path}")
+        if address is not None:
+            servers.append(AuditHTTPServer(address, service))
+            console.print(f"Serving {db} on http://{address[0]}:{address[1]}")
+    except (OSError, RuntimeError) as exc:
+        for server in servers:
+            server.server_close()
+        service.close()
+        raise typer.BadParameter(str(exc)) from exc
+
+    # Stop cleanly (draining the queue, closing the DB, removing the socket) on
+    # SIGTERM as on Ctrl-C.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    for server in servers:
+        threading.Thread(target=server.serve_forever, name="auditlog-serve", daemon=True).start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # A repeated signal must not interrupt draining the queue.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+        service.close()
+
+
+@app.command()
+def stats(
+    metrics_file: str | None = typer.Option(
+        None, "--file", help="Metrics JSON written via --metrics-file (default: $AUDITLOG_METRICS_FILE)."
+    ),
+    prometheus: str | None = typer.Option(None, "--prometheus", help="Also write Prometheus text format here."),
+    as_json: bool = typer.Option(False, "--json", help="Print the raw snapshot as JSON."),
+) -> None:
+    """Show counters and per-stage latencies collected with --metrics-file."""
+    path = metrics_file or os.environ.get("AUDITLOG_METRICS_FILE")
+    if not path:
+        raise typer.BadParameter("pass --file or set AUDITLOG_METRICS_FILE.")
+    snapshot = load_snapshot(path)
+    if prometheus is not None:
+        write_prometheus(snapshot, prometheus)
+    if as_json:
+        print(json.dumps(snapshot, indent=2))
+        return
+
+    from rich.table import Table
+
+    table = Table(title="Stage latency (ms)")
+    for column in ("stage", "count", "mean", "p50", "p99"):
+        table.add_column(column, justify="left" if column == "stage" else "right")
+    for name, summary in sorted(snapshot["histograms"].items()):
+        mean = summary["sum"] / summary["count"] * 1000
+        table.add_row(
+            name,
+            str(summary["count"]),
+            f"{mean:.3f}",
+            f"<= {summary['p50'] * 1000:g}",
+            f"<= {summary['p99'] * 1000:g}",
+        )
+    console.print(table)
+    for name, value in sorted(snapshot["counters"].items()):
+        console.print(f"{name}: {value}")
+
+
+@app.command()
+def bench(
+    events: int = typer.Option(100_000, "--events", min=1, help="Events appended by the batched run."),
+    single_events: int = typer.Option(2_000, "--single-events", min=1, help="Events appended one at a time."),
+    batch_size: int = typer.Option(5_000, "--batch-size", min=1, help="Events per append_many call."),
+    context_bytes: int = typer.Option(64, "--context-bytes", min=0, help="Approximate context size per event."),
+    queries: int = typer.Option(200, "--queries", min=1, help="Queries timed per filter."),
+    workers: int = typer.Option(1, "--workers", min=1, help="Verify worker processes."),
+    compact: bool = typer.Option(False, "--compact", help="Use the dictionary-encoded layout."),
+    seed: int = typer.Option(0, "--seed", help="Seed for the synthetic event stream."),
+    output: str | None = typer.Option(None, "--output", help="Write the JSON report to this file."),
+) -> None:
+    """Benchmark append, query and verify throughput on synthetic events."""
+    from auditlog.bench import run_benchmarks
+
+    report = run_benchmarks(
+        events=events,
+        single_events=single_events,
+        batch_size=batch_size,
+        context_bytes=context_bytes,
+        queries=queries,
+        workers=workers,
+        profile=_connection["profile"],
+        compact=compact,
+        seed=seed,
+    )
+    text = json.dumps(report, indent=2)
+    if output is not None:
+        with open(output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    print(text)
+
+
+@app.command()
+def compact(db: str = typer.Option(..., "--db", help="Path to SQLite DB file.")) -> None:
+    """Migrate a database to the dictionary-encoded compact layout."""
+    size_before = os.path.getsize(db)
+    moved = _open_logger(db).compact()
+    console.print(f"Compacted {moved} rows; {size_before} -> {os.path.getsize(db)} bytes")
+
+
+@app.command()
+def archive(
+    db: str = typer.Option(..., "--db", help="Path to SQLite DB file."),
+    before: str = typer.Option(..., "--before", help="Archive events with ts earlier than this ISO timestamp."),
+    directory: str | None = typer.Option(None, "--dir", help="Segment directory (default: <db>.segments)."),
+) -> None:
+    """Move old events into a compressed, read-only segment file."""
+    logger = _open_logger(db)
+    segment = logger.archive(before, directory=directory)
+    if segment is None:
+        console.print("Nothing to archive")
+        return
+    console.print(
+        f"Archived {segment['row_count']} rows ids={segment['first_id']}-{segment['last_id']} to {segment['path']}"
+    )
+
+
+@app.command()
+def prove(
+    db: str = typer.Option(..., "--db", help="Path to SQLite DB file."),
+    event_id: int = typer.Option(..., "--id", help="Event id to prove."),
+) -> None:
+    """Print a Merkle inclusion proof for one event as JSON."""
+    logger = _open_logger(db)
+    try:
+        proof = logger.prove(event_id)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    sys.stdout.write(json.dumps(proof, indent=2, ensure_ascii=False) + "\n")
+
+
+@app.command("check-proof")
+def check_proof_cmd(
+    file: str = typer.Option("-", "--file", help="Proof JSON file ('-' for stdin)."),
+    db: str | None = typer.Option(None, "--db", help="Also check the block against this DB's block chain."),
+) -> None:
+    """Check an inclusion proof; exits 1 when it does not hold."""
+    if file == "-":
+        raw = sys.stdin.read()
+    else:
+        with open(file, encoding="utf-8") as handle:
+            raw = handle.read()
+    try:
+        proof = json.loads(raw)
+    except json.JSONDecodeError as exc:
+        raise typer.BadParameter(f"proof must be valid JSON: {exc}") from exc
+
+    issues = _open_logger(db).check_proof(proof) if db else check_proof(proof)
     if not issues:
         console.print("OK")
         return
@@ -99,5 +663,133 @@ def verify(
     raise typer.Exit(1)
 
 
+@app.command("shard-append")
+def shard_append(
+    root: str = typer.Option(..., "--root", help="Directory holding the shard manifest and shard DBs."),
+    partition: str | None = typer.Option(
+        None, "--partition", help="tenant, day or month; fixed when the directory is first used."
+    ),
+    shard: str | None = typer.Option(None, "--shard", help="Tenant shard name (tenant partitioning)."),
+    actor: str = typer.Option(..., "--actor", help="Actor identifier (user/service)."),
+    action: str = typer.Option(..., "--action", help="Action name (e.g. login, export)."),
+    target: str = typer.Option(..., "--target", help="Target resource identifier."),
+    result: str = typer.Option(..., "--result", help="Result status (e.g. ok, denied)."),
+    context: str = typer.Option(..., "--context", help="JSON object string for context fields."),
+) -> None:
+    """Append one event to its shard of a partitioned log."""
+    context_obj = _parse_context(context)
+    logs = _open_shards(root, partition)
+    try:
+        record = logs.append(
+            shard=shard, actor=actor, action=action, target=target, result=result, context=context_obj
+        )
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    console.print(f"Appended event shard={record['shard']} id={record['id']} hash={record['event_hash']}")
+
+
+@app.command("shard-query")
+def shard_query(
+    root: str = typer.Option(..., "--root", help="Directory holding the shard manifest and shard DBs."),
+    shard: str | None = typer.Option(None, "--shard", help="Only query this shard."),
+    actor: str | None = typer.Option(None, "--actor", help="Filter by actor."),
+    action: str | None = typer.Option(None, "--action", help="Filter by action."),
+    limit: int = typer.Option(20, "--limit", min=1, help="Maximum rows to return."),
+) -> None:
+    """Query the newest events across all shards."""
+    logs = _open_shards(root)
+    from rich.table import Table
+
+    table = Table(title="Audit Events")
+    for column in ("shard", "id", "ts", "actor", "action", "target", "result", "context_json"):
+        table.add_column(column)
+    for event in logs.query(shard=shard, actor=actor, action=action, limit=limit):
+        table.add_row(
+            event["shard"],
+            str(event["id"]),
+            event["ts"],
+            event["actor"],
+            event["action"],
+            event["target"],
+            event["result"],
+            event["context_json"],
+        )
+    console.print(table)
+
+
+@app.command("shard-seal")
+def shard_seal(
+    root: str = typer.Option(..., "--root", help="Directory holding the shard manifest and shard DBs."),
+) -> None:
+    """Record every shard head in a new hash-chained manifest entry."""
+    entry = _open_shards(root).seal_manifest()
+    console.print(f"Manifest entry id={entry['id']} shards={len(entry['heads'])} hash={entry['entry_hash']}")
+
+
+@app.command("shard-verify")
+def shard_verify(
+    root: str = typer.Option(..., "--root", help="Directory holding the shard manifest and shard DBs."),
+) -> None:
+    """Verify every shard chain and the manifest; exits 1 when tampering is detected."""
+    issues = _open_shards(root).verify_chain()
+    if not issues:
+        console.print("OK")
+        return
+
+    console.print("FAIL")
+    for issue in issues:
+        console.print(f"- {issue}")
+    raise typer.Exit(1)
+
+
+def _checkpoint_key() -> bytes | None:
+    key = os.environ.get("AUDITLOG_CHECKPOINT_KEY")
+    return key.encode("utf-8") if key else None
+
+
+@app.command()
+def verify(
+    db: str = typer.Option(..., "--db", help="Path to SQLite DB file."),
+    since_checkpoint: bool = typer.Option(
+        False, "--since-checkpoint", help="Only re-hash rows added after the last trusted checkpoint."
+    ),
+    full: bool = typer.Option(False, "--full", help="Re-check the whole chain from GENESIS (default)."),
+    workers: int = typer.Option(1, "--workers", min=1, help="Processes used to hash id ranges in parallel."),
+    max_issues: int | None = typer.Option(None, "--max-issues", min=1, help="Stop after this many issues."),
+) -> None:
+    """Verify hash-chain integrity; exits 1 when tampering is detected.
+
+    A clean run records a checkpoint at the last verified row. Checkpoints are
+    signed with HMAC-SHA256 when AUDITLOG_CHECKPOINT_KEY is set.
+    """
+    if since_checkpoint and full:
+        raise typer.BadParameter("--since-checkpoint and --full are mutually exclusive.")
+
+    from auditlog.verify import VerifyReport
+
+    logger = _open_logger(db, checkpoint_key=_checkpoint_key())
+    report = VerifyReport()
+    issues = logger.iter_verify(
+        report, since_checkpoint=since_checkpoint, workers=workers, max_issues=max_issues
+    )
+
+    for issue in issues:
+        if len(report.issues) == 1:
+            console.print("FAIL")
+        console.print(f"- {issue}")
+
+    if report.ok:
+        logger.record_checkpoint(report)
+        console.print("OK")
+        if report.checkpoint_id is not None:
+            console.print(f"Verified rows after checkpoint {report.checkpoint_id} up to id={report.last_id}")
+
+    console.print(f"Scanned {report.rows_scanned} rows")
+    if report.truncated:
+        console.print(f"Stopped after {len(report.issues)} issues (--max-issues)")
+    if not report.ok:
+        raise typer.Exit(1)
+
+
 if __name__ == "__main__":
     app()
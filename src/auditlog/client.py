@@ -0,0 +1,73 @@
+"""Thin client for the ``auditlog serve`` daemon.
+
+Only the standard library's socket and json modules are imported, so a client
+process never loads SQLite or the service layer.
+"""
+
+from __future__ import annotations
+
+import json
+import socket
+from typing import Any, Iterable, Mapping
+
+
+class AuditClient:
+    """Send requests to an ``AuditServer`` over its Unix socket.
+
+    Server-side failures are raised as RuntimeError with the server's message.
+    """
+
+    def __init__(self, socket_path: str, *, timeout: float | None = 30.0) -> None:
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(socket_path)
+        self._reader = self._sock.makefile("rb")
+
+    def request(self, op: str, **params: Any) -> Any:
+        line = json.dumps({"op": op, **params}, ensure_ascii=False).encode("utf-8") + b"\n"
+        self._sock.sendall(line)
+        reply = self._reader.readline()
+        if not reply:
+            raise RuntimeError("server closed the connection")
+        response = json.loads(reply)
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    def ping(self) -> dict:
+        return self.request("ping")
+
+    def append(
+        self,
+        *,
+        actor: str,
+        action: str,
+        target: str,
+        result: str,
+        context: dict,
+        ts: str | None = None,
+        idempotency_key: str | None = None,
+    ) -> dict:
+        event = {"ts": ts, "actor": actor, "action": action, "target": target, "result": result, "context": context}
+        if idempotency_key is not None:
+            event["idempotency_key"] = idempotency_key
+        return self.request("append", event=event)
+
+    def append_many(self, events: Iterable[Mapping[str, Any]]) -> list[dict]:
+        return self.request("append_many", events=list(events))
+
+    def query(self, **filters: Any) -> list[dict]:
+        return self.request("query", filters=filters)
+
+    def verify(self, **options: Any) -> dict:
+        return self.request("verify", options=options)
+
+    def close(self) -> None:
+        self._reader.close()
+        self._sock.close()
+
+    def __enter__(self) -> AuditClient:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
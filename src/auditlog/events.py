@@ -0,0 +1,99 @@
+"""Stored event records, and validation of incoming event payloads shared by the CLI and the ingest server."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Mapping, NamedTuple
+
+from auditlog.hashing import canonical_json
+
+EVENT_FIELDS = ("actor", "action", "target", "result")
+
+
+class AuditEvent(NamedTuple):
+    """One stored row, as returned by queries called with ``as_dict=False``.
+
+    A tuple subclass, so a row costs about a third of the equivalent dict. Fields
+    are attributes (``event.actor``) and can also be read dict-style
+    (``event["actor"]``, ``get``, ``keys``); ``context`` decodes ``context_json`` on
+    each access. It is still a tuple: ``in``, iteration and ``json.dumps`` see the
+    values, so call ``as_dict()`` wherever a real mapping is needed.
+    """
+
+    id: int
+    ts: str
+    actor: str
+    action: str
+    target: str
+    result: str
+    context_json: str
+    prev_hash: str
+    event_hash: str
+
+    def __getitem__(self, key: Any) -> Any:  # type: ignore[override]
+        if isinstance(key, str):
+            try:
+                key = _FIELD_INDEX[key]
+            except KeyError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        index = _FIELD_INDEX.get(key)
+        return default if index is None else tuple.__getitem__(self, index)
+
+    def keys(self) -> tuple[str, ...]:
+        return self._fields
+
+    @property
+    def context(self) -> Any:
+        return json.loads(self.context_json)
+
+    def as_dict(self) -> dict[str, Any]:
+        return dict(zip(self._fields, self))
+
+
+_FIELD_INDEX = {name: index for index, name in enumerate(AuditEvent._fields)}
+
+
+def check_appendable(event: Mapping[str, Any]) -> None:
+    """Raise ValueError when ``event`` could not be appended.
+
+    Queued writers call this on the submitting thread, so one bad event is rejected
+    on its own instead of failing the group commit it would have joined.
+    """
+    normalize_event(dict(event))
+    try:
+        canonical_json(event.get("context", {}))
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"field 'context' is not JSON-serializable: {exc}") from exc
+
+
+def normalize_event(event: Any) -> dict[str, Any]:
+    """Check a decoded JSON event and return it with exactly the appendable keys.
+
+    Raises ValueError describing the first problem found.
+    """
+    if not isinstance(event, dict):
+        raise ValueError("event must be a JSON object.")
+    for field in EVENT_FIELDS:
+        if not isinstance(event.get(field), str):
+            raise ValueError(f"field '{field}' must be a string.")
+    if not isinstance(event.get("context", {}), dict):
+        raise ValueError("field 'context' must be a JSON object.")
+    if event.get("ts") is not None and not isinstance(event["ts"], str):
+        raise ValueError("field 'ts' must be a string.")
+    if event.get("idempotency_key") is not None and not isinstance(event["idempotency_key"], str):
+        raise ValueError("field 'idempotency_key' must be a string.")
+
+    normalized = {
+        "ts": event.get("ts"),
+        "actor": event["actor"],
+        "action": event["action"],
+        "target": event["target"],
+        "result": event["result"],
+        "context": event.get("context", {}),
+    }
+    if event.get("idempotency_key") is not None:
+        normalized["idempotency_key"] = event["idempotency_key"]
+    return normalized
@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import hashlib
+import hmac
 import json
+from json.encoder import encode_basestring
 from typing import Any
 
 
@@ -21,3 +23,62 @@ def hash_event(event_dict: dict[str, Any], prev_hash: str) -> str:
     """Hash an event using the previous hash and canonical JSON payload."""
     payload = {"prev_hash": prev_hash, "event": event_dict}
     return sha256_hex(canonical_json(payload))
+
+
+def hash_event_fields(
+    prev_hash: str,
+    ts: str,
+    actor: str,
+    action: str,
+    target: str,
+    result: str,
+    context_json: str,
+) -> str:
+    """Hash an event from its stored columns without building the payload dict.
+
+    Produces the same digest as ``hash_event`` when ``context_json`` is the canonical
+    JSON of the context, by writing the canonical payload bytes straight into the
+    hash: keys in sorted order, compact separators, strings escaped exactly as
+    ``json.dumps(ensure_ascii=False)`` does, and ``context_json`` spliced in as-is.
+    All other fields must be strings.
+    """
+    digest = hashlib.sha256()
+    digest.update(
+        (
+            '{"event":{"action":' + encode_basestring(action)
+            + ',"actor":' + encode_basestring(actor)
+            + ',"context":'
+        ).encode("utf-8")
+    )
+    digest.update(context_json.encode("utf-8"))
+    digest.update(
+        (
+            ',"result":' + encode_basestring(result)
+            + ',"target":' + encode_basestring(target)
+            + ',"ts":' + encode_basestring(ts)
+            + '},"prev_hash":' + encode_basestring(prev_hash) + "}"
+        ).encode("utf-8")
+    )
+    return digest.hexdigest()
+
+
+def hash_checkpoint(
+    *,
+    event_id: int,
+    event_hash: str,
+    created_at: str,
+    prev_checkpoint_hash: str,
+    key: bytes | None = None,
+) -> str:
+    """Hash a verification checkpoint, signing it with HMAC-SHA256 when a key is given."""
+    payload = canonical_json(
+        {
+            "created_at": created_at,
+            "event_hash": event_hash,
+            "event_id": event_id,
+            "prev_checkpoint_hash": prev_checkpoint_hash,
+        }
+    )
+    if key is None:
+        return sha256_hex(payload)
+    return hmac.new(key, payload.encode("utf-8"), hashlib.sha256).hexdigest()
@@ -0,0 +1,119 @@
+"""Merkle trees over sealed blocks of audit events."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+from auditlog.hashing import canonical_json, hash_event, sha256_hex
+
+# Leaves and interior nodes use distinct prefixes (as in RFC 6962) so an interior
+# node can never be passed off as a leaf.
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def leaf_hash(event_hash: str) -> bytes:
+    """Return the Merkle leaf for one stored event_hash."""
+    return hashlib.sha256(LEAF_PREFIX + event_hash.encode("utf-8")).digest()
+
+
+def _node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def _next_level(level: list[bytes]) -> list[bytes]:
+    # An unpaired last node is promoted unchanged rather than duplicated.
+    paired = [_node_hash(level[index], level[index + 1]) for index in range(0, len(level) - 1, 2)]
+    if len(level) % 2:
+        paired.append(level[-1])
+    return paired
+
+
+def merkle_root(leaves: list[bytes]) -> bytes:
+    """Return the root of the tree built over ``leaves``."""
+    if not leaves:
+        raise ValueError("cannot build a Merkle tree without leaves")
+    level = leaves
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0]
+
+
+def inclusion_proof(leaves: list[bytes], index: int) -> list[dict[str, str]]:
+    """Return the sibling path from ``leaves[index]`` up to the root."""
+    path: list[dict[str, str]] = []
+    level = leaves
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            path.append({"side": "left" if sibling < index else "right", "hash": level[sibling].hex()})
+        level = _next_level(level)
+        index //= 2
+    return path
+
+
+def root_from_path(leaf: bytes, path: list[dict[str, str]]) -> bytes:
+    """Fold a sibling path onto a leaf and return the implied root."""
+    node = leaf
+    for step in path:
+        sibling = bytes.fromhex(step["hash"])
+        node = _node_hash(sibling, node) if step["side"] == "left" else _node_hash(node, sibling)
+    return node
+
+
+def hash_block(
+    *, first_id: int, last_id: int, size: int, merkle_root: str, prev_block_hash: str, sealed_at: str
+) -> str:
+    """Hash a sealed block header, chaining it to the previous block."""
+    return sha256_hex(
+        canonical_json(
+            {
+                "first_id": first_id,
+                "last_id": last_id,
+                "merkle_root": merkle_root,
+                "prev_block_hash": prev_block_hash,
+                "sealed_at": sealed_at,
+                "size": size,
+            }
+        )
+    )
+
+
+def check_proof(proof: dict[str, Any]) -> list[str]:
+    """Check an inclusion proof from ``AuditLogger.prove`` on its own; return issues.
+
+    The event's hash is recomputed from its fields, folded up the sibling path to the
+    block's Merkle root, and the block header hash is recomputed. Whether the block
+    belongs to a particular log is checked separately against that log's blocks.
+    """
+    issues: list[str] = []
+    event = proof["event"]
+    block = proof["block"]
+
+    try:
+        context = json.loads(event["context_json"])
+    except json.JSONDecodeError as exc:
+        return [f"event {event['id']}: invalid context_json: {exc}"]
+    payload = {key: event[key] for key in ("ts", "actor", "action", "target", "result")}
+    payload["context"] = context
+    if hash_event(payload, event["prev_hash"]) != event["event_hash"]:
+        issues.append(f"event {event['id']}: event_hash does not match event contents")
+
+    if not block["first_id"] <= event["id"] <= block["last_id"]:
+        issues.append(f"event {event['id']}: outside block {block['id']} id range")
+    if root_from_path(leaf_hash(event["event_hash"]), proof["path"]).hex() != block["merkle_root"]:
+        issues.append(f"event {event['id']}: Merkle path does not lead to block {block['id']} root")
+
+    expected_block_hash = hash_block(
+        first_id=block["first_id"],
+        last_id=block["last_id"],
+        size=block["size"],
+        merkle_root=block["merkle_root"],
+        prev_block_hash=block["prev_block_hash"],
+        sealed_at=block["sealed_at"],
+    )
+    if expected_block_hash != block["block_hash"]:
+        issues.append(f"block {block['id']}: block_hash mismatch")
+    return issues
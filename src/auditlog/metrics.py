@@ -0,0 +1,213 @@
+"""Opt-in counters and per-stage latency histograms for the audit log hot paths."""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Iterator, Mapping
+
+# Upper bounds in seconds, from 10 microseconds (in-memory hashing) up to
+# multi-second fsync stalls; anything slower lands in +Inf.
+LATENCY_BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class _Stage:
+    __slots__ = ("_metrics", "_name", "_started")
+
+    def __init__(self, metrics: Metrics, name: str) -> None:
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._metrics.observe(self._name, time.perf_counter() - self._started)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+
+_NULL_STAGE = _NullStage()
+
+
+class NullMetrics:
+    """Disabled instrumentation: every call is a constant-time no-op."""
+
+    enabled = False
+
+    def stage(self, name: str) -> _NullStage:
+        return _NULL_STAGE
+
+    def observe(self, name: str, seconds: float) -> None:
+        return None
+
+    def count(self, name: str, value: int = 1) -> None:
+        return None
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"enabled": False, "counters": {}, "histograms": {}}
+
+
+NULL_METRICS = NullMetrics()
+
+
+class Metrics:
+    """Thread-safe counters and fixed-bucket latency histograms keyed by stage name.
+
+    Stage names are dotted, e.g. ``append.hash`` or ``verify``. Pass an instance as
+    ``AuditLogger(metrics=...)``; several loggers may share one.
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counters: dict[str, int] = {}
+        # name -> [per-bucket counts (last is +Inf), sum of seconds, count]
+        self.histograms: dict[str, list[Any]] = {}
+
+    def stage(self, name: str) -> _Stage:
+        """Return a context manager that records the time spent inside it under ``name``."""
+        return _Stage(self, name)
+
+    def observe(self, name: str, seconds: float) -> None:
+        index = bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0]
+            histogram[0][index] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return counters and histograms as plain JSON-serializable data."""
+        with self._lock:
+            histograms = {
+                name: {"buckets": list(buckets), "sum": total, "count": count}
+                for name, (buckets, total, count) in self.histograms.items()
+            }
+            for summary in histograms.values():
+                summary["p50"] = _quantile(summary["buckets"], summary["count"], 0.50)
+                summary["p99"] = _quantile(summary["buckets"], summary["count"], 0.99)
+            return {"enabled": True, "counters": dict(self.counters), "histograms": histograms}
+
+    def merge(self, snapshot: Mapping[str, Any]) -> None:
+        """Add the counts from an earlier ``snapshot`` into this instance."""
+        with self._lock:
+            for name, value in snapshot.get("counters", {}).items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for name, summary in snapshot.get("histograms", {}).items():
+                histogram = self.histograms.setdefault(name, [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0])
+                histogram[0] = [mine + theirs for mine, theirs in zip(histogram[0], summary["buckets"])]
+                histogram[1] += summary["sum"]
+                histogram[2] += summary["count"]
+
+
+def _quantile(buckets: list[int], count: int, fraction: float) -> float | None:
+    """Return the upper bound of the bucket holding the ``fraction`` quantile."""
+    if not count:
+        return None
+    rank = math.ceil(fraction * count)
+    seen = 0
+    for bound, hits in zip(LATENCY_BUCKETS + (math.inf,), buckets):
+        seen += hits
+        if seen >= rank:
+            return bound
+    return math.inf
+
+
+def _prometheus_name(name: str) -> str:
+    return "auditlog_" + name.replace(".", "_").replace("-", "_") + "_total"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(bound)
+
+
+def iter_prometheus(snapshot: Mapping[str, Any]) -> Iterator[str]:
+    """Yield a snapshot as Prometheus text exposition format lines."""
+    for name, value in sorted(snapshot.get("counters", {}).items()):
+        metric = _prometheus_name(name)
+        yield f"# TYPE {metric} counter"
+        yield f"{metric} {value}"
+
+    histograms = snapshot.get("histograms", {})
+    if not histograms:
+        return
+    yield "# HELP auditlog_stage_duration_seconds Time spent per pipeline stage."
+    yield "# TYPE auditlog_stage_duration_seconds histogram"
+    for name, summary in sorted(histograms.items()):
+        cumulative = 0
+        for bound, hits in zip(LATENCY_BUCKETS + (math.inf,), summary["buckets"]):
+            cumulative += hits
+            yield f'auditlog_stage_duration_seconds_bucket{{stage="{name}",le="{_format_bound(bound)}"}} {cumulative}'
+        yield f'auditlog_stage_duration_seconds_sum{{stage="{name}"}} {summary["sum"]!r}'
+        yield f'auditlog_stage_duration_seconds_count{{stage="{name}"}} {summary["count"]}'
+
+
+def write_prometheus(snapshot: Mapping[str, Any], path: str) -> None:
+    """Write a snapshot in Prometheus text format, replacing ``path`` atomically.
+
+    The file suits node_exporter's textfile collector.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        for line in iter_prometheus(snapshot):
+            handle.write(line + "\n")
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str) -> dict[str, Any]:
+    """Read a JSON snapshot written by ``save_snapshot``; empty when the file is missing."""
+    if not os.path.exists(path):
+        return NULL_METRICS.snapshot()
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save_snapshot(metrics: Metrics, path: str) -> None:
+    """Merge ``metrics`` into the snapshot stored at ``path`` and write it back atomically."""
+    total = Metrics()
+    total.merge(load_snapshot(path))
+    total.merge(metrics.snapshot())
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(total.snapshot(), handle, indent=2)
+    os.replace(tmp_path, path)
@@ -0,0 +1,329 @@
+"""Long-lived ingest server that owns the hash chain for one database.
+
+``IngestService`` funnels every append through an ``AsyncAuditWriter``, so
+concurrent requests are group-committed by a single writer thread, and answers
+queries and verification on a separate read connection. It is exposed two ways:
+
+* ``AuditServer``: a Unix socket speaking newline-delimited JSON. Each request line
+  is an object with an ``op`` and its parameters, and each response line is
+  ``{"ok": true, "result": ...}`` or ``{"ok": false, "error": "..."}``. A connection
+  may carry any number of requests, so shells can use ``socat`` or ``nc -U``.
+* ``AuditHTTPServer``: ``POST /events`` with one JSON event, a JSON array or an
+  NDJSON body, plus ``GET /query``, ``GET /verify`` and ``GET /stats``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import socketserver
+import stat
+import threading
+import time
+from collections import deque
+from dataclasses import asdict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Mapping
+from urllib.parse import parse_qsl, urlsplit
+
+from auditlog.events import normalize_event
+from auditlog.service import AuditLogger
+from auditlog.writer import AsyncAuditWriter
+
+OPERATIONS = ("ping", "append", "append_many", "query", "verify", "stats")
+
+QUERY_PARAMS = ("actor", "action", "limit", "after_id", "before_id", "since", "until", "where")
+VERIFY_PARAMS = ("since_checkpoint", "workers", "max_issues")
+INT_PARAMS = ("limit", "after_id", "before_id", "workers", "max_issues")
+
+# Window over which the recent ingest rate is computed, in seconds.
+RATE_WINDOW = 10.0
+
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+
+def _pick(params: Any, allowed: tuple[str, ...], what: str) -> dict[str, Any]:
+    if params is None:
+        return {}
+    if not isinstance(params, dict):
+        raise ValueError(f"{what} must be a JSON object.")
+    unknown = sorted(set(params) - set(allowed))
+    if unknown:
+        raise ValueError(f"unsupported {what}: {', '.join(unknown)}")
+    return params
+
+
+class IngestService:
+    """Group-commit appends through one writer thread and serve reads beside it.
+
+    The writer thread is the only chain owner, so clients never contend for the
+    SQLite write lock. Each request's events stay contiguous in the chain.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        batch_size: int = 500,
+        max_latency: float = 0.005,
+        max_queue: int = 10_000,
+        max_verify_workers: int | None = None,
+        **logger_kwargs: Any,
+    ) -> None:
+        self.db_path = db_path
+        # Clients choose ``workers`` for verify; each one is a forked process.
+        self.max_verify_workers = max(1, max_verify_workers or os.cpu_count() or 1)
+        self.writer = AsyncAuditWriter(
+            db_path, batch_size=batch_size, max_latency=max_latency, max_queue=max_queue, **logger_kwargs
+        )
+        self.reader = AuditLogger(db_path, check_same_thread=False, **logger_kwargs)
+        self._read_lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._started = time.monotonic()
+        self._ingested = 0
+        self._recent: deque[tuple[float, int]] = deque()
+
+    def append(self, event: Any) -> dict:
+        return self.append_many([event])[0]
+
+    def append_many(self, events: Any) -> list[dict]:
+        if not isinstance(events, list):
+            raise ValueError("events must be a JSON array.")
+        batch = [normalize_event(event) for event in events]
+        with self._submit_lock:
+            futures = [self.writer.submit(**event) for event in batch]
+        records = [future.result() for future in futures]
+        self._record_ingest(len(records))
+        return records
+
+    def query(self, filters: Any = None) -> list[dict]:
+        filters = _pick(filters, QUERY_PARAMS, "query filters")
+        with self._read_lock:
+            return self.reader.query(as_dict=True, **filters)
+
+    def verify(self, options: Any = None) -> dict[str, Any]:
+        options = _pick(options, VERIFY_PARAMS, "verify options")
+        if "workers" in options:
+            if not isinstance(options["workers"], int):
+                raise ValueError("workers must be an integer")
+            options = {**options, "workers": min(max(1, options["workers"]), self.max_verify_workers)}
+        with self._read_lock:
+            report = self.reader.verify(**options)
+        return {**asdict(report), "ok": report.ok}
+
+    def _record_ingest(self, count: int) -> None:
+        now = time.monotonic()
+        with self._stats_lock:
+            self._ingested += count
+            self._recent.append((now, count))
+            while self._recent[0][0] < now - RATE_WINDOW:
+                self._recent.popleft()
+
+    def stats(self) -> dict[str, Any]:
+        """Return ingest totals, the recent and lifetime ingest rates and the queue depth."""
+        now = time.monotonic()
+        uptime = now - self._started
+        with self._stats_lock:
+            recent = sum(count for at, count in self._recent if at >= now - RATE_WINDOW)
+            ingested = self._ingested
+        return {
+            "uptime_seconds": round(uptime, 3),
+            "events_ingested": ingested,
+            "events_per_sec": round(ingested / uptime, 1),
+            "recent_events_per_sec": round(recent / min(uptime, RATE_WINDOW), 1),
+            "queue_depth": self.writer.pending,
+            "batches_committed": self.writer.batches,
+            "events_committed": self.writer.committed,
+        }
+
+    def dispatch(self, request: Mapping[str, Any]) -> Any:
+        """Run one decoded socket request and return its JSON-serializable result."""
+        if not isinstance(request, dict):
+            raise ValueError("request must be a JSON object.")
+        op = request.get("op")
+        if op not in OPERATIONS:
+            raise ValueError(f"op must be one of {', '.join(OPERATIONS)}")
+        if op == "ping":
+            return {"pid": os.getpid(), "db": self.db_path}
+        if op == "append":
+            return self.append(request.get("event"))
+        if op == "append_many":
+            return self.append_many(request.get("events"))
+        if op == "query":
+            return self.query(request.get("filters"))
+        if op == "verify":
+            return self.verify(request.get("options"))
+        return self.stats()
+
+    def close(self) -> None:
+        """Commit everything still queued, then close both connections."""
+        self.writer.close()
+        with self._read_lock:
+            self.reader.conn.close()
+
+
+def _error_message(exc: Exception) -> str:
+    return str(exc) if isinstance(exc, ValueError) else f"{type(exc).__name__}: {exc}"
+
+
+def _remove_stale_socket(path: str) -> None:
+    if not os.path.exists(path):
+        return
+    if not stat.S_ISSOCK(os.stat(path).st_mode):
+        raise RuntimeError(f"{path} exists and is not a socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+    else:
+        raise RuntimeError(f"another server is already listening on {path}")
+    finally:
+        probe.close()
+
+
+class _SocketHandler(socketserver.StreamRequestHandler):
+    server: AuditServer
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = {"ok": True, "result": self.server.service.dispatch(json.loads(line))}
+            except Exception as exc:  # keep serving; the client gets the failure instead
+                response = {"ok": False, "error": _error_message(exc)}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class AuditServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serve an ``IngestService`` over a Unix socket with the line protocol above."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, service: IngestService) -> None:
+        _remove_stale_socket(socket_path)
+        self.socket_path = socket_path
+        self.service = service
+        super().__init__(socket_path, _SocketHandler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def _parse_body(body: bytes) -> tuple[bool, list[Any]]:
+    """Return ``(single, events)`` for a JSON object, JSON array or NDJSON body."""
+    text = body.decode("utf-8")
+    try:
+        decoded = json.loads(text)
+    except json.JSONDecodeError:
+        events = []
+        for lineno, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"line {lineno}: invalid JSON: {exc}") from exc
+        return False, events
+    if isinstance(decoded, list):
+        return False, decoded
+    return True, [decoded]
+
+
+def _query_params(query: str, allowed: tuple[str, ...]) -> dict[str, Any]:
+    params: dict[str, Any] = {}
+    for name, value in parse_qsl(query, keep_blank_values=True):
+        if name not in allowed:
+            raise ValueError(f"unsupported parameter: {name}")
+        if name in INT_PARAMS:
+            try:
+                params[name] = int(value)
+            except ValueError as exc:
+                raise ValueError(f"{name} must be an integer") from exc
+        elif name == "since_checkpoint":
+            params[name] = value.lower() in ("1", "true", "yes")
+        elif name == "where":
+            params.setdefault(name, []).append(value)
+        else:
+            params[name] = value
+    return params
+
+
+class _HTTPHandler(BaseHTTPRequestHandler):
+    server: AuditHTTPServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return None
+
+    def _send(self, status: HTTPStatus, payload: Any) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _respond(self, handler: Callable[[], Any]) -> None:
+        try:
+            payload = handler()
+        except ValueError as exc:
+            self._send(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+        except Exception as exc:
+            self._send(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": _error_message(exc)})
+        else:
+            self._send(HTTPStatus.OK, payload)
+
+    def do_POST(self) -> None:
+        if urlsplit(self.path).path != "/events":
+            self._send(HTTPStatus.NOT_FOUND, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            self._send(HTTPStatus.BAD_REQUEST, {"error": "invalid Content-Length"})
+            return
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": f"body exceeds {MAX_BODY_BYTES} bytes"})
+            return
+        body = self.rfile.read(length)
+
+        def ingest() -> Any:
+            single, events = _parse_body(body)
+            records = self.server.service.append_many(events)
+            return records[0] if single else records
+
+        self._respond(ingest)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        service = self.server.service
+        if url.path == "/query":
+            self._respond(lambda: service.query(_query_params(url.query, QUERY_PARAMS)))
+        elif url.path == "/verify":
+            self._respond(lambda: service.verify(_query_params(url.query, VERIFY_PARAMS)))
+        elif url.path == "/stats":
+            self._respond(service.stats)
+        else:
+            self._send(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+
+class AuditHTTPServer(ThreadingHTTPServer):
+    """Serve an ``IngestService`` over HTTP; see the module docstring for routes."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], service: IngestService) -> None:
+        self.service = service
+        super().__init__(address, _HTTPHandler)
@@ -2,20 +2,164 @@
 
 from __future__ import annotations
 
-import json
+import os
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
+from itertools import chain, islice
+from typing import Any, Iterable, Iterator, Mapping, Sequence
 
-from auditlog.hashing import canonical_json, hash_event
-from auditlog.storage import connect, get_last_hash, init_db, insert_event, query_events
+from auditlog.archive import (
+    aggregate_segment,
+    file_sha256,
+    iter_segment,
+    row_matches,
+    segment_dir,
+    segment_filename,
+    write_segment,
+)
+from auditlog.events import AuditEvent
+from auditlog.hashing import canonical_json, hash_checkpoint, hash_event, hash_event_fields
+from auditlog.merkle import check_proof, hash_block, inclusion_proof, leaf_hash, merkle_root
+from auditlog.metrics import NULL_METRICS, Metrics, NullMetrics
+from auditlog.storage import (
+    aggregate_events,
+    begin_immediate,
+    commit_segment,
+    connect,
+    create_context_index,
+    current_pragmas,
+    drop_context_index,
+    explain_query,
+    find_block,
+    find_idempotency_keys,
+    get_block,
+    get_chain_head,
+    get_archive_cutoff,
+    get_data_version,
+    get_event,
+    get_event_hash,
+    get_id_range,
+    get_last_block,
+    init_db,
+    insert_block,
+    insert_checkpoint,
+    insert_event,
+    insert_events,
+    iter_events,
+    is_compact,
+    iter_rows,
+    list_checkpoints,
+    list_context_indexes,
+    list_event_hashes,
+    list_segments,
+    migrate_to_compact,
+    parse_where,
+    query_events,
+    resolve_pragmas,
+    row_converter,
+    segment_overlaps,
+    set_meta,
+)
+from auditlog.verify import VerifyReport, check_checkpoints, check_rows, check_rows_parallel
+
+DEFAULT_BLOCK_SIZE = 1024
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+def _hash_row(
+    prev_hash: str,
+    ts: str,
+    actor: str,
+    action: str,
+    target: str,
+    result: str,
+    context: Any,
+    context_json: str,
+) -> str:
+    try:
+        return hash_event_fields(prev_hash, ts, actor, action, target, result, context_json)
+    except TypeError:
+        # Non-string fields take the reference path so digests stay identical.
+        event = {"ts": ts, "actor": actor, "action": action, "target": target, "result": result, "context": context}
+        return hash_event(event, prev_hash)
 
 
 class AuditLogger:
     """Service class for append/query/verify operations."""
 
-    def __init__(self, db_path: str) -> None:
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        checkpoint_key: bytes | None = None,
+        profile: str | None = None,
+        pragmas: Mapping[str, str | int] | None = None,
+        seal_every: int | None = None,
+        check_same_thread: bool = True,
+        compact: bool = False,
+        metrics: Metrics | None = None,
+        idempotency_cache: int = 10_000,
+    ) -> None:
         self.db_path = db_path
-        self.conn = connect(db_path)
+        self.checkpoint_key = checkpoint_key
+        self.seal_every = seal_every
+        self.metrics: Metrics | NullMetrics = metrics if metrics is not None else NULL_METRICS
+        self._sealed_through = 0
+        self.pragmas = resolve_pragmas(profile, pragmas)
+        self.conn = connect(db_path, pragmas=self.pragmas, check_same_thread=check_same_thread)
         init_db(self.conn)
+        if self.pragmas:
+            settings = {"profile": profile, "pragmas": current_pragmas(self.conn)}
+            set_meta(self.conn, "connection_settings", canonical_json(settings))
+        self._head: tuple[int, str] | None = None
+        self._head_version = -1
+        if compact:
+            migrate_to_compact(self.conn)
+        # Value-to-id cache for the dictionary-encoded layout; None for plain TEXT columns.
+        self._interned: dict[str, int] | None = {} if is_compact(self.conn) else None
+        # Most recently used idempotency keys and their records, so retries skip SQLite.
+        self._recent_keys: OrderedDict[str, dict] = OrderedDict()
+        self._recent_keys_size = idempotency_cache
+
+    def _chain_head(self) -> tuple[int, str]:
+        """Return the cached ``(id, event_hash)`` chain head, reloading it when stale.
+
+        The cache is updated by our own inserts; ``PRAGMA data_version`` changes only
+        when another connection commits, which is exactly when the cache is stale.
+        """
+        with self.metrics.stage("append.head_lookup"):
+            version = get_data_version(self.conn)
+            if self._head is None or version != self._head_version:
+                self._head = get_chain_head(self.conn)
+                self._head_version = version
+        return self._head
+
+    def stats(self) -> dict[str, Any]:
+        """Return instrumentation counters and per-stage latency histograms.
+
+        Stages are ``append.canonicalize``, ``append.lock``, ``append.head_lookup``,
+        ``append.hash``, ``append.insert``, ``append.commit``, ``append``, ``query``,
+        ``aggregate`` and ``verify``.
+        Reports ``enabled: False`` unless the logger was created with ``metrics=Metrics()``.
+        """
+        return self.metrics.snapshot()
+
+    def _cached_key(self, key: str) -> dict | None:
+        record = self._recent_keys.get(key)
+        if record is not None:
+            self._recent_keys.move_to_end(key)
+        return record
+
+    def _remember_keys(self, records: Mapping[str, dict]) -> None:
+        for key, record in records.items():
+            self._recent_keys[key] = record
+            self._recent_keys.move_to_end(key)
+        while len(self._recent_keys) > self._recent_keys_size:
+            self._recent_keys.popitem(last=False)
 
     def append(
         self,
@@ -26,73 +170,675 @@ class AuditLogger:
         result: str,
         context: dict,
         ts: str | None = None,
+        idempotency_key: str | None = None,
     ) -> dict:
-        event_ts = ts or datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
-        prev_hash = get_last_hash(self.conn)
-        event = {
-            "ts": event_ts,
+        """Append one event and return its ``id``, ``event_hash`` and ``prev_hash``.
+
+        When ``idempotency_key`` was used before, nothing is written and the original
+        record is returned with ``duplicate: True``. Keys are not part of the hash.
+        """
+        with self.metrics.stage("append"):
+            if idempotency_key is not None:
+                cached = self._cached_key(idempotency_key)
+                if cached is not None:
+                    self.metrics.count("append.duplicates")
+                    return {**cached, "duplicate": True}
+            return self._append(
+                ts=ts or _utc_now(),
+                actor=actor,
+                action=action,
+                target=target,
+                result=result,
+                context=context,
+                idempotency_key=idempotency_key,
+            )
+
+    def _append(
+        self,
+        *,
+        ts: str,
+        actor: str,
+        action: str,
+        target: str,
+        result: str,
+        context: dict,
+        idempotency_key: str | None = None,
+    ) -> dict:
+        metrics = self.metrics
+        with metrics.stage("append.canonicalize"):
+            context_json = canonical_json(context)
+
+        with metrics.stage("append.lock"):
+            begin_immediate(self.conn)
+        try:
+            if idempotency_key is not None:
+                # Another connection, or an entry evicted from the cache, may hold the key.
+                stored = find_idempotency_keys(self.conn, [idempotency_key]).get(idempotency_key)
+                if stored is not None:
+                    self.conn.rollback()
+                    self._remember_keys({idempotency_key: stored})
+                    metrics.count("append.duplicates")
+                    return {**stored, "duplicate": True}
+            # The head is read under the write lock, so no other writer can link to it first.
+            _, prev_hash = self._chain_head()
+            with metrics.stage("append.hash"):
+                event_hash = _hash_row(prev_hash, ts, actor, action, target, result, context, context_json)
+            event_id = insert_event(
+                self.conn,
+                ts=ts,
+                actor=actor,
+                action=action,
+                target=target,
+                result=result,
+                context_json=context_json,
+                prev_hash=prev_hash,
+                event_hash=event_hash,
+                interned=self._interned,
+                metrics=metrics,
+                idempotency_key=idempotency_key,
+            )
+        except BaseException:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            raise
+        self._head = (event_id, event_hash)
+        metrics.count("append.events")
+        record = {"id": event_id, "event_hash": event_hash, "prev_hash": prev_hash}
+        if idempotency_key is not None:
+            self._remember_keys({idempotency_key: record})
+        self._maybe_seal()
+
+        return record
+
+    def append_many(
+        self, events: Iterable[Mapping[str, Any]], *, meta: Mapping[str, str] | None = None
+    ) -> list[dict]:
+        """Append a batch of events in a single transaction.
+
+        Each event is a mapping with ``actor``, ``action``, ``target``, ``result``,
+        ``context`` and optional ``ts`` and ``idempotency_key``. Hashes are chained in
+        memory so the stored chain is identical to calling ``append`` once per event.
+        Events whose key was seen before, in the log or earlier in the batch, are not
+        chained; their slot holds the original record with ``duplicate: True``.
+        ``meta`` key/values are stored in audit_meta atomically with the batch.
+        """
+        with self.metrics.stage("append"):
+            return self._append_many(events, meta)
+
+    def _append_many(self, events: Iterable[Mapping[str, Any]], meta: Mapping[str, str] | None = None) -> list[dict]:
+        metrics = self.metrics
+        pending: list[tuple[str, str, str, str, str, Any, str, str | None]] = []
+        # Per input event: (index into pending, is a repeat) or an already known record.
+        slots: list[tuple[int, bool] | dict] = []
+        batch_keys: dict[str, int] = {}
+        for item in events:
+            key = item.get("idempotency_key")
+            if key is not None:
+                if key in batch_keys:
+                    slots.append((batch_keys[key], True))
+                    continue
+                cached = self._cached_key(key)
+                if cached is not None:
+                    slots.append({**cached, "duplicate": True})
+                    continue
+                batch_keys[key] = len(pending)
+            with metrics.stage("append.canonicalize"):
+                context_json = canonical_json(item["context"])
+            slots.append((len(pending), False))
+            pending.append(
+                (
+                    item.get("ts") or _utc_now(),
+                    item["actor"],
+                    item["action"],
+                    item["target"],
+                    item["result"],
+                    item["context"],
+                    context_json,
+                    key,
+                )
+            )
+        if not pending and not meta:
+            # Every event was answered from the key cache.
+            if slots:
+                metrics.count("append.duplicates", len(slots))
+            return [slot for slot in slots if isinstance(slot, dict)]
+
+        records: list[dict] = []
+        rows: list[tuple[str, ...]] = []
+        row_keys: list[str | None] = []
+        with metrics.stage("append.lock"):
+            begin_immediate(self.conn)
+        try:
+            stored = find_idempotency_keys(self.conn, list(batch_keys)) if batch_keys else {}
+            _, prev_hash = self._chain_head()
+            for ts, actor, action, target, result, context, context_json, key in pending:
+                if key in stored:
+                    records.append({**stored[key], "duplicate": True})
+                    continue
+                with metrics.stage("append.hash"):
+                    event_hash = _hash_row(prev_hash, ts, actor, action, target, result, context, context_json)
+                records.append({"event_hash": event_hash, "prev_hash": prev_hash})
+                rows.append((ts, actor, action, target, result, context_json, prev_hash, event_hash))
+                row_keys.append(key)
+                prev_hash = event_hash
+            first_id = insert_events(
+                self.conn,
+                rows,
+                interned=self._interned,
+                metrics=metrics,
+                meta=meta,
+                keys=row_keys if batch_keys else None,
+            )
+        except BaseException:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            raise
+        if self.conn.in_transaction:
+            # Every event was a duplicate and there was no meta to write.
+            self.conn.rollback()
+
+        next_id = first_id
+        for record in records:
+            if "id" not in record:
+                record["id"] = next_id
+                next_id += 1
+        results = []
+        for slot in slots:
+            if isinstance(slot, dict):
+                results.append(slot)
+            else:
+                index, repeat = slot
+                results.append({**records[index], "duplicate": True} if repeat else records[index])
+
+        if len(results) > len(rows):
+            metrics.count("append.duplicates", len(results) - len(rows))
+        self._remember_keys({key: stored.get(key) or records[index] for key, index in batch_keys.items()})
+        if rows:
+            metrics.count("append.events", len(rows))
+            self._head = (first_id + len(rows) - 1, prev_hash)
+            self._maybe_seal()
+        return results
+
+    def compact(self) -> int:
+        """Migrate to the dictionary-encoded layout and VACUUM; return the rows rewritten.
+
+        ``actor``, ``action``, ``target`` and ``result`` are interned into
+        ``audit_strings``; queries, hashes and verification are unaffected.
+        """
+        moved = migrate_to_compact(self.conn)
+        self.conn.execute("VACUUM")
+        if self._interned is None:
+            self._interned = {}
+        return moved
+
+    def _maybe_seal(self) -> None:
+        """Seal full blocks once ``seal_every`` rows have accumulated past the last block."""
+        if not self.seal_every or self._head is None:
+            return
+        if self._head[0] - self._sealed_through < self.seal_every:
+            return
+        last_block = get_last_block(self.conn)
+        self._sealed_through = last_block["last_id"] if last_block else 0
+        if self._head[0] - self._sealed_through >= self.seal_every:
+            self.seal_blocks(block_size=self.seal_every)
+
+    def seal_blocks(self, *, block_size: int = DEFAULT_BLOCK_SIZE, partial: bool = False) -> list[dict]:
+        """Seal unsealed rows into Merkle blocks of ``block_size`` rows and return the new headers.
+
+        Each block stores the Merkle root over its rows' event_hash values and is
+        chained to the previous block through ``prev_block_hash``. Rows that do not
+        fill a whole block stay unsealed unless ``partial`` is set. Rows archived
+        before they were sealed are read back from their segments.
+        """
+        sealed: list[dict] = []
+        last_block = None
+
+        while True:
+            # Each block is built under the write lock so concurrent sealers cannot fork the block chain.
+            begin_immediate(self.conn)
+            try:
+                last_block = get_last_block(self.conn)
+                after_id = last_block["last_id"] if last_block else 0
+                pairs = self._event_hashes(after_id=after_id, limit=block_size)
+                if not pairs or (len(pairs) < block_size and not partial):
+                    self.conn.rollback()
+                    break
+
+                header: dict[str, Any] = {
+                    "first_id": pairs[0][0],
+                    "last_id": pairs[-1][0],
+                    "size": len(pairs),
+                    "merkle_root": merkle_root([leaf_hash(event_hash) for _, event_hash in pairs]).hex(),
+                    "prev_block_hash": last_block["block_hash"] if last_block else "GENESIS",
+                    "sealed_at": _utc_now(),
+                }
+                header["block_hash"] = hash_block(**header)
+                header["id"] = insert_block(self.conn, **header)
+            except BaseException:
+                if self.conn.in_transaction:
+                    self.conn.rollback()
+                raise
+            sealed.append(header)
+
+        if last_block is not None:
+            self._sealed_through = last_block["last_id"]
+        return sealed
+
+    def prove(self, event_id: int) -> dict:
+        """Build a Merkle inclusion proof for one event from its sealed block.
+
+        Only the rows of that block are read, so the cost is independent of log size;
+        archived rows come from their segment. Raises ValueError when the event does not exist or is not sealed yet.
+        """
+        event = self._get_event(event_id)
+        if event is None:
+            raise ValueError(f"event {event_id} does not exist")
+        block = find_block(self.conn, event_id)
+        if block is None:
+            raise ValueError(f"event {event_id} is not in a sealed block yet")
+
+        pairs = self._event_hashes(after_id=block["first_id"] - 1, last_id=block["last_id"])
+        ids = [row_id for row_id, _ in pairs]
+        leaves = [leaf_hash(event_hash) for _, event_hash in pairs]
+        index = ids.index(event_id)
+        return {
+            "event": event.as_dict(),
+            "leaf_index": index,
+            "leaf_count": len(leaves),
+            "path": inclusion_proof(leaves, index),
+            "block": block,
+        }
+
+    def check_proof(self, proof: dict) -> list[str]:
+        """Check a proof on its own and against this log's stored block chain."""
+        issues = check_proof(proof)
+        block = proof["block"]
+        stored = get_block(self.conn, block["id"])
+        if stored != block:
+            issues.append(f"block {block['id']}: does not match the stored block header")
+            return issues
+
+        previous = get_block(self.conn, block["id"] - 1) if block["id"] > 1 else None
+        expected_prev = previous["block_hash"] if previous else "GENESIS"
+        if block["prev_block_hash"] != expected_prev:
+            issues.append(f"block {block['id']}: prev_block_hash does not link to block {block['id'] - 1}")
+        return issues
+
+    def _segment_path(self, segment: Mapping[str, Any]) -> str:
+        return os.path.join(os.path.dirname(os.path.abspath(self.db_path)), segment["path"])
+
+    def archive(self, before_ts: str, *, directory: str | None = None) -> dict | None:
+        """Move the oldest live rows with ``ts < before_ts`` into a read-only segment file.
+
+        The rows are written as gzip-compressed NDJSON, fsynced, and only then deleted
+        from ``audit_events`` in the same transaction that records the segment. The
+        segment keeps its first ``prev_hash`` and last ``event_hash`` so the chain
+        continues across archives. Returns the segment record, or None when no row
+        qualifies.
+        """
+        if self.db_path == ":memory:":
+            raise ValueError("in-memory databases cannot be archived")
+        id_range = get_id_range(self.conn)
+        last_id = get_archive_cutoff(self.conn, before_ts)
+        if id_range is None or last_id < id_range[0]:
+            return None
+
+        directory = directory or segment_dir(self.db_path)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, segment_filename(id_range[0], last_id))
+        summary = write_segment(path, iter_rows(self.conn, after_id=id_range[0] - 1, last_id=last_id))
+
+        db_dir = os.path.dirname(os.path.abspath(self.db_path))
+        segment = {**summary, "path": os.path.relpath(path, db_dir), "created_at": _utc_now()}
+        segment["id"] = commit_segment(self.conn, segment)
+        return segment
+
+    def _iter_archived(self, *, descending: bool = False, as_dict: bool = True, **filters: Any) -> Iterator[Any]:
+        """Yield matching archived rows, skipping segments outside the id or ts bounds.
+
+        Segment files are written in id order, so a descending read decompresses one
+        whole segment into memory before yielding its newest row.
+        """
+        convert = row_converter(as_dict)
+        segments = list_segments(self.conn)
+        after_id, before_id = filters.get("after_id"), filters.get("before_id")
+        for segment in reversed(segments) if descending else segments:
+            if after_id is not None and segment["last_id"] <= after_id:
+                continue
+            if before_id is not None and segment["first_id"] >= before_id:
+                continue
+            if not segment_overlaps(segment, filters.get("since"), filters.get("until")):
+                continue
+            rows = iter_segment(self._segment_path(segment))
+            for row in reversed(list(rows)) if descending else rows:
+                if row_matches(row, **filters):
+                    yield convert(row)
+
+    def _archived_row(self, event_id: int) -> tuple | None:
+        for segment in list_segments(self.conn):
+            if segment["first_id"] <= event_id <= segment["last_id"]:
+                path = self._segment_path(segment)
+                if not os.path.exists(path):
+                    return None
+                return next((row for row in iter_segment(path) if row[0] == event_id), None)
+        return None
+
+    def _get_event(self, event_id: int) -> AuditEvent | None:
+        """Return one event, reading its archive segment when it is no longer live."""
+        event = get_event(self.conn, event_id)
+        if event is not None:
+            return event
+        row = self._archived_row(event_id)
+        return row_converter(False)(row) if row else None
+
+    def _stored_event_hash(self, event_id: int) -> str | None:
+        stored = get_event_hash(self.conn, event_id)
+        if stored is not None:
+            return stored
+        row = self._archived_row(event_id)
+        return row[8] if row else None
+
+    def _event_hashes(self, *, after_id: int, last_id: int | None = None, limit: int = -1) -> list[tuple[int, str]]:
+        """Like ``list_event_hashes``, but rows that were archived are read from their segments."""
+        pairs: list[tuple[int, str]] = []
+        for segment in list_segments(self.conn):
+            if segment["last_id"] <= after_id or (last_id is not None and segment["first_id"] > last_id):
+                continue
+            for row in iter_segment(self._segment_path(segment)):
+                if row[0] > after_id and (last_id is None or row[0] <= last_id):
+                    pairs.append((row[0], row[8]))
+                    if len(pairs) == limit:
+                        return pairs
+        if pairs:
+            after_id = pairs[-1][0]
+        remaining = limit - len(pairs) if limit >= 0 else -1
+        return pairs + list_event_hashes(self.conn, after_id=after_id, last_id=last_id, limit=remaining)
+
+    def query(
+        self,
+        *,
+        actor: str | None = None,
+        action: str | None = None,
+        limit: int = 20,
+        after_id: int | None = None,
+        before_id: int | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        where: Sequence[str] = (),
+        as_dict: bool = True,
+    ) -> list[Any]:
+        """Return the newest matching events; ``where`` takes filters like ``context.ip=10.0.0.5``.
+
+        Events are dicts; pass ``as_dict=False`` for compact ``AuditEvent`` records.
+        """
+        filters = {
+            "after_id": after_id,
+            "before_id": before_id,
+            "since": since,
+            "until": until,
+            "where": [parse_where(expression) for expression in where],
+            "as_dict": as_dict,
+        }
+        with self.metrics.stage("query"):
+            events = query_events(self.conn, actor=actor, action=action, limit=limit, **filters)
+            if len(events) < limit:
+                # Archived ids are all older than live ones, so segments continue the page.
+                archived = self._iter_archived(descending=True, actor=actor, action=action, **filters)
+                events.extend(islice(archived, limit - len(events)))
+        self.metrics.count("query.rows", len(events))
+        return events
+
+    def iter_events(
+        self,
+        *,
+        actor: str | None = None,
+        action: str | None = None,
+        after_id: int | None = None,
+        before_id: int | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        where: Sequence[str] = (),
+        descending: bool = False,
+        chunk_size: int = 1000,
+        as_dict: bool = True,
+    ) -> Iterator[Any]:
+        """Stream matching events at constant memory using keyset cursors on id.
+
+        Archived segments are read transparently before (or, descending, after) live rows.
+        Events are dicts, or ``AuditEvent`` records with ``as_dict=False``.
+        """
+        filters = {
             "actor": actor,
             "action": action,
-            "target": target,
-            "result": result,
-            "context": context,
+            "after_id": after_id,
+            "before_id": before_id,
+            "since": since,
+            "until": until,
+            "where": [parse_where(expression) for expression in where],
+            "as_dict": as_dict,
         }
-        context_json = canonical_json(context)
-        event_hash = hash_event(event, prev_hash)
+        live = iter_events(self.conn, descending=descending, chunk_size=chunk_size, **filters)
+        archived = self._iter_archived(descending=descending, **filters)
+        return chain(live, archived) if descending else chain(archived, live)
 
-        event_id = insert_event(
-            self.conn,
-            ts=event_ts,
-            actor=actor,
-            action=action,
-            target=target,
-            result=result,
-            context_json=context_json,
-            prev_hash=prev_hash,
-            event_hash=event_hash,
-        )
+    def aggregate(
+        self,
+        *,
+        group_by: Sequence[str] = (),
+        bucket: str | None = None,
+        rate_of: str | None = None,
+        actor: str | None = None,
+        action: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        where: Sequence[str] = (),
+        top: int | None = None,
+    ) -> dict[str, Any]:
+        """Count events per group inside SQLite and return ``{"columns": [...], "rows": [...]}``.
 
-        return {"id": event_id, "event_hash": event_hash, "prev_hash": prev_hash}
+        ``group_by`` names ``actor``, ``action``, ``target``, ``result`` or
+        ``context.<key>``; ``bucket`` (minute, hour, day or month) adds a leading
+        time-bucket column. ``rate_of`` adds ``matching`` and ``rate`` columns for
+        rows whose ``result`` equals it. Rows are ordered by bucket, then by count
+        descending, and ``top`` keeps only the first rows. Archived segments are
+        aggregated one at a time in a scratch database and merged in.
+        """
+        spec = {
+            "group_by": list(group_by),
+            "bucket": bucket,
+            "rate_of": rate_of,
+            "actor": actor,
+            "action": action,
+            "since": since,
+            "until": until,
+            "where": [parse_where(expression) for expression in where],
+        }
+        width = len(group_by) + (bucket is not None)
+        totals: dict[tuple, list[int]] = {}
 
-    def query(self, *, actor: str | None = None, action: str | None = None, limit: int = 20) -> list[dict]:
-        return query_events(self.conn, actor=actor, action=action, limit=limit)
+        def merge(rows: list[tuple]) -> None:
+            for row in rows:
+                counts = totals.setdefault(row[:width], [0, 0])
+                counts[0] += row[width]
+                if rate_of is not None:
+                    counts[1] += row[width + 1]
 
-    def verify_chain(self) -> list[str]:
-        rows = self.conn.execute(
-            "SELECT id, ts, actor, action, target, result, context_json, prev_hash, event_hash "
-            "FROM audit_events ORDER BY id ASC"
-        ).fetchall()
+        with self.metrics.stage("aggregate"):
+            merge(aggregate_events(self.conn, **spec))
+            for segment in list_segments(self.conn):
+                if segment_overlaps(segment, since, until):
+                    merge(aggregate_segment(self._segment_path(segment), **spec))
 
-        issues: list[str] = []
-        expected_prev = "GENESIS"
+        def order(item: tuple[tuple, list[int]]) -> tuple:
+            key, (count, _) = item
+            leading = (key[0],) if bucket is not None else ()
+            return (*leading, -count, *((value is None, str(value)) for value in key))
 
-        for row in rows:
-            row_id, ts, actor, action, target, result, context_json, prev_hash, event_hash = row
-            try:
-                context_obj = json.loads(context_json)
-            except json.JSONDecodeError as exc:
-                issues.append(f"row {row_id}: invalid context_json: {exc}")
-                continue
+        rows = []
+        for key, (count, matching) in sorted(totals.items(), key=order)[:top]:
+            row = [*key, count]
+            if rate_of is not None:
+                row.extend([matching, round(matching / count, 4)])
+            rows.append(row)
 
-            if prev_hash != expected_prev:
-                issues.append(
-                    f"row {row_id}: prev_hash mismatch (stored={prev_hash}, expected={expected_prev})"
-                )
+        columns = (["bucket"] if bucket is not None else []) + list(group_by) + ["count"]
+        if rate_of is not None:
+            columns.extend(["matching", "rate"])
+        return {"columns": columns, "rows": rows}
+
+    def explain_query(
+        self,
+        *,
+        actor: str | None = None,
+        action: str | None = None,
+        limit: int = 20,
+        where: Sequence[str] = (),
+    ) -> list[str]:
+        conditions = [parse_where(expression) for expression in where]
+        return explain_query(self.conn, actor=actor, action=action, limit=limit, where=conditions)
+
+    def index_context_key(self, key: str) -> str:
+        """Add an expression index for ``context.<key>`` filters; returns the index name."""
+        return create_context_index(self.conn, key)
+
+    def drop_context_index(self, key: str) -> bool:
+        return drop_context_index(self.conn, key)
+
+    def context_indexes(self) -> list[str]:
+        return list_context_indexes(self.conn)
+
+    def iter_verify(
+        self,
+        report: VerifyReport,
+        *,
+        since_checkpoint: bool = False,
+        workers: int = 1,
+        max_issues: int | None = None,
+    ) -> Iterator[str]:
+        """Verify the hash chain, yielding issues as they are found and recording them on ``report``.
+
+        Rows are read in bounded chunks, so memory stays constant regardless of table size.
+
+        With ``since_checkpoint`` only rows after the newest trusted checkpoint are
+        re-hashed. The checkpoint chain and its anchor row are checked first; if either
+        fails, the issue is reported and the whole chain is verified instead.
+
+        With ``workers`` > 1 the id space is split into ranges hashed in a process
+        pool; the resulting issues are identical to the serial pass.
+
+        With ``max_issues`` the scan stops once that many issues were found and
+        ``report.truncated`` is set.
+        """
+        started = time.perf_counter()
+        after_id, expected_prev = 0, "GENESIS"
+        preamble: list[str] = []
 
-            event = {
-                "ts": ts,
-                "actor": actor,
-                "action": action,
-                "target": target,
-                "result": result,
-                "context": context_obj,
-            }
-            expected_hash = hash_event(event, prev_hash)
-            if event_hash != expected_hash:
-                issues.append(
-                    f"row {row_id}: event_hash mismatch (stored={event_hash}, expected={expected_hash})"
+        if since_checkpoint:
+            anchor, preamble = check_checkpoints(list_checkpoints(self.conn), self.checkpoint_key)
+            if anchor is not None and self._stored_event_hash(anchor["event_id"]) != anchor["event_hash"]:
+                preamble.append(
+                    f"checkpoint {anchor['id']}: row {anchor['event_id']} event_hash changed since checkpoint"
                 )
+                anchor = None
+            if anchor is not None:
+                report.checkpoint_id = anchor["id"]
+                after_id, expected_prev = anchor["event_id"], anchor["event_hash"]
+                report.last_id, report.last_hash = after_id, expected_prev
 
-            expected_prev = event_hash
+        # Archived segments hold the oldest ids, so they are checked first. A segment
+        # whose file is missing or altered is reported and skipped; the broken link
+        # then shows up on the next row.
+        segments = [segment for segment in list_segments(self.conn) if segment["last_id"] > after_id]
+        readable: list[str] = []
+        for segment in segments:
+            path = self._segment_path(segment)
+            if not os.path.exists(path):
+                preamble.append(f"segment {segment['id']}: file {segment['path']} is missing")
+            elif file_sha256(path) != segment["file_sha256"]:
+                preamble.append(f"segment {segment['id']}: file_sha256 mismatch for {segment['path']}")
+            else:
+                readable.append(path)
+        archived = (row for path in readable for row in iter_segment(path) if row[0] > after_id)
+        live_after = max([after_id] + [segment["last_id"] for segment in segments])
 
-        return issues
+        issues: Iterator[str]
+        id_range = get_id_range(self.conn, live_after) if workers > 1 and self.db_path != ":memory:" else None
+        if id_range is not None:
+            issues = self._check_archived_then_parallel(archived, expected_prev, id_range, workers, report)
+        else:
+            issues = check_rows(chain(archived, iter_rows(self.conn, after_id=live_after)), expected_prev, report)
+
+        try:
+            for issue in chain(preamble, issues):
+                report.issues.append(issue)
+                yield issue
+                if max_issues is not None and len(report.issues) >= max_issues:
+                    report.truncated = True
+                    return
+        finally:
+            issues.close()
+            self.metrics.observe("verify", time.perf_counter() - started)
+            self.metrics.count("verify.rows", report.rows_scanned)
+            self.metrics.count("verify.issues", len(report.issues))
+
+    def _check_archived_then_parallel(
+        self,
+        archived: Iterator[tuple],
+        expected_prev: str,
+        id_range: tuple[int, int],
+        workers: int,
+        report: VerifyReport,
+    ) -> Iterator[str]:
+        yield from check_rows(archived, expected_prev, report)
+        yield from check_rows_parallel(
+            self.db_path,
+            first_id=id_range[0],
+            last_id=id_range[1],
+            expected_prev=report.last_hash,
+            workers=workers,
+            report=report,
+        )
+
+    def verify(
+        self, *, since_checkpoint: bool = False, workers: int = 1, max_issues: int | None = None
+    ) -> VerifyReport:
+        """Verify the hash chain and return the completed report; see ``iter_verify``."""
+        report = VerifyReport()
+        for _ in self.iter_verify(
+            report, since_checkpoint=since_checkpoint, workers=workers, max_issues=max_issues
+        ):
+            pass
+        return report
+
+    def verify_chain(self, *, since_checkpoint: bool = False, workers: int = 1) -> list[str]:
+        return self.verify(since_checkpoint=since_checkpoint, workers=workers).issues
+
+    def record_checkpoint(self, report: VerifyReport) -> int | None:
+        """Persist a checkpoint at the last row covered by a clean report.
+
+        Returns the new checkpoint id, or None when the report has issues or covers
+        no rows beyond the previous checkpoint.
+        """
+        checkpoints = list_checkpoints(self.conn)
+        if not report.ok or report.last_id == 0:
+            return None
+        if checkpoints and checkpoints[-1]["event_id"] >= report.last_id:
+            return None
+
+        created_at = _utc_now()
+        prev_checkpoint_hash = checkpoints[-1]["checkpoint_hash"] if checkpoints else "GENESIS"
+        checkpoint_hash = hash_checkpoint(
+            event_id=report.last_id,
+            event_hash=report.last_hash,
+            created_at=created_at,
+            prev_checkpoint_hash=prev_checkpoint_hash,
+            key=self.checkpoint_key,
+        )
+        return insert_checkpoint(
+            self.conn,
+            created_at=created_at,
+            event_id=report.last_id,
+            event_hash=report.last_hash,
+            prev_checkpoint_hash=prev_checkpoint_hash,
+            checkpoint_hash=checkpoint_hash,
+        )
@@ -0,0 +1,261 @@
+"""Partitioned audit logs: one hash chain per shard, tied together by a manifest."""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Iterable, Mapping
+
+from auditlog.hashing import canonical_json, sha256_hex
+from auditlog.service import AuditLogger, _utc_now
+from auditlog.storage import (
+    connect,
+    get_chain_head,
+    get_event_hash,
+    get_meta,
+    init_manifest,
+    insert_manifest_entry,
+    list_manifest_entries,
+    list_shards,
+    register_shard,
+    set_meta,
+)
+from auditlog.verify import VerifyReport
+
+PARTITIONS = ("tenant", "day", "month")
+MANIFEST_FILE = "manifest.db"
+
+_SHARD_NAME_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+
+def hash_manifest_entry(*, created_at: str, heads_json: str, prev_entry_hash: str) -> str:
+    """Hash a manifest entry over the recorded shard heads, chained to the previous entry."""
+    return sha256_hex(
+        canonical_json({"created_at": created_at, "heads": heads_json, "prev_entry_hash": prev_entry_hash})
+    )
+
+
+def _verify_shard(db_path: str, **logger_kwargs: Any) -> VerifyReport:
+    logger = AuditLogger(db_path, **logger_kwargs)
+    try:
+        return logger.verify()
+    finally:
+        logger.conn.close()
+
+
+class ShardedAuditLogger:
+    """Spread events over per-shard SQLite files, each with its own hash chain.
+
+    Shards are keyed by tenant (the caller passes ``shard``) or by the event's
+    ``ts`` day or month. Writers to different shards never contend: each shard has
+    its own file and lock, and ``append_many`` writes shard groups in parallel.
+    ``seal_manifest`` records every shard head in a hash-chained manifest, which
+    serves as the global tamper-evidence root.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        *,
+        partition: str | None = None,
+        max_workers: int = 4,
+        **logger_kwargs: Any,
+    ) -> None:
+        os.makedirs(os.path.join(root, "shards"), exist_ok=True)
+        self.root = root
+        self.max_workers = max_workers
+        self._logger_kwargs = logger_kwargs
+        self._manifest_lock = threading.Lock()
+        self._manifest = connect(os.path.join(root, MANIFEST_FILE), check_same_thread=False)
+        init_manifest(self._manifest)
+
+        stored = get_meta(self._manifest, "partition")
+        if partition is not None and partition not in PARTITIONS:
+            raise ValueError(f"partition must be one of {', '.join(PARTITIONS)}")
+        if stored is not None and partition is not None and stored != partition:
+            raise ValueError(f"{root} is partitioned by {stored}, not {partition}")
+        self.partition = stored or partition or "tenant"
+        set_meta(self._manifest, "partition", self.partition)
+
+        self._loggers: dict[str, tuple[AuditLogger, threading.Lock]] = {}
+
+    def shard_names(self) -> list[str]:
+        with self._manifest_lock:
+            return [name for name, _ in list_shards(self._manifest)]
+
+    def _shard_name(self, event: Mapping[str, Any], shard: str | None) -> str:
+        if self.partition == "tenant":
+            name = shard
+            if name is None:
+                raise ValueError("tenant-partitioned logs need a shard name for every event")
+        else:
+            name = event["ts"][:10] if self.partition == "day" else event["ts"][:7]
+        if not _SHARD_NAME_RE.match(name):
+            raise ValueError(f"invalid shard name {name!r}")
+        return name
+
+    def _shard(self, name: str) -> tuple[AuditLogger, threading.Lock]:
+        with self._manifest_lock:
+            if name not in self._loggers:
+                path = os.path.join(self.root, "shards", f"{name}.db")
+                logger = AuditLogger(path, check_same_thread=False, **self._logger_kwargs)
+                relpath = os.path.relpath(path, self.root)
+                register_shard(self._manifest, name=name, path=relpath, created_at=_utc_now())
+                self._loggers[name] = (logger, threading.Lock())
+            return self._loggers[name]
+
+    def append(
+        self,
+        *,
+        actor: str,
+        action: str,
+        target: str,
+        result: str,
+        context: dict,
+        ts: str | None = None,
+        shard: str | None = None,
+    ) -> dict:
+        event = {
+            "ts": ts or _utc_now(),
+            "actor": actor,
+            "action": action,
+            "target": target,
+            "result": result,
+            "context": context,
+        }
+        name = self._shard_name(event, shard)
+        logger, lock = self._shard(name)
+        with lock:
+            record = logger.append(**event)
+        return {**record, "shard": name}
+
+    def append_many(self, events: Iterable[Mapping[str, Any]]) -> list[dict]:
+        """Append events, writing each shard's group in its own thread and transaction.
+
+        Events may carry a ``shard`` key; results come back in input order.
+        """
+        groups: dict[str, list[tuple[int, dict]]] = {}
+        count = 0
+        for index, item in enumerate(events):
+            event = {key: value for key, value in item.items() if key != "shard"}
+            event["ts"] = event.get("ts") or _utc_now()
+            groups.setdefault(self._shard_name(event, item.get("shard")), []).append((index, event))
+            count = index + 1
+
+        def write(name: str) -> list[tuple[int, dict]]:
+            logger, lock = self._shard(name)
+            with lock:
+                records = logger.append_many(event for _, event in groups[name])
+            return [(index, {**record, "shard": name}) for (index, _), record in zip(groups[name], records)]
+
+        results: list[dict] = [{}] * count
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for written in pool.map(write, list(groups)):
+                for index, record in written:
+                    results[index] = record
+        return results
+
+    def query(
+        self,
+        *,
+        shard: str | None = None,
+        actor: str | None = None,
+        action: str | None = None,
+        limit: int = 20,
+    ) -> list[dict]:
+        """Return the newest matching events across shards, ordered by ts then shard and id."""
+        names = self.shard_names()
+        if shard is not None:
+            names = [name for name in names if name == shard]
+
+        def fetch(name: str) -> list[dict]:
+            logger, lock = self._shard(name)
+            with lock:
+                return [
+                    {**event, "shard": name}
+                    for event in logger.query(actor=actor, action=action, limit=limit, as_dict=True)
+                ]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            events = [event for batch in pool.map(fetch, names) for event in batch]
+        events.sort(key=lambda event: (event["ts"], event["shard"], event["id"]), reverse=True)
+        return events[:limit]
+
+    def verify(self) -> dict[str, VerifyReport]:
+        """Verify every shard's chain in a process pool and return reports by shard."""
+        with self._manifest_lock:
+            shards = list_shards(self._manifest)
+        paths = [os.path.join(self.root, path) for _, path in shards]
+        # Workers open shards like the writer did (checkpoint key, profile, pragmas);
+        # metrics stay in this process.
+        kwargs = {name: value for name, value in self._logger_kwargs.items() if name != "metrics"}
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            reports = list(pool.map(partial(_verify_shard, **kwargs), paths))
+        return {name: report for (name, _), report in zip(shards, reports)}
+
+    def verify_chain(self) -> list[str]:
+        """Verify every shard and the manifest; issues are prefixed with their shard."""
+        issues = self.check_manifest()
+        for name, report in self.verify().items():
+            issues.extend(f"shard {name}: {issue}" for issue in report.issues)
+        return issues
+
+    def seal_manifest(self) -> dict:
+        """Record the current head of every shard as a new, chained manifest entry."""
+        heads: dict[str, list[Any]] = {}
+        for name in self.shard_names():
+            logger, lock = self._shard(name)
+            with lock:
+                heads[name] = list(get_chain_head(logger.conn))
+
+        with self._manifest_lock:
+            entries = list_manifest_entries(self._manifest)
+            prev_entry_hash = entries[-1]["entry_hash"] if entries else "GENESIS"
+            created_at = _utc_now()
+            heads_json = canonical_json(heads)
+            entry_hash = hash_manifest_entry(
+                created_at=created_at, heads_json=heads_json, prev_entry_hash=prev_entry_hash
+            )
+            entry_id = insert_manifest_entry(
+                self._manifest,
+                created_at=created_at,
+                heads_json=heads_json,
+                prev_entry_hash=prev_entry_hash,
+                entry_hash=entry_hash,
+            )
+        return {"id": entry_id, "created_at": created_at, "heads": heads, "entry_hash": entry_hash}
+
+    def check_manifest(self) -> list[str]:
+        """Re-hash the manifest chain and confirm each recorded shard head is still stored."""
+        issues: list[str] = []
+        with self._manifest_lock:
+            entries = list_manifest_entries(self._manifest)
+            known = {name for name, _ in list_shards(self._manifest)}
+
+        prev_entry_hash = "GENESIS"
+        for entry in entries:
+            expected = hash_manifest_entry(
+                created_at=entry["created_at"], heads_json=entry["heads_json"], prev_entry_hash=prev_entry_hash
+            )
+            if entry["prev_entry_hash"] != prev_entry_hash or entry["entry_hash"] != expected:
+                issues.append(f"manifest entry {entry['id']}: entry_hash mismatch")
+            prev_entry_hash = entry["entry_hash"]
+
+            for name, (head_id, head_hash) in json.loads(entry["heads_json"]).items():
+                if name not in known:
+                    issues.append(f"manifest entry {entry['id']}: shard {name} is missing")
+                    continue
+                if head_id == 0:
+                    continue
+                logger, lock = self._shard(name)
+                with lock:
+                    stored = get_event_hash(logger.conn, head_id)
+                if stored != head_hash:
+                    issues.append(
+                        f"manifest entry {entry['id']}: shard {name} row {head_id} no longer matches recorded head"
+                    )
+        return issues
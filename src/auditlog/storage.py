@@ -2,9 +2,19 @@
 
 from __future__ import annotations
 
+import json
+import random
+import re
 import sqlite3
-from typing import Any
+import time
+from functools import partial
+from typing import Any, Callable, Iterator, Mapping, Sequence
 
+from auditlog.events import AuditEvent
+from auditlog.metrics import NULL_METRICS, Metrics, NullMetrics
+
+# Bump whenever init_db creates something new, so existing databases pick it up.
+SCHEMA_VERSION = 3
 
 CREATE_TABLE_SQL = """
 CREATE TABLE IF NOT EXISTS audit_events (
@@ -20,22 +30,453 @@ CREATE TABLE IF NOT EXISTS audit_events (
 )
 """
 
+CREATE_CHECKPOINTS_SQL = """
+CREATE TABLE IF NOT EXISTS audit_checkpoints (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT,
+    event_id INTEGER,
+    event_hash TEXT,
+    prev_checkpoint_hash TEXT,
+    checkpoint_hash TEXT
+)
+"""
+
+CREATE_INDEXES_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_audit_events_actor_id ON audit_events (actor, id)",
+    "CREATE INDEX IF NOT EXISTS idx_audit_events_action_id ON audit_events (action, id)",
+    "CREATE INDEX IF NOT EXISTS idx_audit_events_ts ON audit_events (ts)",
+    "CREATE INDEX IF NOT EXISTS idx_audit_blocks_last_id ON audit_blocks (last_id)",
+)
+
+CREATE_BLOCKS_SQL = """
+CREATE TABLE IF NOT EXISTS audit_blocks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    first_id INTEGER,
+    last_id INTEGER,
+    size INTEGER,
+    merkle_root TEXT,
+    prev_block_hash TEXT,
+    block_hash TEXT,
+    sealed_at TEXT
+)
+"""
+
+CREATE_SEGMENTS_SQL = """
+CREATE TABLE IF NOT EXISTS audit_segments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT,
+    first_id INTEGER,
+    last_id INTEGER,
+    row_count INTEGER,
+    first_prev_hash TEXT,
+    last_event_hash TEXT,
+    first_ts TEXT,
+    last_ts TEXT,
+    file_sha256 TEXT,
+    created_at TEXT,
+    min_ts TEXT,
+    max_ts TEXT
+)
+"""
+
+# Columns added to audit_segments after its first release; older rows hold NULL.
+SEGMENT_ADDED_COLUMNS = ("min_ts TEXT", "max_ts TEXT")
+
+# The compact layout interns actor/action/target/result into audit_strings and
+# keeps integer ids in audit_events_compact. A view named audit_events joins them
+# back, so readers see the same columns in either layout.
+CREATE_COMPACT_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS audit_strings (
+        id INTEGER PRIMARY KEY,
+        value TEXT NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS audit_events_compact (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ts TEXT,
+        actor_id INTEGER NOT NULL REFERENCES audit_strings (id),
+        action_id INTEGER NOT NULL REFERENCES audit_strings (id),
+        target_id INTEGER NOT NULL REFERENCES audit_strings (id),
+        result_id INTEGER NOT NULL REFERENCES audit_strings (id),
+        context_json TEXT,
+        prev_hash TEXT,
+        event_hash TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_audit_events_compact_actor_id ON audit_events_compact (actor_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_audit_events_compact_action_id ON audit_events_compact (action_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_audit_events_compact_ts ON audit_events_compact (ts)",
+)
+
+CREATE_COMPACT_VIEW_SQL = """
+CREATE VIEW audit_events AS
+SELECT
+    e.id AS id,
+    e.ts AS ts,
+    a.value AS actor,
+    b.value AS action,
+    t.value AS target,
+    r.value AS result,
+    e.context_json AS context_json,
+    e.prev_hash AS prev_hash,
+    e.event_hash AS event_hash
+FROM audit_events_compact AS e
+JOIN audit_strings AS a ON a.id = e.actor_id
+JOIN audit_strings AS b ON b.id = e.action_id
+JOIN audit_strings AS t ON t.id = e.target_id
+JOIN audit_strings AS r ON r.id = e.result_id
+"""
+
+CREATE_META_SQL = """
+CREATE TABLE IF NOT EXISTS audit_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+)
+"""
+
+# Idempotency keys live beside the events rather than in them, so the row layout,
+# the compact view, archived segments and event hashes are all unaffected.
+CREATE_IDEMPOTENCY_SQL = """
+CREATE TABLE IF NOT EXISTS audit_idempotency (
+    key TEXT PRIMARY KEY,
+    event_id INTEGER NOT NULL,
+    prev_hash TEXT NOT NULL,
+    event_hash TEXT NOT NULL
+) WITHOUT ROWID
+"""
+
+PRAGMA_NAMES = ("journal_mode", "synchronous", "mmap_size", "cache_size", "busy_timeout")
+
+PROFILES: dict[str, dict[str, str | int]] = {
+    # fsync on every commit; WAL still lets readers run alongside the writer.
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "mmap_size": 0,
+        "cache_size": -16_000,
+        "busy_timeout": 5_000,
+    },
+    # WAL with NORMAL sync stays consistent on crash but may lose the last commits on power loss.
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64_000,
+        "busy_timeout": 5_000,
+    },
+    # No fsync at all; for bulk loads and benchmarks that can be re-run.
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "mmap_size": 1024 * 1024 * 1024,
+        "cache_size": -256_000,
+        "busy_timeout": 5_000,
+    },
+}
 
-def connect(db_path: str) -> sqlite3.Connection:
-    """Open a SQLite connection."""
-    return sqlite3.connect(db_path)
+_PRAGMA_VALUE_RE = re.compile(r"^-?\d+$|^[A-Za-z]+$")
+
+INSERT_EVENT_SQL = """
+INSERT INTO audit_events (
+    ts, actor, action, target, result, context_json, prev_hash, event_hash
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_COMPACT_EVENT_SQL = """
+INSERT INTO audit_events_compact (
+    ts, actor_id, action_id, target_id, result_id, context_json, prev_hash, event_hash
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+EVENT_COLUMNS = AuditEvent._fields
+
+BLOCK_COLUMNS = ("id", "first_id", "last_id", "size", "merkle_root", "prev_block_hash", "block_hash", "sealed_at")
+
+
+def _row_to_dict(row: tuple) -> dict[str, Any]:
+    return dict(zip(EVENT_COLUMNS, row))
+
+
+# tuple.__new__ skips the length check in AuditEvent._make; rows always have every column.
+_make_event = partial(tuple.__new__, AuditEvent)
+
+
+def row_converter(as_dict: bool = True) -> Callable[[tuple], AuditEvent | dict[str, Any]]:
+    """Return the function turning a stored row into a dict (or an ``AuditEvent``)."""
+    return _row_to_dict if as_dict else _make_event
+
+
+def resolve_pragmas(profile: str | None = None, pragmas: Mapping[str, str | int] | None = None) -> dict[str, str | int]:
+    """Merge a named connection profile with explicit pragma overrides."""
+    if profile is not None and profile not in PROFILES:
+        raise ValueError(f"unknown profile {profile!r}; expected one of {', '.join(PROFILES)}")
+    resolved: dict[str, str | int] = dict(PROFILES[profile]) if profile else {}
+    for name, value in (pragmas or {}).items():
+        if name not in PRAGMA_NAMES:
+            raise ValueError(f"unsupported pragma {name!r}; expected one of {', '.join(PRAGMA_NAMES)}")
+        if not _PRAGMA_VALUE_RE.match(str(value)):
+            raise ValueError(f"invalid value for pragma {name!r}: {value!r}")
+        resolved[name] = value
+    return resolved
+
+
+def connect(
+    db_path: str,
+    *,
+    pragmas: Mapping[str, str | int] | None = None,
+    check_same_thread: bool = True,
+) -> sqlite3.Connection:
+    """Open a SQLite connection, applying validated pragmas from ``resolve_pragmas``.
+
+    Pass ``check_same_thread=False`` only when the caller serializes access itself.
+    """
+    conn = sqlite3.connect(db_path, check_same_thread=check_same_thread)
+    for name, value in (pragmas or {}).items():
+        conn.execute(f"PRAGMA {name} = {value}").fetchall()
+    return conn
+
+
+def current_pragmas(conn: sqlite3.Connection) -> dict[str, str | int]:
+    """Return the effective values of the tunable connection pragmas."""
+    return {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in PRAGMA_NAMES}
 
 
 def init_db(conn: sqlite3.Connection) -> None:
-    """Create the audit_events table when it does not exist."""
+    """Create tables and query indexes when they do not exist.
+
+    Indexes are created with IF NOT EXISTS, so opening an older database adds them.
+    In the compact layout ``audit_events`` is a view and its indexes live on
+    ``audit_events_compact`` instead. Databases already stamped with the current
+    ``SCHEMA_VERSION`` in ``PRAGMA user_version`` are left untouched, so opening
+    one costs a single read and no write transaction.
+    """
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return
+    compact = is_compact(conn)
     conn.execute(CREATE_TABLE_SQL)
+    conn.execute(CREATE_CHECKPOINTS_SQL)
+    conn.execute(CREATE_BLOCKS_SQL)
+    conn.execute(CREATE_SEGMENTS_SQL)
+    segment_columns = {row[1] for row in conn.execute("PRAGMA table_info(audit_segments)")}
+    for column in SEGMENT_ADDED_COLUMNS:
+        if column.split()[0] not in segment_columns:
+            conn.execute(f"ALTER TABLE audit_segments ADD COLUMN {column}")
+    conn.execute(CREATE_META_SQL)
+    conn.execute(CREATE_IDEMPOTENCY_SQL)
+    for statement in CREATE_INDEXES_SQL:
+        if not (compact and " ON audit_events " in statement):
+            conn.execute(statement)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+
+
+def is_compact(conn: sqlite3.Connection) -> bool:
+    """Return True when ``audit_events`` is the dictionary-encoded view."""
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = 'audit_events'").fetchone()
+    return row is not None and row[0] == "view"
+
+
+def migrate_to_compact(conn: sqlite3.Connection) -> int:
+    """Rewrite ``audit_events`` into the dictionary-encoded layout in one transaction.
+
+    Ids, hashes and the AUTOINCREMENT sequence carry over unchanged, so the chain and
+    any checkpoints, blocks or segments stay valid. Returns the number of rows moved;
+    run ``VACUUM`` afterwards to hand the freed pages back to the filesystem.
+    """
+    if is_compact(conn):
+        return 0
+    with conn:
+        for statement in CREATE_COMPACT_SQL:
+            conn.execute(statement)
+        for column in ("actor", "action", "target", "result"):
+            conn.execute(
+                f"INSERT OR IGNORE INTO audit_strings (value) SELECT DISTINCT {column} FROM audit_events"
+            )
+        cursor = conn.execute(
+            """
+            INSERT INTO audit_events_compact (
+                id, ts, actor_id, action_id, target_id, result_id, context_json, prev_hash, event_hash
+            )
+            SELECT
+                e.id, e.ts, a.id, b.id, t.id, r.id, e.context_json, e.prev_hash, e.event_hash
+            FROM audit_events AS e
+            JOIN audit_strings AS a ON a.value = e.actor
+            JOIN audit_strings AS b ON b.value = e.action
+            JOIN audit_strings AS t ON t.value = e.target
+            JOIN audit_strings AS r ON r.value = e.result
+            ORDER BY e.id
+            """
+        )
+        # Archived or deleted ids must never be handed out again.
+        conn.execute("DELETE FROM sqlite_sequence WHERE name = 'audit_events_compact'")
+        conn.execute(
+            "INSERT INTO sqlite_sequence (name, seq) "
+            "SELECT 'audit_events_compact', seq FROM sqlite_sequence WHERE name = 'audit_events'"
+        )
+        conn.execute("DROP TABLE audit_events")
+        conn.execute(CREATE_COMPACT_VIEW_SQL)
+        # Dropping the table dropped its declared context indexes too.
+        for key in list_context_indexes(conn):
+            _create_context_index(conn, "$." + key)
+    return cursor.rowcount
+
+
+def intern_values(conn: sqlite3.Connection, values: set[str], interned: Mapping[str, int]) -> dict[str, int]:
+    """Return dictionary ids for ``values`` missing from ``interned``, adding new strings.
+
+    Call inside the write transaction; callers cache the result only after commit.
+    """
+    added: dict[str, int] = {}
+    for value in values:
+        if value in interned:
+            continue
+        conn.execute("INSERT OR IGNORE INTO audit_strings (value) VALUES (?)", (value,))
+        added[value] = conn.execute("SELECT id FROM audit_strings WHERE value = ?", (value,)).fetchone()[0]
+    return added
+
+
+def get_meta(conn: sqlite3.Connection, key: str) -> str | None:
+    """Return a value from the audit_meta key/value table."""
+    row = conn.execute("SELECT value FROM audit_meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def set_meta(conn: sqlite3.Connection, key: str, value: str) -> None:
+    """Store a value in the audit_meta key/value table, skipping the write when unchanged."""
+    if get_meta(conn, key) == value:
+        return
+    conn.execute("INSERT OR REPLACE INTO audit_meta (key, value) VALUES (?, ?)", (key, value))
     conn.commit()
 
 
 def get_last_hash(conn: sqlite3.Connection) -> str:
     """Return the hash from the newest row or GENESIS when table is empty."""
-    row = conn.execute("SELECT event_hash FROM audit_events ORDER BY id DESC LIMIT 1").fetchone()
-    return row[0] if row else "GENESIS"
+    return get_chain_head(conn)[1]
+
+
+def get_chain_head(conn: sqlite3.Connection) -> tuple[int, str]:
+    """Return ``(id, event_hash)`` of the newest row, or ``(0, "GENESIS")`` when empty.
+
+    When every row has been archived, the head is the last archived segment's tail.
+    """
+    row = conn.execute("SELECT id, event_hash FROM audit_events ORDER BY id DESC LIMIT 1").fetchone()
+    if row is None:
+        row = conn.execute(
+            "SELECT last_id, last_event_hash FROM audit_segments ORDER BY last_id DESC LIMIT 1"
+        ).fetchone()
+    return (int(row[0]), row[1]) if row else (0, "GENESIS")
+
+
+def get_id_range(conn: sqlite3.Connection, after_id: int = 0) -> tuple[int, int] | None:
+    """Return ``(min_id, max_id)`` of rows with id greater than ``after_id``, or None."""
+    row = conn.execute("SELECT MIN(id), MAX(id) FROM audit_events WHERE id > ?", (after_id,)).fetchone()
+    return (int(row[0]), int(row[1])) if row[0] is not None else None
+
+
+def iter_rows(
+    conn: sqlite3.Connection,
+    *,
+    after_id: int = 0,
+    last_id: int | None = None,
+    chunk_size: int = 10_000,
+) -> Iterator[tuple]:
+    """Yield full rows in id order using keyset pagination, ``chunk_size`` rows at a time."""
+    query = (
+        "SELECT id, ts, actor, action, target, result, context_json, prev_hash, event_hash "
+        "FROM audit_events WHERE id > ?"
+    )
+    if last_id is not None:
+        query += " AND id <= ?"
+    query += " ORDER BY id ASC LIMIT ?"
+
+    while True:
+        params: tuple = (after_id, last_id, chunk_size) if last_id is not None else (after_id, chunk_size)
+        rows = conn.execute(query, params).fetchall()
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        after_id = rows[-1][0]
+
+
+def get_data_version(conn: sqlite3.Connection) -> int:
+    """Return SQLite's data_version, which changes when another connection commits."""
+    return int(conn.execute("PRAGMA data_version").fetchone()[0])
+
+
+def get_event_hash(conn: sqlite3.Connection, event_id: int) -> str | None:
+    """Return the stored event_hash for one row, or None when the row does not exist."""
+    row = conn.execute("SELECT event_hash FROM audit_events WHERE id = ?", (event_id,)).fetchone()
+    return row[0] if row else None
+
+
+def get_event(conn: sqlite3.Connection, event_id: int) -> AuditEvent | None:
+    """Return one stored row, or None when it does not exist."""
+    row = conn.execute(
+        "SELECT " + ", ".join(EVENT_COLUMNS) + " FROM audit_events WHERE id = ?", (event_id,)
+    ).fetchone()
+    return _make_event(row) if row else None
+
+
+def list_event_hashes(
+    conn: sqlite3.Connection, *, after_id: int, last_id: int | None = None, limit: int = -1
+) -> list[tuple[int, str]]:
+    """Return ``(id, event_hash)`` pairs after ``after_id`` (up to ``last_id``) in id order."""
+    query = "SELECT id, event_hash FROM audit_events WHERE id > ?"
+    params: list[Any] = [after_id]
+    if last_id is not None:
+        query += " AND id <= ?"
+        params.append(last_id)
+    query += " ORDER BY id ASC LIMIT ?"
+    params.append(limit)
+    return conn.execute(query, params).fetchall()
+
+
+# Attempts and base delay for taking the write lock once SQLite's own busy timeout
+# has run out; the delay doubles per attempt, with jitter so writers spread out.
+WRITE_LOCK_ATTEMPTS = 8
+WRITE_LOCK_BACKOFF = 0.005
+
+
+def begin_immediate(
+    conn: sqlite3.Connection, *, attempts: int = WRITE_LOCK_ATTEMPTS, backoff: float = WRITE_LOCK_BACKOFF
+) -> None:
+    """Start a write transaction that holds SQLite's write lock from the first statement.
+
+    Reading the chain head after this and inserting before commit is atomic with
+    respect to other connections and processes, so concurrent appends cannot fork
+    the chain. Retries "database is locked" errors with exponential backoff and
+    re-raises the last one. Does nothing if a transaction is already open.
+    """
+    if conn.in_transaction:
+        return
+    for attempt in range(attempts):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            return
+        except sqlite3.OperationalError as exc:
+            busy = "locked" in str(exc) or "busy" in str(exc)
+            if not busy or attempt == attempts - 1:
+                raise
+            time.sleep(backoff * 2**attempt * (0.5 + random.random()))
+
+
+def find_idempotency_keys(conn: sqlite3.Connection, keys: Sequence[str]) -> dict[str, dict[str, Any]]:
+    """Return ``{key: {"id", "event_hash", "prev_hash"}}`` for the keys already stored."""
+    found: dict[str, dict[str, Any]] = {}
+    for offset in range(0, len(keys), 500):
+        chunk = keys[offset : offset + 500]
+        rows = conn.execute(
+            "SELECT key, event_id, event_hash, prev_hash FROM audit_idempotency WHERE key IN ("
+            + ", ".join("?" * len(chunk))
+            + ")",
+            chunk,
+        )
+        for key, event_id, event_hash, prev_hash in rows:
+            found[key] = {"id": event_id, "event_hash": event_hash, "prev_hash": prev_hash}
+    return found
 
 
 def insert_event(
@@ -49,28 +490,203 @@ def insert_event(
     context_json: str,
     prev_hash: str,
     event_hash: str,
+    interned: dict[str, int] | None = None,
+    metrics: Metrics | NullMetrics = NULL_METRICS,
+    idempotency_key: str | None = None,
 ) -> int:
-    """Insert a new audit event and return its row id."""
-    cursor = conn.execute(
-        """
-        INSERT INTO audit_events (
-            ts, actor, action, target, result, context_json, prev_hash, event_hash
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (ts, actor, action, target, result, context_json, prev_hash, event_hash),
-    )
-    conn.commit()
+    """Insert a new audit event and return its row id.
+
+    Pass ``interned`` (a value-to-id cache) when the database uses the compact layout.
+    """
+    row = (ts, actor, action, target, result, context_json, prev_hash, event_hash)
+    if interned is not None or idempotency_key is not None:
+        return insert_events(conn, [row], interned=interned, metrics=metrics, keys=[idempotency_key])
+    with metrics.stage("append.insert"):
+        cursor = conn.execute(INSERT_EVENT_SQL, row)
+    with metrics.stage("append.commit"):
+        conn.commit()
     return int(cursor.lastrowid)
 
 
-def query_events(
+def insert_events(
     conn: sqlite3.Connection,
+    rows: Sequence[tuple[str, ...]],
+    *,
+    interned: dict[str, int] | None = None,
+    metrics: Metrics | NullMetrics = NULL_METRICS,
+    meta: Mapping[str, str] | None = None,
+    keys: Sequence[str | None] | None = None,
+) -> int:
+    """Insert a batch of audit events in one transaction and return the first row id.
+
+    Each row is ``(ts, actor, action, target, result, context_json, prev_hash, event_hash)``.
+    Ids are contiguous because the batch is written while holding the write lock.
+    With ``interned``, field values are dictionary-encoded and the cache is updated
+    once the transaction commits. ``meta`` entries are written to audit_meta and
+    ``keys`` (one idempotency key or None per row) to audit_idempotency in the same
+    transaction. Insert and commit time are recorded separately.
+    """
+    if not rows:
+        if meta:
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO audit_meta (key, value) VALUES (?, ?)", meta.items())
+        return 0
+    added: dict[str, int] = {}
+    try:
+        with metrics.stage("append.insert"):
+            if interned is None:
+                conn.executemany(INSERT_EVENT_SQL, rows)
+            else:
+                added = intern_values(conn, {value for row in rows for value in row[1:5]}, interned)
+                ids = {**interned, **added}
+                conn.executemany(
+                    INSERT_COMPACT_EVENT_SQL,
+                    ((row[0], ids[row[1]], ids[row[2]], ids[row[3]], ids[row[4]], *row[5:]) for row in rows),
+                )
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            if keys:
+                first_id = last_id - len(rows) + 1
+                conn.executemany(
+                    "INSERT INTO audit_idempotency (key, event_id, prev_hash, event_hash) VALUES (?, ?, ?, ?)",
+                    (
+                        (key, first_id + offset, row[6], row[7])
+                        for offset, (key, row) in enumerate(zip(keys, rows))
+                        if key is not None
+                    ),
+                )
+            if meta:
+                conn.executemany("INSERT OR REPLACE INTO audit_meta (key, value) VALUES (?, ?)", meta.items())
+        with metrics.stage("append.commit"):
+            conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    if interned is not None:
+        interned.update(added)
+    return int(last_id) - len(rows) + 1
+
+
+Condition = tuple[str, str, Any]
+
+WHERE_OPERATORS = ("!=", ">=", "<=", "=", ">", "<")
+
+_WHERE_RE = re.compile(r"^context((?:\.[A-Za-z_][A-Za-z0-9_]*)+)\s*(!=|>=|<=|=|>|<)\s*(.*)$", re.DOTALL)
+_CONTEXT_KEY_RE = re.compile(r"^(?:context\.)?([A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*)$")
+
+
+def parse_where(expression: str) -> Condition:
+    """Parse ``context.<key>[.<key>...]<op><value>`` into ``(json_path, op, value)``.
+
+    The value is read as JSON when it parses to a scalar (``1000``, ``true``,
+    ``"123"``) and taken verbatim otherwise, so ``context.ip=10.0.0.5`` compares
+    strings. ``null`` only works with ``=`` and ``!=``, which test for a null or
+    missing key (``IS NULL``) and for a present non-null value. Raises ValueError
+    for anything else.
+    """
+    match = _WHERE_RE.match(expression.strip())
+    if match is None:
+        raise ValueError(
+            f"invalid filter {expression!r}; expected context.<key><op><value> with op one of "
+            + " ".join(WHERE_OPERATORS)
+        )
+    keys, op, raw = match.groups()
+    try:
+        value = json.loads(raw)
+    except json.JSONDecodeError:
+        value = raw
+    if isinstance(value, (dict, list)):
+        value = raw
+    if value is None and op not in ("=", "!="):
+        raise ValueError(f"invalid filter {expression!r}; null can only be compared with = or !=")
+    return "$" + keys, op, value
+
+
+def context_path(key: str) -> str:
+    """Return the JSON path for a context key such as ``ip`` or ``context.geo.country``."""
+    match = _CONTEXT_KEY_RE.match(key.strip())
+    if match is None:
+        raise ValueError(f"invalid context key {key!r}; use dotted identifiers like ip or geo.country")
+    return "$." + match.group(1)
+
+
+def _context_expr(path: str) -> str:
+    return f"json_extract(context_json, '{path}')"
+
+
+def _context_index_name(path: str) -> str:
+    # "_" becomes "_0" before "." becomes "__", so distinct keys such as a__b and
+    # a.b can never share an index name.
+    return "idx_audit_events_ctx_" + path[2:].replace("_", "_0").replace(".", "__")
+
+
+def _legacy_context_index_name(path: str) -> str:
+    """Name used before underscores were escaped; such indexes may still exist."""
+    return "idx_audit_events_ctx_" + path[2:].replace(".", "__")
+
+
+def list_context_indexes(conn: sqlite3.Connection) -> list[str]:
+    """Return the context keys that have a declared expression index."""
+    return json.loads(get_meta(conn, "context_indexes") or "[]")
+
+
+def _create_context_index(conn: sqlite3.Connection, path: str) -> None:
+    table = "audit_events_compact" if is_compact(conn) else "audit_events"
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS {_context_index_name(path)} ON {table} ({_context_expr(path)}, id)"
+    )
+
+
+def create_context_index(conn: sqlite3.Connection, key: str) -> str:
+    """Index ``json_extract(context_json, path)`` for a context key and record the declaration.
+
+    Queries filtering on ``context.<key>`` with ``=`` or a range then seek the index
+    instead of evaluating ``json_extract`` on every row. Returns the index name.
+    """
+    path = context_path(key)
+    name = _context_index_name(path)
+    existing = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)).fetchone()
+    if existing is not None and _context_expr(path) not in existing[0]:
+        raise ValueError(f"index {name} already exists for a different context key")
+    keys = list_context_indexes(conn)
+    with conn:
+        _create_context_index(conn, path)
+        if path[2:] not in keys:
+            keys = sorted([*keys, path[2:]])
+            conn.execute(
+                "INSERT OR REPLACE INTO audit_meta (key, value) VALUES ('context_indexes', ?)", (json.dumps(keys),)
+            )
+    return name
+
+
+def drop_context_index(conn: sqlite3.Connection, key: str) -> bool:
+    """Drop a declared context index; returns False when none was declared."""
+    path = context_path(key)
+    keys = list_context_indexes(conn)
+    if path[2:] not in keys:
+        return False
+    keys.remove(path[2:])
+    legacy = _legacy_context_index_name(path)
+    with conn:
+        conn.execute(f"DROP INDEX IF EXISTS {_context_index_name(path)}")
+        in_use = {name(f"$.{other}") for other in keys for name in (_context_index_name, _legacy_context_index_name)}
+        if legacy not in in_use:
+            conn.execute(f"DROP INDEX IF EXISTS {legacy}")
+        conn.execute(
+            "INSERT OR REPLACE INTO audit_meta (key, value) VALUES ('context_indexes', ?)", (json.dumps(keys),)
+        )
+    return True
+
+
+def _filter_clauses(
     *,
     actor: str | None = None,
     action: str | None = None,
-    limit: int = 20,
-) -> list[dict[str, Any]]:
-    """Query audit events with optional actor/action filters."""
+    after_id: int | None = None,
+    before_id: int | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    where: Sequence[Condition] = (),
+) -> tuple[list[str], list[Any]]:
     clauses: list[str] = []
     params: list[Any] = []
 
@@ -80,26 +696,407 @@ def query_events(
     if action is not None:
         clauses.append("action = ?")
         params.append(action)
+    if after_id is not None:
+        clauses.append("id > ?")
+        params.append(after_id)
+    if before_id is not None:
+        clauses.append("id < ?")
+        params.append(before_id)
+    if since is not None:
+        clauses.append("ts >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("ts < ?")
+        params.append(until)
+    for path, op, value in where:
+        # The path is inlined (parse_where only admits identifier keys) so the
+        # expression matches a declared context index exactly.
+        if value is None:
+            clauses.append(f"{_context_expr(path)} IS {'NOT ' if op == '!=' else ''}NULL")
+            continue
+        clauses.append(f"{_context_expr(path)} {op} ?")
+        params.append(value)
+
+    return clauses, params
+
+
+def build_query(
+    *,
+    actor: str | None = None,
+    action: str | None = None,
+    after_id: int | None = None,
+    before_id: int | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    where: Sequence[Condition] = (),
+    descending: bool = True,
+    limit: int = 20,
+) -> tuple[str, list[Any]]:
+    """Build the SQL and parameters used by ``query_events`` and ``iter_events``.
+
+    ``after_id``/``before_id`` are exclusive keyset bounds; ``since`` is an inclusive
+    and ``until`` an exclusive bound on ``ts``. ``where`` holds ``parse_where``
+    conditions on context fields.
+    """
+    clauses, params = _filter_clauses(
+        actor=actor, action=action, after_id=after_id, before_id=before_id, since=since, until=until, where=where
+    )
 
-    query = "SELECT id, ts, actor, action, target, result, context_json, prev_hash, event_hash FROM audit_events"
+    query = "SELECT " + ", ".join(EVENT_COLUMNS) + " FROM audit_events"
     if clauses:
         query += " WHERE " + " AND ".join(clauses)
 
-    query += " ORDER BY id DESC LIMIT ?"
+    query += " ORDER BY id DESC LIMIT ?" if descending else " ORDER BY id ASC LIMIT ?"
     params.append(limit)
+    return query, params
+
+
+def query_events(
+    conn: sqlite3.Connection,
+    *,
+    actor: str | None = None,
+    action: str | None = None,
+    limit: int = 20,
+    as_dict: bool = True,
+    **bounds: Any,
+) -> list[Any]:
+    """Query the newest audit events with optional filters; see ``build_query``.
+
+    Rows are dicts, or ``AuditEvent`` records with ``as_dict=False``.
+    """
+    query, params = build_query(actor=actor, action=action, limit=limit, **bounds)
+    return list(map(row_converter(as_dict), conn.execute(query, params).fetchall()))
+
+
+def iter_events(
+    conn: sqlite3.Connection,
+    *,
+    actor: str | None = None,
+    action: str | None = None,
+    after_id: int | None = None,
+    before_id: int | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    where: Sequence[Condition] = (),
+    descending: bool = False,
+    chunk_size: int = 1000,
+    as_dict: bool = True,
+) -> Iterator[Any]:
+    """Stream matching events in id order, fetching ``chunk_size`` rows per keyset page."""
+    convert = row_converter(as_dict)
+    while True:
+        query, params = build_query(
+            actor=actor,
+            action=action,
+            after_id=after_id,
+            before_id=before_id,
+            since=since,
+            until=until,
+            where=where,
+            descending=descending,
+            limit=chunk_size,
+        )
+        rows = conn.execute(query, params).fetchall()
+        yield from map(convert, rows)
+        if len(rows) < chunk_size:
+            return
+        if descending:
+            before_id = rows[-1][0]
+        else:
+            after_id = rows[-1][0]
+
 
-    rows = conn.execute(query, params).fetchall()
+def explain_query(
+    conn: sqlite3.Connection,
+    *,
+    actor: str | None = None,
+    action: str | None = None,
+    limit: int = 20,
+    **bounds: Any,
+) -> list[str]:
+    """Return SQLite's EXPLAIN QUERY PLAN details for a ``query_events`` call."""
+    query, params = build_query(actor=actor, action=action, limit=limit, **bounds)
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params).fetchall()]
+
+
+GROUP_COLUMNS = ("actor", "action", "target", "result")
+
+# Prefix of an ISO-8601 ``ts`` kept per bucket, and the suffix that completes the label.
+BUCKETS = {
+    "minute": (16, ":00Z"),
+    "hour": (13, ":00:00Z"),
+    "day": (10, "T00:00:00Z"),
+    "month": (7, "-01T00:00:00Z"),
+}
+
+
+def _group_expr(name: str) -> str:
+    if name in GROUP_COLUMNS:
+        return name
+    if name.startswith("context."):
+        return _context_expr(context_path(name))
+    raise ValueError(f"cannot group by {name!r}; use one of {', '.join(GROUP_COLUMNS)} or context.<key>")
+
+
+def build_aggregate(
+    *,
+    group_by: Sequence[str] = (),
+    bucket: str | None = None,
+    rate_of: str | None = None,
+    **filters: Any,
+) -> tuple[str, list[Any]]:
+    """Build a GROUP BY query returning ``(bucket?, *group_by, count[, matching])`` rows.
+
+    ``bucket`` truncates ``ts`` to a minute, hour, day or month label; ``rate_of``
+    adds the number of rows in each group whose ``result`` equals it. ``filters``
+    are those of ``build_query``.
+    """
+    keys: list[str] = []
+    if bucket is not None:
+        if bucket not in BUCKETS:
+            raise ValueError(f"bucket must be one of {', '.join(BUCKETS)}")
+        width, suffix = BUCKETS[bucket]
+        keys.append(f"substr(ts, 1, {width}) || '{suffix}'")
+    keys.extend(_group_expr(name) for name in group_by)
+
+    measures = ["COUNT(*)"]
+    params: list[Any] = []
+    if rate_of is not None:
+        measures.append("SUM(result = ?)")
+        params.append(rate_of)
+
+    clauses, filter_params = _filter_clauses(**filters)
+    query = "SELECT " + ", ".join(keys + measures) + " FROM audit_events"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    if keys:
+        query += " GROUP BY " + ", ".join(str(position) for position in range(1, len(keys) + 1))
+    return query, params + filter_params
+
+
+def aggregate_events(
+    conn: sqlite3.Connection,
+    *,
+    group_by: Sequence[str] = (),
+    bucket: str | None = None,
+    rate_of: str | None = None,
+    **filters: Any,
+) -> list[tuple]:
+    """Run ``build_aggregate`` on ``conn``; groups are only returned when they have rows."""
+    query, params = build_aggregate(group_by=group_by, bucket=bucket, rate_of=rate_of, **filters)
+    count_at = len(group_by) + (bucket is not None)
+    return [row for row in conn.execute(query, params).fetchall() if row[count_at]]
+
+
+def insert_checkpoint(
+    conn: sqlite3.Connection,
+    *,
+    created_at: str,
+    event_id: int,
+    event_hash: str,
+    prev_checkpoint_hash: str,
+    checkpoint_hash: str,
+) -> int:
+    """Insert a verification checkpoint and return its id."""
+    cursor = conn.execute(
+        """
+        INSERT INTO audit_checkpoints (
+            created_at, event_id, event_hash, prev_checkpoint_hash, checkpoint_hash
+        ) VALUES (?, ?, ?, ?, ?)
+        """,
+        (created_at, event_id, event_hash, prev_checkpoint_hash, checkpoint_hash),
+    )
+    conn.commit()
+    return int(cursor.lastrowid)
+
+
+def list_checkpoints(conn: sqlite3.Connection) -> list[dict[str, Any]]:
+    """Return all checkpoints, oldest first."""
+    rows = conn.execute(
+        "SELECT id, created_at, event_id, event_hash, prev_checkpoint_hash, checkpoint_hash "
+        "FROM audit_checkpoints ORDER BY id ASC"
+    ).fetchall()
     return [
         {
             "id": row[0],
-            "ts": row[1],
-            "actor": row[2],
-            "action": row[3],
-            "target": row[4],
-            "result": row[5],
-            "context_json": row[6],
-            "prev_hash": row[7],
-            "event_hash": row[8],
+            "created_at": row[1],
+            "event_id": row[2],
+            "event_hash": row[3],
+            "prev_checkpoint_hash": row[4],
+            "checkpoint_hash": row[5],
         }
         for row in rows
     ]
+
+
+def insert_block(
+    conn: sqlite3.Connection,
+    *,
+    first_id: int,
+    last_id: int,
+    size: int,
+    merkle_root: str,
+    prev_block_hash: str,
+    block_hash: str,
+    sealed_at: str,
+) -> int:
+    """Insert a sealed Merkle block header and return its id."""
+    cursor = conn.execute(
+        """
+        INSERT INTO audit_blocks (
+            first_id, last_id, size, merkle_root, prev_block_hash, block_hash, sealed_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (first_id, last_id, size, merkle_root, prev_block_hash, block_hash, sealed_at),
+    )
+    conn.commit()
+    return int(cursor.lastrowid)
+
+
+def get_last_block(conn: sqlite3.Connection) -> dict[str, Any] | None:
+    """Return the newest sealed block header, or None before the first seal."""
+    row = conn.execute("SELECT " + ", ".join(BLOCK_COLUMNS) + " FROM audit_blocks ORDER BY id DESC LIMIT 1").fetchone()
+    return dict(zip(BLOCK_COLUMNS, row)) if row else None
+
+
+def get_block(conn: sqlite3.Connection, block_id: int) -> dict[str, Any] | None:
+    """Return one sealed block header by id."""
+    row = conn.execute("SELECT " + ", ".join(BLOCK_COLUMNS) + " FROM audit_blocks WHERE id = ?", (block_id,)).fetchone()
+    return dict(zip(BLOCK_COLUMNS, row)) if row else None
+
+
+def find_block(conn: sqlite3.Connection, event_id: int) -> dict[str, Any] | None:
+    """Return the sealed block whose id range contains ``event_id``."""
+    row = conn.execute(
+        "SELECT " + ", ".join(BLOCK_COLUMNS) + " FROM audit_blocks "
+        "WHERE last_id >= ? AND first_id <= ? ORDER BY last_id ASC LIMIT 1",
+        (event_id, event_id),
+    ).fetchone()
+    return dict(zip(BLOCK_COLUMNS, row)) if row else None
+
+
+CREATE_SHARDS_SQL = """
+CREATE TABLE IF NOT EXISTS manifest_shards (
+    name TEXT PRIMARY KEY,
+    path TEXT,
+    created_at TEXT
+)
+"""
+
+CREATE_MANIFEST_SQL = """
+CREATE TABLE IF NOT EXISTS manifest_entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT,
+    heads_json TEXT,
+    prev_entry_hash TEXT,
+    entry_hash TEXT
+)
+"""
+
+
+def init_manifest(conn: sqlite3.Connection) -> None:
+    """Create the shard manifest tables when they do not exist."""
+    conn.execute(CREATE_SHARDS_SQL)
+    conn.execute(CREATE_MANIFEST_SQL)
+    conn.execute(CREATE_META_SQL)
+    conn.commit()
+
+
+def register_shard(conn: sqlite3.Connection, *, name: str, path: str, created_at: str) -> None:
+    """Record a shard in the manifest; existing shards are left untouched."""
+    conn.execute(
+        "INSERT OR IGNORE INTO manifest_shards (name, path, created_at) VALUES (?, ?, ?)",
+        (name, path, created_at),
+    )
+    conn.commit()
+
+
+def list_shards(conn: sqlite3.Connection) -> list[tuple[str, str]]:
+    """Return ``(name, path)`` for every registered shard, ordered by name."""
+    return conn.execute("SELECT name, path FROM manifest_shards ORDER BY name ASC").fetchall()
+
+
+def insert_manifest_entry(
+    conn: sqlite3.Connection, *, created_at: str, heads_json: str, prev_entry_hash: str, entry_hash: str
+) -> int:
+    """Insert a manifest entry chaining the current shard heads and return its id."""
+    cursor = conn.execute(
+        "INSERT INTO manifest_entries (created_at, heads_json, prev_entry_hash, entry_hash) VALUES (?, ?, ?, ?)",
+        (created_at, heads_json, prev_entry_hash, entry_hash),
+    )
+    conn.commit()
+    return int(cursor.lastrowid)
+
+
+def list_manifest_entries(conn: sqlite3.Connection) -> list[dict[str, Any]]:
+    """Return all manifest entries, oldest first."""
+    rows = conn.execute(
+        "SELECT id, created_at, heads_json, prev_entry_hash, entry_hash FROM manifest_entries ORDER BY id ASC"
+    ).fetchall()
+    return [
+        {"id": row[0], "created_at": row[1], "heads_json": row[2], "prev_entry_hash": row[3], "entry_hash": row[4]}
+        for row in rows
+    ]
+
+
+SEGMENT_COLUMNS = (
+    "id",
+    "path",
+    "first_id",
+    "last_id",
+    "row_count",
+    "first_prev_hash",
+    "last_event_hash",
+    "first_ts",
+    "last_ts",
+    "file_sha256",
+    "created_at",
+    "min_ts",
+    "max_ts",
+)
+
+
+def list_segments(conn: sqlite3.Connection) -> list[dict[str, Any]]:
+    """Return archived segment records ordered by id range.
+
+    ``first_ts``/``last_ts`` belong to the first and last rows by id; ``min_ts``/
+    ``max_ts`` bound every ``ts`` in the segment and are NULL for segments written
+    before they were tracked.
+    """
+    rows = conn.execute("SELECT " + ", ".join(SEGMENT_COLUMNS) + " FROM audit_segments ORDER BY first_id ASC")
+    return [dict(zip(SEGMENT_COLUMNS, row)) for row in rows.fetchall()]
+
+
+def get_archive_cutoff(conn: sqlite3.Connection, before_ts: str) -> int:
+    """Return the last id of the oldest run of live rows with ``ts < before_ts`` (0 if none).
+
+    Archiving always takes a prefix of the live id space, so a row that is too new
+    ends the range even if older timestamps follow it.
+    """
+    row = conn.execute("SELECT MIN(id) FROM audit_events WHERE ts >= ? OR ts IS NULL", (before_ts,)).fetchone()
+    if row[0] is not None:
+        return int(row[0]) - 1
+    row = conn.execute("SELECT MAX(id) FROM audit_events").fetchone()
+    return int(row[0]) if row[0] is not None else 0
+
+
+def segment_overlaps(segment: Mapping[str, Any], since: str | None = None, until: str | None = None) -> bool:
+    """Return False only when the segment's ts bounds rule out every row in ``[since, until)``."""
+    if since is not None and segment.get("max_ts") is not None and segment["max_ts"] < since:
+        return False
+    if until is not None and segment.get("min_ts") is not None and segment["min_ts"] >= until:
+        return False
+    return True
+
+
+def commit_segment(conn: sqlite3.Connection, segment: Mapping[str, Any]) -> int:
+    """Record a written segment and delete its rows from audit_events in one transaction."""
+    columns = [column for column in SEGMENT_COLUMNS if column != "id"]
+    table = "audit_events_compact" if is_compact(conn) else "audit_events"
+    with conn:
+        cursor = conn.execute(
+            "INSERT INTO audit_segments (" + ", ".join(columns) + ") VALUES (" + ", ".join("?" * len(columns)) + ")",
+            [segment[column] for column in columns],
+        )
+        conn.execute(f"DELETE FROM {table} WHERE id BETWEEN ? AND ?", (segment["first_id"], segment["last_id"]))
+    return int(cursor.lastrowid)
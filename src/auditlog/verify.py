@@ -0,0 +1,208 @@
+"""Hash-chain verification for the audit logging pipeline."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator
+
+from auditlog.hashing import hash_checkpoint, hash_event, hash_event_fields
+from auditlog.storage import connect, iter_rows
+
+RANGES_PER_WORKER = 4
+
+
+@dataclass
+class VerifyReport:
+    """Outcome of one verification pass."""
+
+    issues: list[str] = field(default_factory=list)
+    rows_scanned: int = 0
+    last_id: int = 0
+    last_hash: str = "GENESIS"
+    checkpoint_id: int | None = None
+    truncated: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+
+def check_checkpoints(
+    checkpoints: list[dict[str, Any]], key: bytes | None
+) -> tuple[dict[str, Any] | None, list[str]]:
+    """Re-hash the checkpoint chain; return the newest checkpoint when trustworthy, plus issues."""
+    prev_checkpoint_hash = "GENESIS"
+    for checkpoint in checkpoints:
+        expected = hash_checkpoint(
+            event_id=checkpoint["event_id"],
+            event_hash=checkpoint["event_hash"],
+            created_at=checkpoint["created_at"],
+            prev_checkpoint_hash=prev_checkpoint_hash,
+            key=key,
+        )
+        if checkpoint["prev_checkpoint_hash"] != prev_checkpoint_hash or checkpoint["checkpoint_hash"] != expected:
+            return None, [f"checkpoint {checkpoint['id']}: checkpoint_hash mismatch"]
+        prev_checkpoint_hash = checkpoint["checkpoint_hash"]
+
+    return (checkpoints[-1] if checkpoints else None), []
+
+
+def _check_row(row: tuple, expected_prev: str | None, issues: list[str]) -> bool:
+    """Check one row, appending its issues; returns False when the row cannot be hashed.
+
+    ``expected_prev`` of None skips the link check, which the parallel path uses for
+    the first row of a range and stitches in afterwards.
+    """
+    row_id, ts, actor, action, target, result, context_json, prev_hash, event_hash = row
+    # Fast path: splice the stored canonical context_json into the payload. Only when
+    # that digest disagrees is the row re-canonicalized the slow way, so reported
+    # issues are the same as a full re-serialization would give.
+    if isinstance(context_json, str):
+        try:
+            spliced_hash = hash_event_fields(prev_hash, ts, actor, action, target, result, context_json)
+        except TypeError:
+            spliced_hash = None
+        if spliced_hash == event_hash:
+            if expected_prev is not None and prev_hash != expected_prev:
+                issues.append(_prev_mismatch(row_id, prev_hash, expected_prev))
+            return True
+
+    try:
+        context_obj = json.loads(context_json)
+    except json.JSONDecodeError as exc:
+        issues.append(f"row {row_id}: invalid context_json: {exc}")
+        return False
+
+    if expected_prev is not None and prev_hash != expected_prev:
+        issues.append(_prev_mismatch(row_id, prev_hash, expected_prev))
+
+    event = {
+        "ts": ts,
+        "actor": actor,
+        "action": action,
+        "target": target,
+        "result": result,
+        "context": context_obj,
+    }
+    expected_hash = hash_event(event, prev_hash)
+    if event_hash != expected_hash:
+        issues.append(f"row {row_id}: event_hash mismatch (stored={event_hash}, expected={expected_hash})")
+    return True
+
+
+def _prev_mismatch(row_id: int, prev_hash: str, expected_prev: str) -> str:
+    return f"row {row_id}: prev_hash mismatch (stored={prev_hash}, expected={expected_prev})"
+
+
+def check_rows(rows: Iterable[tuple], expected_prev: str, report: VerifyReport) -> Iterator[str]:
+    """Check links and hashes for rows ordered by id, yielding issues as they are found.
+
+    Only the scan position (``rows_scanned``, ``last_id``, ``last_hash``) is recorded
+    on the report; collecting the yielded issues is left to the caller.
+    """
+    row_issues: list[str] = []
+    for row in rows:
+        report.rows_scanned += 1
+        report.last_id, report.last_hash = row[0], row[8]
+        if _check_row(row, expected_prev, row_issues):
+            expected_prev = row[8]
+        if row_issues:
+            yield from row_issues
+            row_issues.clear()
+
+
+@dataclass
+class RangeResult:
+    """Per-range output of a parallel verification worker."""
+
+    issues: list[tuple[int, str]]
+    rows: int
+    head: tuple[int, str] | None
+    tail: str | None
+    last: tuple[int, str] | None
+
+
+def check_range(db_path: str, first_id: int, last_id: int) -> RangeResult:
+    """Verify rows ``first_id..last_id`` in isolation, leaving the first link to the caller."""
+    conn = connect(db_path)
+    issues: list[tuple[int, str]] = []
+    rows = 0
+    head: tuple[int, str] | None = None
+    last: tuple[int, str] | None = None
+    expected_prev: str | None = None
+    row_issues: list[str] = []
+
+    try:
+        for row in iter_rows(conn, after_id=first_id - 1, last_id=last_id):
+            rows += 1
+            last = (row[0], row[8])
+            if _check_row(row, expected_prev, row_issues):
+                if head is None:
+                    head = (row[0], row[7])
+                expected_prev = row[8]
+            issues.extend((row[0], issue) for issue in row_issues)
+            row_issues.clear()
+    finally:
+        conn.close()
+
+    return RangeResult(issues=issues, rows=rows, head=head, tail=expected_prev, last=last)
+
+
+def split_id_range(first_id: int, last_id: int, parts: int) -> list[tuple[int, int]]:
+    """Split the inclusive id range into at most ``parts`` contiguous sub-ranges."""
+    total = last_id - first_id + 1
+    if total <= 0:
+        return []
+    parts = max(1, min(parts, total))
+    step, extra = divmod(total, parts)
+    ranges: list[tuple[int, int]] = []
+    start = first_id
+    for index in range(parts):
+        end = start + step - 1 + (1 if index < extra else 0)
+        ranges.append((start, end))
+        start = end + 1
+    return ranges
+
+
+def check_rows_parallel(
+    db_path: str,
+    *,
+    first_id: int,
+    last_id: int,
+    expected_prev: str,
+    workers: int,
+    report: VerifyReport,
+) -> Iterator[str]:
+    """Hash id ranges in a process pool and stitch boundary links in id order.
+
+    Yields the same issues, in the same order, as ``check_rows`` over the range.
+    Ranges still queued are cancelled when the caller stops iterating early.
+    """
+    ranges = split_id_range(first_id, last_id, workers * RANGES_PER_WORKER)
+    # Imported here: multiprocessing is slow to load and only parallel runs need it.
+    from concurrent.futures import ProcessPoolExecutor
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [pool.submit(check_range, db_path, start, end) for start, end in ranges]
+        for future in futures:
+            result = future.result()
+            if result.head is not None:
+                head_id, head_prev = result.head
+                if head_prev != expected_prev:
+                    # The boundary link precedes every other issue for that row.
+                    position = next(
+                        (index for index, (row_id, _) in enumerate(result.issues) if row_id >= head_id),
+                        len(result.issues),
+                    )
+                    result.issues.insert(position, (head_id, _prev_mismatch(head_id, head_prev, expected_prev)))
+            if result.tail is not None:
+                expected_prev = result.tail
+            report.rows_scanned += result.rows
+            if result.last is not None:
+                report.last_id, report.last_hash = result.last
+            for _, issue in result.issues:
+                yield issue
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,203 @@
+"""Background-thread writer that group-commits audit events."""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any
+
+from auditlog.events import check_appendable
+from auditlog.service import AuditLogger, _utc_now
+
+BACKPRESSURE_POLICIES = ("block", "raise")
+
+_STOP = object()
+
+
+class _FlushMarker:
+    def __init__(self) -> None:
+        self.future: Future[None] = Future()
+
+
+class AsyncAuditWriter:
+    """Accept events into a bounded queue and group-commit them on a writer thread.
+
+    ``submit`` returns a ``Future`` resolving to the ``append`` record once the batch
+    containing the event is committed. Events are chained strictly in submission
+    order because a single thread drains the queue. Cancelling a future before its
+    batch is picked up drops the event; after that, cancel() returns False.
+
+    A batch is committed when it reaches ``batch_size`` events or when the oldest
+    event has waited ``max_latency`` seconds. When the queue holds ``max_queue``
+    events, ``on_full="block"`` waits up to ``put_timeout`` seconds (forever when
+    None) and ``on_full="raise"`` fails immediately; both raise ``queue.Full``.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        batch_size: int = 500,
+        max_latency: float = 0.05,
+        max_queue: int = 10_000,
+        on_full: str = "block",
+        put_timeout: float | None = None,
+        **logger_kwargs: Any,
+    ) -> None:
+        if on_full not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"on_full must be one of {', '.join(BACKPRESSURE_POLICIES)}")
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.on_full = on_full
+        self.put_timeout = put_timeout
+        self.committed = 0
+        self.batches = 0
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        # Held across the closed check and the put, so nothing is queued behind _STOP.
+        self._put_lock = threading.Lock()
+        self._started = threading.Event()
+        self._start_error: BaseException | None = None
+        self._thread = threading.Thread(
+            target=self._run, args=(db_path, logger_kwargs), name="auditlog-writer", daemon=True
+        )
+        self._thread.start()
+        self._started.wait()
+        if self._start_error is not None:
+            raise self._start_error
+
+    @property
+    def pending(self) -> int:
+        """Number of queued events not yet picked up by the writer thread."""
+        return self._queue.qsize()
+
+    def submit(
+        self,
+        *,
+        actor: str,
+        action: str,
+        target: str,
+        result: str,
+        context: dict,
+        ts: str | None = None,
+        idempotency_key: str | None = None,
+    ) -> Future[dict]:
+        """Enqueue one event; the timestamp defaults to the time of submission.
+
+        Repeated ``idempotency_key`` values resolve to the original record, even
+        when they land in the same group commit. Raises ValueError here, before
+        queueing, for an event that could not be stored.
+        """
+        event = {
+            "ts": ts or _utc_now(),
+            "actor": actor,
+            "action": action,
+            "target": target,
+            "result": result,
+            "context": context,
+        }
+        if idempotency_key is not None:
+            event["idempotency_key"] = idempotency_key
+        check_appendable(event)
+        future: Future[dict] = Future()
+        self._put((event, future))
+        return future
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Block until every event submitted before this call is committed."""
+        marker = _FlushMarker()
+        self._put(marker, block=True)
+        marker.future.result(timeout)
+
+    def close(self, timeout: float | None = None) -> None:
+        """Commit everything still queued and stop the writer thread."""
+        with self._put_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def __enter__(self) -> AsyncAuditWriter:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _put(self, item: Any, *, block: bool | None = None) -> None:
+        if block is None:
+            block = self.on_full == "block"
+        with self._put_lock:
+            if self._closed:
+                raise RuntimeError("writer is closed")
+            self._queue.put(item, block=block, timeout=self.put_timeout if block else None)
+
+    def _run(self, db_path: str, logger_kwargs: dict[str, Any]) -> None:
+        # SQLite connections belong to the thread that opened them.
+        try:
+            logger = AuditLogger(db_path, **logger_kwargs)
+        except BaseException as exc:
+            self._start_error = exc
+            self._started.set()
+            return
+        self._started.set()
+
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                batch: list[tuple[dict, Future[dict]]] = []
+                markers: list[_FlushMarker] = []
+                deadline = time.monotonic() + self.max_latency
+
+                while True:
+                    if item is _STOP:
+                        stopping = True
+                    elif isinstance(item, _FlushMarker):
+                        markers.append(item)
+                    else:
+                        batch.append(item)
+                    if stopping or markers or len(batch) >= self.batch_size:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+
+                self._commit(logger, batch)
+                for marker in markers:
+                    marker.future.set_result(None)
+        finally:
+            logger.conn.close()
+
+    def _commit(self, logger: AuditLogger, batch: list[tuple[dict, Future[dict]]]) -> None:
+        # Futures cancelled while queued are dropped; the rest can no longer be cancelled.
+        batch = [(event, future) for event, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            records = logger.append_many(event for event, _ in batch)
+        except Exception as exc:
+            if len(batch) == 1:
+                batch[0][1].set_exception(exc)
+                return
+            # The batch was rolled back; retry one by one so only the bad event fails.
+            for event, future in batch:
+                try:
+                    record = logger.append_many([event])[0]
+                except Exception as event_exc:
+                    future.set_exception(event_exc)
+                else:
+                    self.committed += 1
+                    self.batches += 1
+                    future.set_result(record)
+            return
+        self.committed += len(records)
+        self.batches += 1
+        for (_, future), record in zip(batch, records):
+            future.set_result(record)
@@ -2,7 +2,12 @@
 
 from __future__ import annotations
 
+import sys
+
 
 class Console:
+    def __init__(self, *, stderr: bool = False) -> None:
+        self.stderr = stderr
+
     def print(self, obj: object) -> None:
-        print(obj)
+        print(obj, file=sys.stderr if self.stderr else sys.stdout)
@@ -5,7 +5,7 @@ from __future__ import annotations
 import inspect
 import sys
 from dataclasses import dataclass
-from typing import Any, Callable
+from typing import Any, Callable, get_args, get_origin
 
 
 class BadParameter(ValueError):
@@ -57,7 +57,7 @@ class Typer:
         print("  -h, --help  Show this message and exit.")
 
     def _parse_args(self, func: Callable[..., Any], args: list[str]) -> dict[str, Any]:
-        sig = inspect.signature(func)
+        sig = inspect.signature(func, eval_str=True)
         values: dict[str, Any] = {}
         by_flag: dict[str, tuple[str, OptionInfo, Any]] = {}
 
@@ -69,6 +69,9 @@ class Typer:
             else:
                 opt = OptionInfo(default=default, flags=(f"--{name.replace('_', '-')}",))
             typ = ann if ann is not inspect._empty else str
+            members = [arg for arg in get_args(typ) if arg is not type(None)]
+            if len(members) == 1:
+                typ = members[0]
             for flag in opt.flags:
                 by_flag[flag] = (name, opt, typ)
             if opt.default is not ...:
@@ -83,11 +86,21 @@ class Typer:
                 raise BadParameter(f"Unknown option: {token}")
             name, opt, typ = by_flag[token]
             i += 1
+            if typ is bool:
+                values[name] = True
+                continue
             if i >= len(args):
                 raise BadParameter(f"Missing value for {token}")
             raw = args[i]
+            if get_origin(typ) is list:
+                # Repeatable option: every occurrence adds one value.
+                values[name] = [*(values.get(name) or []), raw]
+                i += 1
+                continue
             if typ is int:
                 val: Any = int(raw)
+            elif typ is float:
+                val = float(raw)
             else:
                 val = raw
             if opt.min is not None and isinstance(val, int) and val < opt.min:
@@ -109,6 +122,18 @@ class Typer:
             self._print_help()
             return
 
+        if self._callback is not None:
+            split = next((index for index, arg in enumerate(args) if arg in self._commands), len(args))
+            try:
+                self._callback(**self._parse_args(self._callback, args[:split]))
+            except BadParameter as exc:
+                print(f"Error: {exc}")
+                raise SystemExit(2) from exc
+            args = args[split:]
+            if not args:
+                self._print_help()
+                return
+
         cmd_name = args[0]
         cmd = self._commands.get(cmd_name)
         if cmd is None:
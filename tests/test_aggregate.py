@@ -0,0 +1,60 @@
+"""Tests for grouped and time-bucketed aggregation."""
+
+from __future__ import annotations
+
+import pytest
+
+from auditlog.service import AuditLogger
+
+
+def _make_logger(tmp_path) -> AuditLogger:
+    logger = AuditLogger(str(tmp_path / "audit.db"))
+    for index in range(12):
+        logger.append(
+            actor="alice" if index % 3 else "bob",
+            action="export" if index % 2 else "login",
+            target=f"db-{index % 4}",
+            result="denied" if index % 4 == 0 else "ok",
+            context={"region": "eu" if index < 6 else "us"},
+            ts=f"2025-01-01T{index // 4:02d}:{index:02d}:00Z",
+        )
+    return logger
+
+
+def test_aggregate_groups_buckets_and_rates(tmp_path) -> None:
+    logger = _make_logger(tmp_path)
+
+    by_hour = logger.aggregate(group_by=["actor"], bucket="hour")
+    assert by_hour["columns"] == ["bucket", "actor", "count"]
+    assert by_hour["rows"][:2] == [["2025-01-01T00:00:00Z", "alice", 2], ["2025-01-01T00:00:00Z", "bob", 2]]
+    assert sum(row[-1] for row in by_hour["rows"]) == 12
+
+    denied = logger.aggregate(group_by=["action"], rate_of="denied")
+    assert denied["columns"] == ["action", "count", "matching", "rate"]
+    assert denied["rows"] == [["export", 6, 0, 0.0], ["login", 6, 3, 0.5]]
+
+    assert logger.aggregate(group_by=["context.region"], since="2025-01-01T01:00:00Z")["rows"] == [
+        ["us", 6],
+        ["eu", 2],
+    ]
+    assert logger.aggregate(where=["context.region=eu"])["rows"] == [[6]]
+    assert logger.aggregate(group_by=["target"], top=1)["rows"] == [["db-0", 3]]
+
+
+def test_aggregate_merges_archived_segments(tmp_path) -> None:
+    logger = _make_logger(tmp_path)
+    spec = {"group_by": ["actor", "result"], "bucket": "day", "rate_of": "denied"}
+    before = logger.aggregate(**spec)
+
+    logger.archive("2025-01-01T01:30:00Z")
+
+    assert logger.aggregate(**spec) == before
+
+
+def test_aggregate_rejects_unknown_groups(tmp_path) -> None:
+    logger = _make_logger(tmp_path)
+
+    with pytest.raises(ValueError):
+        logger.aggregate(group_by=["context_json"])
+    with pytest.raises(ValueError):
+        logger.aggregate(bucket="week")
@@ -0,0 +1,81 @@
+"""Tests for the asyncio AuditLogger front end."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from auditlog.aio import AsyncAuditLogger
+from auditlog.service import AuditLogger
+
+
+def _event(index: int) -> dict:
+    return {"actor": f"user-{index}", "action": "login", "target": "web", "result": "ok", "context": {"seq": index}}
+
+
+def test_concurrent_appends_share_commits_and_keep_call_order(tmp_path, monkeypatch) -> None:
+    db_path = str(tmp_path / "audit.db")
+    batch_sizes: list[int] = []
+    original_append_many = AuditLogger.append_many
+
+    def counting_append_many(self, events):
+        events = list(events)
+        batch_sizes.append(len(events))
+        return original_append_many(self, events)
+
+    monkeypatch.setattr(AuditLogger, "append_many", counting_append_many)
+
+    async def scenario() -> tuple[list[dict], list[dict], list[str]]:
+        async with AsyncAuditLogger(db_path) as logger:
+            records = await asyncio.gather(*(logger.append(**_event(index)) for index in range(20)))
+            batch = await logger.append_many([_event(index) for index in range(20, 25)])
+            streamed = [event async for event in logger.iter_events(chunk_size=7)]
+            issues = await logger.verify_chain()
+        return list(records) + batch, streamed, issues
+
+    records, streamed, issues = asyncio.run(scenario())
+
+    assert [record["id"] for record in records] == list(range(1, 26))
+    assert [event["actor"] for event in streamed] == [f"user-{index}" for index in range(25)]
+    assert issues == []
+    assert sum(batch_sizes) == 25
+    assert len(batch_sizes) < 25
+
+
+def test_query_runs_off_the_event_loop(tmp_path) -> None:
+    db_path = str(tmp_path / "audit.db")
+
+    async def scenario() -> list[dict]:
+        async with AsyncAuditLogger(db_path) as logger:
+            await logger.append(**_event(0))
+            await logger.append(**_event(1))
+            return await logger.query(actor="user-1")
+
+    events = asyncio.run(scenario())
+
+    assert [event["actor"] for event in events] == ["user-1"]
+
+
+def test_invalid_event_fails_alone(tmp_path) -> None:
+    db_path = str(tmp_path / "audit.db")
+
+    async def scenario() -> tuple[list, list]:
+        async with AsyncAuditLogger(db_path) as logger:
+            with pytest.raises(ValueError, match="context"):
+                await logger.append(**{**_event(0), "context": {"x": object()}})
+            with pytest.raises(ValueError):
+                await logger.append_many([_event(1), {**_event(2), "actor": None}])
+            # A context mutated after validation only fails inside the batch.
+            bad = _event(3)
+            appends = [logger.append(**_event(4)), logger.append(**bad), logger.append(**_event(5))]
+            tasks = [asyncio.ensure_future(append) for append in appends]
+            await asyncio.sleep(0)
+            bad["context"]["obj"] = object()
+            return await asyncio.gather(*tasks, return_exceptions=True), await logger.query()
+
+    results, stored = asyncio.run(scenario())
+
+    assert isinstance(results[1], TypeError)
+    assert [results[0]["id"], results[2]["id"]] == [1, 2]
+    assert [event["actor"] for event in stored] == ["user-5", "user-4"]
@@ -0,0 +1,127 @@
+"""Tests for archiving old events into compressed segment files."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+
+import pytest
+
+from auditlog import service as service_module
+from auditlog.archive import context_matches
+from auditlog.service import AuditLogger
+from auditlog.storage import list_segments, parse_where
+
+
+def _make_logger(tmp_path, days: int = 6) -> AuditLogger:
+    logger = AuditLogger(str(tmp_path / "audit.db"))
+    for day in range(1, days + 1):
+        logger.append(
+            actor="alice" if day % 2 else "bob",
+            action="login",
+            target="web",
+            result="ok",
+            context={"day": day},
+            ts=f"2025-01-0{day}T00:00:00Z",
+        )
+    return logger
+
+
+def test_archive_moves_closed_range_and_verify_reads_segments(tmp_path) -> None:
+    logger = _make_logger(tmp_path)
+
+    segment = logger.archive("2025-01-04T00:00:00Z")
+
+    assert segment is not None
+    assert (segment["first_id"], segment["last_id"], segment["row_count"]) == (1, 3, 3)
+    assert logger.conn.execute("SELECT COUNT(*) FROM audit_events").fetchone()[0] == 3
+    assert os.stat(tmp_path / segment["path"]).st_mode & 0o222 == 0
+    assert logger.archive("2025-01-04T00:00:00Z") is None
+
+    report = logger.verify()
+    assert report.ok
+    assert report.rows_scanned == 6
+
+
+def test_query_and_iter_events_include_archived_rows(tmp_path) -> None:
+    logger = _make_logger(tmp_path)
+    logger.archive("2025-01-04T00:00:00Z")
+
+    assert [event["id"] for event in logger.query(limit=10)] == [6, 5, 4, 3, 2, 1]
+    assert [event["id"] for event in logger.query(actor="alice", limit=2)] == [5, 3]
+    assert [event["id"] for event in logger.iter_events(since="2025-01-02T00:00:00Z", chunk_size=2)] == [2, 3, 4, 5, 6]
+    assert [event["id"] for event in logger.iter_events(descending=True, before_id=3)] == [2, 1]
+
+
+def test_append_continues_chain_after_archiving_everything(tmp_path) -> None:
+    logger = _make_logger(tmp_path, days=3)
+    logger.archive("2026-01-01T00:00:00Z")
+
+    reopened = AuditLogger(logger.db_path)
+    record = reopened.append(actor="carol", action="logout", target="web", result="ok", context={})
+
+    assert record["id"] == 4
+    assert record["prev_hash"] == list_segments(reopened.conn)[0]["last_event_hash"]
+    assert reopened.verify_chain() == []
+
+
+def test_verify_detects_tampered_or_missing_segment(tmp_path) -> None:
+    logger = _make_logger(tmp_path)
+    segment = logger.archive("2025-01-04T00:00:00Z")
+    path = tmp_path / segment["path"]
+
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        rows = [json.loads(line) for line in handle]
+    rows[1]["result"] = "denied"
+    os.chmod(path, 0o644)
+    with gzip.open(path, "wt", encoding="utf-8") as handle:
+        handle.writelines(json.dumps(row) + "\n" for row in rows)
+
+    issues = logger.verify_chain()
+    assert any("file_sha256 mismatch" in issue for issue in issues)
+
+    os.remove(path)
+    issues = logger.verify_chain()
+    assert any("is missing" in issue for issue in issues)
+
+
+def test_archive_rejects_in_memory_databases() -> None:
+    with pytest.raises(ValueError):
+        AuditLogger(":memory:").archive("2025-01-01T00:00:00Z")
+
+
+def test_where_filters_apply_to_archived_rows(tmp_path) -> None:
+    logger = _make_logger(tmp_path)
+    logger.archive("2025-01-04T00:00:00Z")
+
+    assert [event["id"] for event in logger.query(where=["context.day<=2"])] == [2, 1]
+    assert [event["id"] for event in logger.query(where=["context.day>4"])] == [6, 5]
+
+
+def test_time_bounded_queries_skip_segments_by_ts_range(tmp_path, monkeypatch) -> None:
+    logger = AuditLogger(str(tmp_path / "audit.db"))
+    # Backfilled rows: ts is not monotonic in id within the first segment.
+    for day in (3, 1, 2, 5, 6):
+        ts = f"2025-01-0{day}T00:00:00Z"
+        logger.append(actor="alice", action="login", target="web", result="ok", context={}, ts=ts)
+    first = logger.archive("2025-01-04T00:00:00Z")
+    assert (first["min_ts"], first["max_ts"]) == ("2025-01-01T00:00:00Z", "2025-01-03T00:00:00Z")
+    logger.archive("2025-01-06T00:00:00Z")
+
+    opened = []
+    real_iter_segment = service_module.iter_segment
+    monkeypatch.setattr(service_module, "iter_segment", lambda path: opened.append(path) or real_iter_segment(path))
+
+    assert [event["id"] for event in logger.query(since="2025-01-02T00:00:00Z", until="2025-01-04T00:00:00Z")] == [3, 1]
+    assert len(opened) == 1
+    opened.clear()
+    assert [event["id"] for event in logger.query(since="2025-01-05T00:00:00Z")] == [5, 4]
+    assert len(opened) == 1
+
+
+def test_context_matches_treats_null_like_sqlite() -> None:
+    is_null, not_null = parse_where("context.x=null"), parse_where("context.x!=null")
+
+    assert [context_matches(json.dumps(ctx), [is_null]) for ctx in ({"x": None}, {}, {"x": 0})] == [True, True, False]
+    assert [context_matches(json.dumps(ctx), [not_null]) for ctx in ({"x": None}, {}, {"x": 0})] == [False, False, True]
@@ -0,0 +1,23 @@
+"""Tests for the synthetic benchmark workload."""
+
+from __future__ import annotations
+
+import json
+
+from auditlog.bench import QUERY_FILTERS, run_benchmarks, synthetic_events
+
+
+def test_synthetic_events_are_reproducible() -> None:
+    assert list(synthetic_events(5, seed=3)) == list(synthetic_events(5, seed=3))
+    assert list(synthetic_events(5, seed=3)) != list(synthetic_events(5, seed=4))
+
+
+def test_run_benchmarks_reports_every_metric_as_json(tmp_path) -> None:
+    report = run_benchmarks(events=300, single_events=20, batch_size=100, queries=5, directory=str(tmp_path))
+
+    assert json.loads(json.dumps(report)) == report
+    assert set(report["query_latency_ms"]) == set(QUERY_FILTERS)
+    assert report["verify"] == {**report["verify"], "ok": True, "rows": 300}
+    assert report["append"]["single_per_sec"] > 0
+    assert report["append"]["batched_per_sec"] > 0
+    assert set(report["row_footprint"]) == {"rows", "record", "dict"}
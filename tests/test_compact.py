@@ -0,0 +1,71 @@
+"""Tests for the dictionary-encoded compact layout."""
+
+from __future__ import annotations
+
+from auditlog.service import AuditLogger
+from auditlog.storage import is_compact
+
+
+def _fill(logger: AuditLogger, count: int) -> None:
+    logger.append_many(
+        {
+            "actor": f"user-{index % 5}",
+            "action": "login" if index % 2 else "logout",
+            "target": "web",
+            "result": "ok",
+            "context": {"seq": index},
+            "ts": f"2025-01-01T00:00:{index % 60:02d}Z",
+        }
+        for index in range(count)
+    )
+
+
+def test_migration_keeps_query_results_and_chain(tmp_path) -> None:
+    logger = AuditLogger(str(tmp_path / "audit.db"))
+    _fill(logger, 50)
+    before = logger.query(actor="user-3", action="login", limit=100)
+
+    assert logger.compact() == 50
+
+    assert is_compact(logger.conn)
+    assert logger.query(actor="user-3", action="login", limit=100) == before
+    assert logger.verify_chain() == []
+    assert any("audit_events_compact" in detail for detail in logger.explain_query(actor="user-3"))
+
+
+def test_compact_logger_appends_continue_chain_across_reopen(tmp_path) -> None:
+    db_path = str(tmp_path / "audit.db")
+    logger = AuditLogger(db_path, compact=True)
+    first = logger.append(actor="alice", action="login", target="web", result="ok", context={})
+    _fill(logger, 10)
+
+    reopened = AuditLogger(db_path)
+    record = reopened.append(actor="alice", action="logout", target="web", result="ok", context={})
+
+    assert is_compact(reopened.conn)
+    assert record["id"] == 12
+    assert [event["action"] for event in reopened.query(actor="alice")] == ["logout", "login"]
+    assert reopened.query(actor="alice")[1]["event_hash"] == first["event_hash"]
+    assert reopened.verify_chain() == []
+
+
+def test_migration_keeps_id_sequence_after_archive(tmp_path) -> None:
+    logger = AuditLogger(str(tmp_path / "audit.db"))
+    _fill(logger, 5)
+    logger.archive("2026-01-01T00:00:00Z")
+    logger.compact()
+
+    record = logger.append(actor="bob", action="login", target="web", result="ok", context={})
+
+    assert record["id"] == 6
+    assert logger.verify_chain() == []
+
+
+def test_context_indexes_survive_migration(tmp_path) -> None:
+    logger = AuditLogger(str(tmp_path / "audit.db"))
+    _fill(logger, 10)
+    logger.index_context_key("seq")
+    logger.compact()
+
+    assert "idx_audit_events_ctx_seq" in " ".join(logger.explain_query(where=["context.seq=3"]))
+    assert [event["id"] for event in logger.query(where=["context.seq=3"])] == [4]
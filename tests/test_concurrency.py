@@ -0,0 +1,37 @@
+"""Tests for appending from several connections and processes at once."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+import pytest
+
+from auditlog.bench import run_concurrent_writers
+from auditlog.storage import begin_immediate
+
+
+@pytest.mark.parametrize("batch_size", [1, 25])
+def test_concurrent_writer_processes_keep_one_chain(tmp_path, batch_size: int) -> None:
+    result = run_concurrent_writers(str(tmp_path / "audit.db"), processes=4, events=100, batch_size=batch_size)
+
+    assert result["failed_processes"] == 0
+    assert result["verify_ok"], result["issues"]
+    assert result["rows"] == 400
+
+
+def test_begin_immediate_retries_until_the_lock_is_released(tmp_path) -> None:
+    db_path = str(tmp_path / "lock.db")
+    holder = sqlite3.connect(db_path, check_same_thread=False)
+    waiter = sqlite3.connect(db_path, timeout=0)
+    holder.execute("BEGIN IMMEDIATE")
+
+    with pytest.raises(sqlite3.OperationalError):
+        begin_immediate(waiter, attempts=2, backoff=0.001)
+
+    release = threading.Timer(0.05, holder.rollback)
+    release.start()
+    begin_immediate(waiter, attempts=10, backoff=0.01)
+    release.join()
+
+    assert waiter.in_transaction
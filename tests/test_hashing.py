@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from auditlog.hashing import canonical_json, hash_event
+from auditlog.hashing import canonical_json, hash_event, hash_event_fields
 
 
 def test_canonical_json_is_deterministic_across_key_order() -> None:
@@ -49,3 +49,32 @@ def test_hash_event_changes_if_prev_hash_changes() -> None:
     }
 
     assert hash_event(event, "GENESIS") != hash_event(event, "different-prev")
+
+
+def test_hash_event_fields_matches_hash_event_digest() -> None:
+    contexts = [
+        {},
+        {"ip": "127.0.0.1", "mfa": True},
+        {"nested": {"z": [1, 2.5, None], "a": "x"}, "b": -3},
+        {"quote": 'he said "hi"\\n', "unicode": "päss→✓ 🚀", "control": "\x00\x1f "},
+        {"rows": 10**20, "ratio": 1e-7, "empty": ""},
+    ]
+    fields = [
+        ("2025-01-01T00:00:00Z", "alice", "login", "web", "ok"),
+        ("2025-06-30T23:59:59Z", 'bob "the" admin', "exp\\ort", "rep/ort:Q4\t", "dénied"),
+    ]
+
+    for context in contexts:
+        for ts, actor, action, target, result in fields:
+            for prev_hash in ("GENESIS", "a" * 64):
+                event = {
+                    "ts": ts,
+                    "actor": actor,
+                    "action": action,
+                    "target": target,
+                    "result": result,
+                    "context": context,
+                }
+                expected = hash_event(event, prev_hash)
+                spliced = hash_event_fields(prev_hash, ts, actor, action, target, result, canonical_json(context))
+                assert spliced == expected
@@ -0,0 +1,84 @@
+"""Tests for idempotency keys on appends."""
+
+from __future__ import annotations
+
+import asyncio
+
+from auditlog.aio import AsyncAuditLogger
+from auditlog.metrics import Metrics
+from auditlog.service import AuditLogger
+from auditlog.writer import AsyncAuditWriter
+
+
+def _event(key: str | None = None, **overrides) -> dict:
+    event = {
+        "ts": "2025-01-01T00:00:00Z",
+        "actor": "alice",
+        "action": "login",
+        "target": "web",
+        "result": "ok",
+        "context": {"ip": "10.0.0.1"},
+    }
+    if key is not None:
+        event["idempotency_key"] = key
+    return {**event, **overrides}
+
+
+def test_repeated_key_returns_original_record_without_new_row(tmp_path) -> None:
+    logger = AuditLogger(str(tmp_path / "audit.db"))
+    first = logger.append(**_event("req-1"))
+
+    retry = logger.append(**_event("req-1", result="retried"))
+
+    assert retry == {**first, "duplicate": True}
+    assert len(logger.query()) == 1
+    assert logger.verify_chain() == []
+
+
+def test_key_is_not_part_of_the_hash(tmp_path) -> None:
+    keyed = AuditLogger(str(tmp_path / "keyed.db")).append(**_event("req-1"))
+    plain = AuditLogger(str(tmp_path / "plain.db")).append(**_event())
+
+    assert keyed["event_hash"] == plain["event_hash"]
+
+
+def test_key_survives_reopen_and_cache_eviction(tmp_path) -> None:
+    db_path = str(tmp_path / "audit.db")
+    original = AuditLogger(db_path).append(**_event("req-1"))
+
+    for logger in (AuditLogger(db_path), AuditLogger(db_path, idempotency_cache=0)):
+        assert logger.append(**_event("req-1")) == {**original, "duplicate": True}
+        assert logger.append_many([_event("req-1")]) == [{**original, "duplicate": True}]
+    assert len(AuditLogger(db_path).query()) == 1
+
+
+def test_append_many_collapses_repeated_keys(tmp_path) -> None:
+    logger = AuditLogger(str(tmp_path / "audit.db"), metrics=Metrics())
+    earlier = logger.append(**_event("a"))
+
+    records = logger.append_many(
+        [_event("b"), _event("a"), _event(), _event("b", actor="bob"), _event("c")]
+    )
+
+    assert [record.get("duplicate", False) for record in records] == [False, True, False, True, False]
+    assert records[1] == {**earlier, "duplicate": True}
+    assert records[3] == {**records[0], "duplicate": True}
+    assert [record["id"] for record in records] == [2, 1, 3, 2, 4]
+    assert [event["actor"] for event in logger.iter_events()] == ["alice"] * 4
+    assert logger.verify_chain() == []
+    assert logger.metrics.snapshot()["counters"]["append.duplicates"] == 2
+
+
+def test_async_front_ends_pass_keys_through(tmp_path) -> None:
+    db_path = str(tmp_path / "audit.db")
+    with AsyncAuditWriter(db_path) as writer:
+        futures = [writer.submit(**_event("req-1")) for _ in range(3)]
+        records = [future.result() for future in futures]
+    assert [record.get("duplicate", False) for record in records] == [False, True, True]
+
+    async def retry() -> dict:
+        async with AsyncAuditLogger(db_path) as logger:
+            return await logger.append(**_event("req-1"))
+
+    assert asyncio.run(retry())["id"] == records[0]["id"]
+    assert len(AuditLogger(db_path).query()) == 1
@@ -0,0 +1,114 @@
+"""Tests for bulk import of NDJSON and CSV files."""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import json
+
+import pytest
+
+from auditlog.importer import import_file, import_state_key
+from auditlog.service import AuditLogger
+from auditlog.storage import EVENT_COLUMNS, get_meta
+
+
+def _events(count: int) -> list[dict]:
+    return [
+        {
+            "ts": f"2025-01-01T00:00:{index % 60:02d}Z",
+            "actor": f"user-{index % 3}",
+            "action": "login",
+            "target": "web",
+            "result": "ok",
+            "context": {"seq": index},
+        }
+        for index in range(count)
+    ]
+
+
+def _write_ndjson(path, events: list[dict], *, compress: bool = False) -> None:
+    opener = gzip.open if compress else open
+    with opener(path, "wt", encoding="utf-8") as handle:
+        for event in events:
+            handle.write(json.dumps(event) + "\n")
+
+
+def test_import_gzip_ndjson_chains_onto_existing_head(tmp_path) -> None:
+    logger = AuditLogger(str(tmp_path / "audit.db"))
+    logger.append(actor="admin", action="setup", target="db", result="ok", context={})
+    path = tmp_path / "backlog.ndjson.gz"
+    _write_ndjson(path, _events(25), compress=True)
+    seen: list[int] = []
+
+    report = import_file(logger, str(path), batch_size=10, progress=lambda r: seen.append(r.events))
+
+    assert (report.events, report.first_id, report.last_id, report.complete) == (25, 2, 26, True)
+    assert report.compressed
+    assert seen == [10, 20, 25]
+    assert [json.loads(event["context_json"])["seq"] for event in logger.query(limit=2)] == [24, 23]
+    assert logger.verify_chain() == []
+
+
+def test_import_resumes_after_last_committed_batch(tmp_path) -> None:
+    logger = AuditLogger(str(tmp_path / "audit.db"))
+    path = tmp_path / "backlog.jsonl"
+    _write_ndjson(path, _events(30))
+
+    def crash(report) -> None:
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        import_file(logger, str(path), batch_size=12, progress=crash)
+    state = json.loads(get_meta(logger.conn, import_state_key(str(path))))
+    assert (state["line"], state["events"]) == (12, 12)
+
+    report = import_file(logger, str(path), batch_size=12)
+
+    assert report.resumed_from == state["offset"]
+    assert (report.events, report.first_id, report.last_id) == (18, 13, 30)
+    assert [json.loads(event["context_json"])["seq"] for event in logger.iter_events()] == list(range(30))
+    assert import_file(logger, str(path)).events == 0
+    assert logger.verify_chain() == []
+
+
+def test_import_reads_csv_written_by_export(tmp_path) -> None:
+    source = AuditLogger(str(tmp_path / "source.db"))
+    source.append_many(_events(5))
+    path = tmp_path / "events.csv"
+    with open(path, "w", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(EVENT_COLUMNS)
+        for event in source.iter_events():
+            writer.writerow([event[column] for column in EVENT_COLUMNS])
+
+    target = AuditLogger(str(tmp_path / "target.db"))
+    report = import_file(target, str(path))
+
+    assert report.events == 5
+    assert [event["event_hash"] for event in target.iter_events()] == [
+        event["event_hash"] for event in source.iter_events()
+    ]
+
+
+def test_import_reports_line_of_invalid_record(tmp_path) -> None:
+    logger = AuditLogger(str(tmp_path / "audit.db"))
+    path = tmp_path / "bad.ndjson"
+    path.write_text(json.dumps(_events(1)[0]) + "\n\n" + json.dumps({"actor": "x"}) + "\n", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="line 3: field 'action' must be a string"):
+        import_file(logger, str(path))
+    assert logger.query() == []
+
+
+def test_import_report_ids_cover_only_rows_written(tmp_path) -> None:
+    logger = AuditLogger(str(tmp_path / "audit.db"))
+    logger.append(actor="admin", action="setup", target="db", result="ok", context={}, idempotency_key="k-0")
+    events = [{**event, "idempotency_key": f"k-{index}"} for index, event in enumerate(_events(4))]
+    path = tmp_path / "retry.ndjson"
+    _write_ndjson(path, events)
+
+    report = import_file(logger, str(path), batch_size=2)
+
+    assert (report.events, report.duplicates, report.first_id, report.last_id) == (4, 1, 2, 4)
+    assert logger.verify_chain() == []
@@ -0,0 +1,102 @@
+"""Tests for Merkle block sealing and inclusion proofs."""
+
+from __future__ import annotations
+
+import hashlib
+
+import pytest
+
+from auditlog.merkle import check_proof, inclusion_proof, leaf_hash, merkle_root, root_from_path
+from auditlog.service import AuditLogger
+
+
+def _make_logger_with_events(tmp_path, count: int, **kwargs) -> AuditLogger:
+    logger = AuditLogger(str(tmp_path / "audit.db"), **kwargs)
+    for index in range(count):
+        logger.append(
+            actor=f"user-{index}",
+            action="login",
+            target="web",
+            result="ok",
+            context={"seq": index},
+            ts="2025-01-01T00:00:00Z",
+        )
+    return logger
+
+
+def test_inclusion_proof_leads_to_root_for_every_leaf_and_tree_size() -> None:
+    for size in range(1, 12):
+        leaves = [leaf_hash(hashlib.sha256(str(index).encode()).hexdigest()) for index in range(size)]
+        root = merkle_root(leaves)
+        for index in range(size):
+            assert root_from_path(leaves[index], inclusion_proof(leaves, index)) == root
+
+
+def test_seal_blocks_chains_full_blocks_and_leaves_remainder(tmp_path) -> None:
+    logger = _make_logger_with_events(tmp_path, 7)
+
+    blocks = logger.seal_blocks(block_size=3)
+    remainder = logger.seal_blocks(block_size=3, partial=True)
+
+    assert [(block["first_id"], block["last_id"]) for block in blocks] == [(1, 3), (4, 6)]
+    assert blocks[0]["prev_block_hash"] == "GENESIS"
+    assert blocks[1]["prev_block_hash"] == blocks[0]["block_hash"]
+    assert [(block["first_id"], block["last_id"]) for block in remainder] == [(7, 7)]
+
+
+def test_append_seals_periodically_with_seal_every(tmp_path) -> None:
+    logger = _make_logger_with_events(tmp_path, 5, seal_every=2)
+
+    blocks = logger.conn.execute("SELECT first_id, last_id FROM audit_blocks ORDER BY id").fetchall()
+
+    assert blocks == [(1, 2), (3, 4)]
+
+
+def test_prove_and_check_proof_round_trip(tmp_path) -> None:
+    logger = _make_logger_with_events(tmp_path, 6)
+    logger.seal_blocks(block_size=4, partial=True)
+
+    proof = logger.prove(3)
+
+    assert proof["block"]["id"] == 1
+    assert check_proof(proof) == []
+    assert logger.check_proof(proof) == []
+    assert logger.check_proof(logger.prove(6)) == []
+
+
+def test_check_proof_detects_tampered_event_and_path(tmp_path) -> None:
+    logger = _make_logger_with_events(tmp_path, 4)
+    logger.seal_blocks(block_size=4)
+    proof = logger.prove(2)
+
+    forged_event = {**proof, "event": {**proof["event"], "result": "denied"}}
+    forged_path = {**proof, "path": [{**proof["path"][0], "hash": "00" * 32}] + proof["path"][1:]}
+
+    assert any("event_hash does not match" in issue for issue in check_proof(forged_event))
+    assert any("Merkle path does not lead" in issue for issue in check_proof(forged_path))
+
+
+def test_prove_rejects_unsealed_event(tmp_path) -> None:
+    logger = _make_logger_with_events(tmp_path, 2)
+
+    with pytest.raises(ValueError):
+        logger.prove(1)
+
+
+def test_archived_rows_are_sealed_and_provable(tmp_path) -> None:
+    logger = _make_logger_with_events(tmp_path, 2)
+    logger.seal_blocks(block_size=2)
+    for index in range(2, 9):
+        day = 1 if index < 5 else 2
+        ts = f"2025-01-0{day}T00:00:00Z"
+        logger.append(actor=f"user-{index}", action="login", target="web", result="ok", context={}, ts=ts)
+    # Rows 3-5 are archived before they were sealed.
+    assert logger.archive("2025-01-02T00:00:00Z")["last_id"] == 5
+
+    blocks = logger.seal_blocks(block_size=2)
+
+    assert [(block["first_id"], block["last_id"]) for block in blocks] == [(3, 4), (5, 6), (7, 8)]
+    for event_id in (1, 4, 7):
+        proof = logger.prove(event_id)
+        assert proof["event"]["id"] == event_id
+        assert logger.check_proof(proof) == []
@@ -0,0 +1,64 @@
+"""Tests for opt-in hot-path instrumentation."""
+
+from __future__ import annotations
+
+from auditlog.metrics import Metrics, iter_prometheus, load_snapshot, save_snapshot
+from auditlog.service import AuditLogger
+
+EVENT = {"actor": "alice", "action": "login", "target": "web", "result": "ok", "context": {"ip": "10.0.0.5"}}
+
+
+def test_stats_report_disabled_by_default() -> None:
+    logger = AuditLogger(":memory:")
+    logger.append(**EVENT)
+
+    assert logger.stats() == {"enabled": False, "counters": {}, "histograms": {}}
+
+
+def test_stats_record_every_stage_of_append_query_and_verify() -> None:
+    logger = AuditLogger(":memory:", metrics=Metrics())
+    logger.append(**EVENT)
+    logger.append_many([EVENT, EVENT])
+    logger.query(actor="alice")
+    logger.verify()
+
+    stats = logger.stats()
+    histograms = stats["histograms"]
+    assert stats["counters"] == {"append.events": 3, "query.rows": 3, "verify.rows": 3, "verify.issues": 0}
+    assert histograms["append"]["count"] == 2
+    assert histograms["append.hash"]["count"] == 3
+    assert histograms["append.canonicalize"]["count"] == 3
+    assert histograms["append.insert"]["count"] == 2
+    assert histograms["append.commit"]["count"] == 2
+    assert histograms["append.head_lookup"]["count"] == 2
+    assert histograms["query"]["count"] == 1
+    assert histograms["verify"]["count"] == 1
+    assert histograms["append"]["p50"] is not None
+
+
+def test_prometheus_dump_has_cumulative_buckets() -> None:
+    metrics = Metrics()
+    metrics.observe("append.commit", 0.002)
+    metrics.observe("append.commit", 20.0)
+    metrics.count("append.events", 2)
+
+    lines = list(iter_prometheus(metrics.snapshot()))
+
+    assert "auditlog_append_events_total 2" in lines
+    assert 'auditlog_stage_duration_seconds_bucket{stage="append.commit",le="0.001"} 0' in lines
+    assert 'auditlog_stage_duration_seconds_bucket{stage="append.commit",le="0.0025"} 1' in lines
+    assert 'auditlog_stage_duration_seconds_bucket{stage="append.commit",le="+Inf"} 2' in lines
+    assert 'auditlog_stage_duration_seconds_count{stage="append.commit"} 2' in lines
+
+
+def test_saved_snapshots_accumulate_across_processes(tmp_path) -> None:
+    path = str(tmp_path / "metrics.json")
+    for _ in range(2):
+        metrics = Metrics()
+        metrics.count("append.events")
+        metrics.observe("append", 0.001)
+        save_snapshot(metrics, path)
+
+    snapshot = load_snapshot(path)
+    assert snapshot["counters"] == {"append.events": 2}
+    assert snapshot["histograms"]["append"]["count"] == 2
@@ -0,0 +1,171 @@
+"""Tests for the ingest server, its Unix-socket and HTTP front ends and the thin client."""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from auditlog.client import AuditClient
+from auditlog.server import AuditHTTPServer, AuditServer, IngestService
+from auditlog.service import AuditLogger
+
+EVENT = {"actor": "alice", "action": "login", "target": "web", "result": "ok", "context": {"ip": "10.0.0.5"}}
+
+
+def _serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = IngestService(str(tmp_path / "audit.db"), max_latency=0.01)
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def server(service, tmp_path):
+    server = AuditServer(str(tmp_path / "audit.sock"), service)
+    thread = _serve(server)
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join(timeout=5)
+
+
+@pytest.fixture
+def http_url(service):
+    server = AuditHTTPServer(("127.0.0.1", 0), service)
+    thread = _serve(server)
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    thread.join(timeout=5)
+
+
+def _http(url: str, body: bytes | None = None):
+    request = urllib.request.Request(url, data=body, method="POST" if body is not None else "GET")
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+def test_client_appends_queries_and_verifies_through_socket(server) -> None:
+    with AuditClient(server.socket_path) as client:
+        first = client.append(**EVENT)
+        batch = client.append_many([{**EVENT, "action": "logout"}, EVENT])
+
+        assert first["id"] == 1
+        assert [record["id"] for record in batch] == [2, 3]
+        assert batch[0]["prev_hash"] == first["event_hash"]
+        assert [event["id"] for event in client.query(action="logout")] == [2]
+        report = client.verify()
+        assert report["ok"] and report["rows_scanned"] == 3
+
+
+def test_socket_reports_bad_requests_and_keeps_serving(server) -> None:
+    with AuditClient(server.socket_path) as client:
+        with pytest.raises(RuntimeError, match="field 'actor' must be a string"):
+            client.append(**{**EVENT, "actor": None})
+        with pytest.raises(RuntimeError, match="unsupported query filters"):
+            client.query(bogus=1)
+        assert client.ping()["db"] == server.service.db_path
+
+
+def test_cli_socket_append_never_loads_sqlite(server) -> None:
+    script = (
+        "import sys\n"
+        "from auditlog.cli import app\n"
+        "try:\n"
+        "    app()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print('sqlite3' in sys.modules)\n"
+    )
+    args = ["append", "--socket", server.socket_path, "--actor", "cron", "--action", "backup"]
+    args += ["--target", "db", "--result", "ok", "--context", "{}"]
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    output = subprocess.run(
+        [sys.executable, "-c", script, *args], capture_output=True, text=True, env=env, check=True
+    ).stdout
+
+    assert "Appended event id=1" in output
+    assert output.splitlines()[-1] == "False"
+
+
+def test_second_server_refuses_a_live_socket(server, service) -> None:
+    with pytest.raises(RuntimeError, match="already listening"):
+        AuditServer(server.socket_path, service)
+
+
+def test_http_ingests_single_and_ndjson_batches(http_url) -> None:
+    status, record = _http(http_url + "/events", json.dumps(EVENT).encode())
+    assert status == 200 and record["id"] == 1
+
+    ndjson = "\n".join(json.dumps({**EVENT, "context": {"seq": index}}) for index in range(5)).encode()
+    status, records = _http(http_url + "/events", ndjson)
+    assert status == 200
+    assert [item["id"] for item in records] == [2, 3, 4, 5, 6]
+
+    status, events = _http(http_url + "/query?actor=alice&limit=2")
+    assert [event["id"] for event in events] == [6, 5]
+    status, report = _http(http_url + "/verify")
+    assert report["ok"] and report["rows_scanned"] == 6
+    status, stats = _http(http_url + "/stats")
+    assert stats["events_ingested"] == 6 and stats["queue_depth"] == 0
+
+
+def test_http_rejects_invalid_events(http_url) -> None:
+    status, body = _http(http_url + "/events", b'{"actor": "alice"}')
+    assert status == 400 and "action" in body["error"]
+    status, body = _http(http_url + "/query?limit=abc")
+    assert status == 400
+    status, _ = _http(http_url + "/nowhere")
+    assert status == 404
+
+
+def test_http_rejects_negative_content_length(http_url) -> None:
+    host, port = http_url.removeprefix("http://").split(":")
+    with socket.create_connection((host, int(port)), timeout=5) as conn:
+        conn.sendall(b"POST /events HTTP/1.1\r\nHost: x\r\nContent-Length: -1\r\n\r\n")
+        assert conn.recv(4096).startswith(b"HTTP/1.1 400")
+
+
+def test_verify_caps_client_requested_workers(tmp_path, monkeypatch) -> None:
+    service = IngestService(str(tmp_path / "audit.db"), max_verify_workers=2)
+    report = AuditLogger(":memory:").verify()
+    requested = []
+    monkeypatch.setattr(service.reader, "verify", lambda **options: requested.append(options) or report)
+    try:
+        for workers in (10_000, -3):
+            assert service.verify({"workers": workers})["ok"]
+        with pytest.raises(ValueError):
+            service.verify({"workers": "8"})
+    finally:
+        service.close()
+
+    assert [options["workers"] for options in requested] == [2, 1]
+
+
+def test_concurrent_requests_are_group_committed(service) -> None:
+    threads = [threading.Thread(target=service.append, args=({**EVENT, "context": {"n": n}},)) for n in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert service.writer.committed == 40
+    assert service.writer.batches < 40
+    assert service.verify()["ok"]
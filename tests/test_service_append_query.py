@@ -2,7 +2,13 @@
 
 from __future__ import annotations
 
+import json
+
+import pytest
+
+from auditlog.events import AuditEvent
 from auditlog.service import AuditLogger
+from auditlog.storage import get_meta
 
 
 def _make_logger(tmp_path) -> AuditLogger:
@@ -86,3 +92,175 @@ def test_query_limit_respected(tmp_path) -> None:
 
     assert len(events) == 2
     assert [event["id"] for event in events] == [3, 2]
+
+
+def test_append_many_matches_sequential_append_chain(tmp_path) -> None:
+    events = [
+        {
+            "actor": f"user-{index}",
+            "action": "login",
+            "target": "web",
+            "result": "ok",
+            "context": {"seq": index},
+            "ts": f"2025-01-01T00:00:0{index}Z",
+        }
+        for index in range(3)
+    ]
+    sequential = AuditLogger(str(tmp_path / "sequential.db"))
+    expected = [sequential.append(**event) for event in events]
+
+    batched = AuditLogger(str(tmp_path / "batched.db"))
+    records = batched.append_many(events)
+
+    assert records == expected
+    assert [record["id"] for record in records] == [1, 2, 3]
+    assert batched.verify_chain() == []
+
+
+def test_append_many_continues_existing_chain(tmp_path) -> None:
+    logger = _make_logger(tmp_path)
+    first = _append_event(logger, actor="alice", action="login", target="web", ts="2025-01-01T00:00:00Z")
+
+    records = logger.append_many(
+        [{"actor": "bob", "action": "export", "target": "report", "result": "ok", "context": {}}]
+    )
+
+    assert records[0]["id"] == 2
+    assert records[0]["prev_hash"] == first["event_hash"]
+    assert logger.verify_chain() == []
+
+
+def test_append_reloads_cached_head_after_another_connection_appends(tmp_path) -> None:
+    db_path = str(tmp_path / "audit.db")
+    writer_a = AuditLogger(db_path)
+    writer_b = AuditLogger(db_path)
+
+    _append_event(writer_a, actor="alice", action="login", target="web", ts="2025-01-01T00:00:00Z")
+    from_b = _append_event(writer_b, actor="bob", action="login", target="web", ts="2025-01-01T00:00:01Z")
+    from_a = _append_event(writer_a, actor="alice", action="logout", target="web", ts="2025-01-01T00:00:02Z")
+
+    assert from_a["prev_hash"] == from_b["event_hash"]
+    assert writer_a.verify_chain() == []
+
+
+def test_append_uses_cached_head_without_querying_events(tmp_path) -> None:
+    logger = _make_logger(tmp_path)
+    _append_event(logger, actor="alice", action="login", target="web", ts="2025-01-01T00:00:00Z")
+
+    statements: list[str] = []
+    logger.conn.set_trace_callback(statements.append)
+    _append_event(logger, actor="alice", action="logout", target="web", ts="2025-01-01T00:00:01Z")
+    logger.conn.set_trace_callback(None)
+
+    assert not any(statement.lstrip().startswith("SELECT") for statement in statements)
+    assert logger._chain_head() == (2, logger.query(limit=1)[0]["event_hash"])
+
+
+def test_iter_events_pages_with_keyset_cursors_and_ts_range(tmp_path) -> None:
+    logger = _make_logger(tmp_path)
+    for second in range(5):
+        _append_event(logger, actor="alice", action="login", target="web", ts=f"2025-01-01T00:00:0{second}Z")
+
+    ascending = [event["id"] for event in logger.iter_events(chunk_size=2)]
+    descending = [event["id"] for event in logger.iter_events(descending=True, chunk_size=2)]
+    bounded = [event["id"] for event in logger.iter_events(after_id=1, before_id=5, chunk_size=2)]
+    ranged = [
+        event["id"]
+        for event in logger.iter_events(since="2025-01-01T00:00:01Z", until="2025-01-01T00:00:03Z", chunk_size=1)
+    ]
+
+    assert ascending == [1, 2, 3, 4, 5]
+    assert descending == [5, 4, 3, 2, 1]
+    assert bounded == [2, 3, 4]
+    assert ranged == [2, 3]
+
+
+def test_connection_profile_enables_wal_and_is_recorded(tmp_path) -> None:
+    logger = AuditLogger(str(tmp_path / "audit.db"), profile="balanced", pragmas={"cache_size": -2000})
+
+    settings = json.loads(get_meta(logger.conn, "connection_settings"))
+
+    assert logger.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert settings["profile"] == "balanced"
+    assert settings["pragmas"]["cache_size"] == -2000
+
+
+def test_query_where_filters_context_fields_with_and_without_index(tmp_path) -> None:
+    logger = AuditLogger(str(tmp_path / "audit.db"))
+    for ip, rows in (("10.0.0.5", 10), ("10.0.0.6", 5000), ("10.0.0.5", 2000)):
+        logger.append(actor="svc", action="export", target="db", result="ok", context={"ip": ip, "rows": rows})
+
+    def ids(*where: str) -> list[int]:
+        return [event["id"] for event in logger.query(where=where)]
+
+    assert ids("context.ip=10.0.0.5") == [3, 1]
+    assert ids("context.ip=10.0.0.5", "context.rows>1000") == [3]
+    assert ids("context.rows>=5000") == [2]
+    assert ids("context.missing=1") == []
+    assert "SCAN" in " ".join(logger.explain_query(where=["context.ip=10.0.0.5"]))
+
+    logger.index_context_key("ip")
+
+    assert logger.context_indexes() == ["ip"]
+    assert "idx_audit_events_ctx_ip" in " ".join(logger.explain_query(where=["context.ip=10.0.0.5"]))
+    assert ids("context.ip=10.0.0.5") == [3, 1]
+    assert [event["id"] for event in logger.iter_events(where=["context.ip!=10.0.0.5"])] == [2]
+
+
+def test_context_indexes_for_similar_keys_do_not_collide(tmp_path) -> None:
+    logger = AuditLogger(str(tmp_path / "audit.db"))
+    logger.append(actor="svc", action="export", target="db", result="ok", context={"a__b": 1, "a": {"b": 2}})
+
+    names = {logger.index_context_key("a__b"), logger.index_context_key("a.b")}
+    assert len(names) == 2
+    assert logger.drop_context_index("a__b")
+    assert logger.context_indexes() == ["a.b"]
+    assert "idx_audit_events_ctx_a__b" in " ".join(logger.explain_query(where=["context.a.b=2"]))
+
+
+def test_context_index_rejects_name_held_by_another_key(tmp_path) -> None:
+    logger = AuditLogger(str(tmp_path / "audit.db"))
+    # An index left by the old naming scheme for key a__b.
+    logger.conn.execute(
+        "CREATE INDEX idx_audit_events_ctx_a__b ON audit_events (json_extract(context_json, '$.a__b'), id)"
+    )
+
+    with pytest.raises(ValueError, match="different context key"):
+        logger.index_context_key("a.b")
+
+
+def test_query_where_null_tests_for_null_or_missing_keys(tmp_path) -> None:
+    logger = AuditLogger(str(tmp_path / "audit.db"))
+    for context in ({"x": None}, {"x": 1}, {}):
+        logger.append(actor="svc", action="export", target="db", result="ok", context=context)
+
+    assert [event["id"] for event in logger.query(where=["context.x=null"])] == [3, 1]
+    assert [event["id"] for event in logger.query(where=["context.x!=null"])] == [2]
+    with pytest.raises(ValueError, match="null"):
+        logger.query(where=["context.x>null"])
+
+
+def test_query_where_rejects_malformed_filters() -> None:
+    logger = AuditLogger(":memory:")
+
+    with pytest.raises(ValueError):
+        logger.query(where=["ip=10.0.0.5"])
+    with pytest.raises(ValueError):
+        logger.query(where=["context.ip;drop=1"])
+
+
+def test_query_returns_records_with_dict_style_access(tmp_path) -> None:
+    logger = _make_logger(tmp_path)
+    logger.append(actor="alice", action="login", target="web", result="ok", context={"ip": "10.0.0.5"})
+
+    event = logger.query(as_dict=False)[0]
+
+    assert isinstance(logger.query()[0], dict)
+    assert isinstance(event, AuditEvent)
+    assert event.actor == event["actor"] == event.get("actor") == "alice"
+    assert event.context == {"ip": "10.0.0.5"}
+    assert event.get("missing") is None
+    with pytest.raises(KeyError):
+        event["missing"]
+    assert dict(event) == event.as_dict() == logger.query()[0]
+    assert list(logger.iter_events()) == [event.as_dict()]
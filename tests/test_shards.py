@@ -0,0 +1,93 @@
+"""Tests for partitioned audit logs."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from auditlog import shards
+from auditlog.metrics import Metrics
+from auditlog.shards import ShardedAuditLogger
+
+
+def _event(actor: str, ts: str, **extra) -> dict:
+    return {"actor": actor, "action": "login", "target": "web", "result": "ok", "context": {}, "ts": ts, **extra}
+
+
+def test_tenant_shards_keep_independent_chains(tmp_path) -> None:
+    logs = ShardedAuditLogger(str(tmp_path / "logs"))
+
+    records = logs.append_many(
+        [
+            _event("alice", "2025-01-01T00:00:00Z", shard="acme"),
+            _event("bob", "2025-01-01T00:00:01Z", shard="globex"),
+            _event("carol", "2025-01-01T00:00:02Z", shard="acme"),
+        ]
+    )
+
+    assert [(record["shard"], record["id"]) for record in records] == [("acme", 1), ("globex", 1), ("acme", 2)]
+    assert records[2]["prev_hash"] == records[0]["event_hash"]
+    assert logs.shard_names() == ["acme", "globex"]
+    assert logs.verify_chain() == []
+    with pytest.raises(ValueError):
+        logs.append(actor="x", action="y", target="z", result="ok", context={})
+
+
+def test_time_partition_routes_by_ts_and_query_fans_out(tmp_path) -> None:
+    logs = ShardedAuditLogger(str(tmp_path / "logs"), partition="month")
+    logs.append(**_event("alice", "2025-01-31T23:59:59Z"))
+    logs.append(**_event("bob", "2025-02-01T00:00:00Z"))
+    logs.append(**_event("alice", "2025-02-02T00:00:00Z"))
+
+    events = logs.query(actor="alice")
+
+    assert logs.shard_names() == ["2025-01", "2025-02"]
+    assert [(event["shard"], event["ts"]) for event in events] == [
+        ("2025-02", "2025-02-02T00:00:00Z"),
+        ("2025-01", "2025-01-31T23:59:59Z"),
+    ]
+
+
+def test_manifest_chains_shard_heads_and_detects_rewrites(tmp_path) -> None:
+    logs = ShardedAuditLogger(str(tmp_path / "logs"))
+    logs.append(**_event("alice", "2025-01-01T00:00:00Z"), shard="acme")
+    first = logs.seal_manifest()
+    logs.append(**_event("bob", "2025-01-01T00:00:01Z"), shard="globex")
+    second = logs.seal_manifest()
+
+    assert second["heads"]["acme"] == first["heads"]["acme"]
+    assert logs.check_manifest() == []
+
+    acme, _ = logs._shard("acme")
+    acme.conn.execute("UPDATE audit_events SET event_hash = ? WHERE id = 1", ("forged",))
+    acme.conn.commit()
+
+    issues = logs.verify_chain()
+    assert any("manifest entry 1: shard acme row 1 no longer matches" in issue for issue in issues)
+    assert any(issue.startswith("shard acme: row 1: event_hash mismatch") for issue in issues)
+
+
+def test_reopening_with_a_different_partition_is_rejected(tmp_path) -> None:
+    ShardedAuditLogger(str(tmp_path / "logs"), partition="day")
+
+    assert ShardedAuditLogger(str(tmp_path / "logs")).partition == "day"
+    with pytest.raises(ValueError):
+        ShardedAuditLogger(str(tmp_path / "logs"), partition="tenant")
+
+
+def test_verify_opens_shards_with_the_logger_settings(tmp_path, monkeypatch) -> None:
+    logs = ShardedAuditLogger(str(tmp_path / "logs"), checkpoint_key=b"secret", profile="fast", metrics=Metrics())
+    logs.append(shard="acme", **_event("alice", "2025-01-01T00:00:00Z"))
+    seen = []
+    real_verify_shard = shards._verify_shard
+
+    def recording_verify_shard(db_path, **kwargs):
+        seen.append(kwargs)
+        return real_verify_shard(db_path, **kwargs)
+
+    monkeypatch.setattr(shards, "_verify_shard", recording_verify_shard)
+    monkeypatch.setattr(shards, "ProcessPoolExecutor", ThreadPoolExecutor)
+
+    assert logs.verify()["acme"].ok
+    assert seen == [{"checkpoint_key": b"secret", "profile": "fast"}]
@@ -2,7 +2,20 @@
 
 from __future__ import annotations
 
-from auditlog.storage import connect, get_last_hash, init_db, insert_event
+import pytest
+
+from auditlog.storage import (
+    CREATE_SEGMENTS_SQL,
+    SCHEMA_VERSION,
+    connect,
+    explain_query,
+    get_last_hash,
+    init_db,
+    insert_event,
+    insert_events,
+    iter_rows,
+    resolve_pragmas,
+)
 
 
 def test_init_db_creates_schema(tmp_path) -> None:
@@ -65,3 +78,95 @@ def test_insert_event_stores_values_and_increments_ids(tmp_path) -> None:
         (1, "2025-01-01T00:00:00Z", "alice", "login", "web", "ok", '{"ip":"127.0.0.1"}', "GENESIS", "hash-1"),
         (2, "2025-01-01T00:00:01Z", "bob", "query", "db", "ok", '{"sql":"select 1"}', "hash-1", "hash-2"),
     ]
+
+
+def test_insert_events_returns_first_id_of_contiguous_batch(tmp_path) -> None:
+    conn = connect(str(tmp_path / "audit.db"))
+    init_db(conn)
+
+    first_id = insert_events(
+        conn,
+        [
+            ("2025-01-01T00:00:00Z", "alice", "login", "web", "ok", "{}", "GENESIS", "hash-1"),
+            ("2025-01-01T00:00:01Z", "bob", "query", "db", "ok", "{}", "hash-1", "hash-2"),
+        ],
+    )
+
+    assert first_id == 1
+    assert get_last_hash(conn) == "hash-2"
+    assert conn.execute("SELECT COUNT(*) FROM audit_events").fetchone()[0] == 2
+
+
+def test_iter_rows_pages_through_table_by_id(tmp_path) -> None:
+    conn = connect(str(tmp_path / "audit.db"))
+    init_db(conn)
+    insert_events(
+        conn,
+        [("2025-01-01T00:00:00Z", "alice", "login", "web", "ok", "{}", "GENESIS", f"hash-{i}") for i in range(5)],
+    )
+
+    assert [row[0] for row in iter_rows(conn, chunk_size=2)] == [1, 2, 3, 4, 5]
+    assert [row[0] for row in iter_rows(conn, after_id=1, last_id=4, chunk_size=2)] == [2, 3, 4]
+
+
+def test_init_db_creates_query_indexes(tmp_path) -> None:
+    conn = connect(str(tmp_path / "audit.db"))
+    init_db(conn)
+
+    names = {
+        row[0]
+        for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='audit_events'")
+    }
+
+    assert {"idx_audit_events_actor_id", "idx_audit_events_action_id", "idx_audit_events_ts"} <= names
+
+
+def test_init_db_skips_schema_work_once_stamped(tmp_path) -> None:
+    path = str(tmp_path / "audit.db")
+    init_db(connect(path))
+
+    conn = connect(path)
+    init_db(conn)
+
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    assert conn.total_changes == 0
+    assert not conn.in_transaction
+
+
+def test_init_db_adds_segment_ts_bounds_to_older_databases(tmp_path) -> None:
+    path = str(tmp_path / "audit.db")
+    conn = connect(path)
+    conn.execute(CREATE_SEGMENTS_SQL.replace(",\n    min_ts TEXT,\n    max_ts TEXT", ""))
+    conn.execute("PRAGMA user_version = 2")
+    conn.commit()
+
+    init_db(conn)
+
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(audit_segments)")]
+    assert columns[-2:] == ["min_ts", "max_ts"]
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
+
+def test_explain_query_uses_index_for_filters(tmp_path) -> None:
+    conn = connect(str(tmp_path / "audit.db"))
+    init_db(conn)
+
+    actor_plan = " ".join(explain_query(conn, actor="alice"))
+    action_plan = " ".join(explain_query(conn, action="login"))
+
+    assert "idx_audit_events_actor_id" in actor_plan
+    assert "idx_audit_events_action_id" in action_plan
+    assert "TEMP B-TREE" not in actor_plan
+
+
+def test_resolve_pragmas_merges_profile_and_rejects_unknown_names() -> None:
+    resolved = resolve_pragmas("balanced", {"synchronous": "FULL"})
+
+    assert resolved["journal_mode"] == "WAL"
+    assert resolved["synchronous"] == "FULL"
+    with pytest.raises(ValueError):
+        resolve_pragmas("turbo")
+    with pytest.raises(ValueError):
+        resolve_pragmas(None, {"journal_mode": "WAL; DROP TABLE audit_events"})
+    with pytest.raises(ValueError):
+        resolve_pragmas(None, {"foreign_keys": "ON"})
@@ -87,3 +87,98 @@ def test_verify_chain_tamper_middle_record_flags_at_least_that_record(tmp_path)
 
     assert issues
     assert any("row 2: event_hash mismatch" in issue for issue in issues)
+
+
+def test_verify_since_checkpoint_only_checks_new_rows(tmp_path) -> None:
+    logger = _make_logger_with_three_events(tmp_path)
+    first_report = logger.verify()
+    checkpoint_id = logger.record_checkpoint(first_report)
+
+    logger.append(
+        actor="dave",
+        action="login",
+        target="web",
+        result="ok",
+        context={},
+        ts="2025-01-01T00:00:03Z",
+    )
+    # Rows before the checkpoint anchor are trusted in incremental mode.
+    logger.conn.execute("UPDATE audit_events SET result = ? WHERE id = 2", ("tampered",))
+    logger.conn.commit()
+
+    report = logger.verify(since_checkpoint=True)
+
+    assert checkpoint_id == 1
+    assert report.ok
+    assert report.checkpoint_id == checkpoint_id
+    assert report.last_id == 4
+    assert any("row 2: event_hash mismatch" in issue for issue in logger.verify_chain())
+
+
+def test_verify_since_checkpoint_detects_changed_anchor_row(tmp_path) -> None:
+    logger = _make_logger_with_three_events(tmp_path)
+    logger.record_checkpoint(logger.verify())
+
+    logger.conn.execute("UPDATE audit_events SET event_hash = ? WHERE id = 3", ("forged-event-hash",))
+    logger.conn.commit()
+
+    issues = logger.verify_chain(since_checkpoint=True)
+
+    assert any("checkpoint 1: row 3 event_hash changed since checkpoint" in issue for issue in issues)
+    assert any("row 3: event_hash mismatch" in issue for issue in issues)
+
+
+def test_verify_since_checkpoint_detects_forged_checkpoint(tmp_path) -> None:
+    logger = _make_logger_with_three_events(tmp_path)
+    logger.record_checkpoint(logger.verify())
+
+    logger.conn.execute("UPDATE audit_checkpoints SET event_id = 2 WHERE id = 1")
+    logger.conn.commit()
+
+    issues = logger.verify_chain(since_checkpoint=True)
+
+    assert issues == ["checkpoint 1: checkpoint_hash mismatch"]
+
+
+def test_parallel_verify_matches_serial_issue_list(tmp_path) -> None:
+    logger = AuditLogger(str(tmp_path / "audit.db"))
+    logger.append_many(
+        [
+            {
+                "actor": f"user-{index}",
+                "action": "login",
+                "target": "web",
+                "result": "ok",
+                "context": {"seq": index},
+                "ts": "2025-01-01T00:00:00Z",
+            }
+            for index in range(40)
+        ]
+    )
+    logger.conn.execute("UPDATE audit_events SET result = ? WHERE id = 9", ("tampered",))
+    logger.conn.execute("UPDATE audit_events SET context_json = ? WHERE id = 17", ("{not json",))
+    logger.conn.execute("UPDATE audit_events SET prev_hash = ? WHERE id = 25", ("forged-prev-hash",))
+    logger.conn.commit()
+
+    serial = logger.verify()
+    parallel = logger.verify(workers=3)
+
+    assert serial.issues
+    assert parallel.issues == serial.issues
+    assert (parallel.last_id, parallel.last_hash) == (serial.last_id, serial.last_hash)
+
+
+def test_verify_streams_in_chunks_and_stops_at_max_issues(tmp_path) -> None:
+    logger = _make_logger_with_three_events(tmp_path)
+    logger.conn.execute("UPDATE audit_events SET result = ?", ("tampered",))
+    logger.conn.commit()
+
+    full = logger.verify()
+    limited = logger.verify(max_issues=2)
+
+    assert full.rows_scanned == 3
+    assert len(full.issues) == 3
+    assert not full.truncated
+    assert limited.issues == full.issues[:2]
+    assert limited.truncated
+    assert limited.rows_scanned == 2
@@ -0,0 +1,131 @@
+"""Tests for the background group-commit writer."""
+
+from __future__ import annotations
+
+import queue
+import threading
+
+import pytest
+
+from auditlog.service import AuditLogger
+from auditlog.writer import AsyncAuditWriter
+
+
+def _submit(writer: AsyncAuditWriter, index: int):
+    return writer.submit(
+        actor=f"user-{index}",
+        action="login",
+        target="web",
+        result="ok",
+        context={"seq": index},
+    )
+
+
+def test_writer_group_commits_in_submission_order(tmp_path) -> None:
+    db_path = str(tmp_path / "audit.db")
+
+    with AsyncAuditWriter(db_path, batch_size=16, max_latency=0.5) as writer:
+        futures = [_submit(writer, index) for index in range(50)]
+        writer.flush()
+        records = [future.result(timeout=5) for future in futures]
+        batches = writer.batches
+
+    logger = AuditLogger(db_path)
+    assert [record["id"] for record in records] == list(range(1, 51))
+    assert [event["actor"] for event in logger.iter_events()] == [f"user-{index}" for index in range(50)]
+    assert batches < 50
+    assert logger.verify_chain() == []
+
+
+def test_writer_close_commits_pending_events(tmp_path) -> None:
+    db_path = str(tmp_path / "audit.db")
+    writer = AsyncAuditWriter(db_path, max_latency=10)
+    futures = [_submit(writer, index) for index in range(3)]
+
+    writer.close()
+
+    assert all(future.done() for future in futures)
+    assert len(AuditLogger(db_path).query()) == 3
+    with pytest.raises(RuntimeError):
+        _submit(writer, 3)
+
+
+def test_writer_raises_when_queue_full_with_raise_policy(tmp_path) -> None:
+    writer = AsyncAuditWriter(str(tmp_path / "audit.db"), max_queue=1, on_full="raise")
+    blocker = threading.Event()
+    original_commit = writer._commit
+
+    def slow_commit(logger, batch):
+        blocker.wait(timeout=5)
+        original_commit(logger, batch)
+
+    writer._commit = slow_commit
+    try:
+        _submit(writer, 0)
+        with pytest.raises(queue.Full):
+            for index in range(1, 10):
+                _submit(writer, index)
+    finally:
+        blocker.set()
+        writer.close()
+
+
+def test_writer_skips_cancelled_events_and_keeps_running(tmp_path) -> None:
+    db_path = str(tmp_path / "audit.db")
+
+    with AsyncAuditWriter(db_path, batch_size=100, max_latency=0.5) as writer:
+        cancelled = _submit(writer, 0)
+        assert cancelled.cancel()
+        kept = _submit(writer, 1)
+        writer.flush(timeout=5)
+        later = _submit(writer, 2)
+
+        assert later.result(timeout=5)["id"] == 2
+        assert kept.result(timeout=5)["id"] == 1
+        assert writer._thread.is_alive()
+
+    assert [event["actor"] for event in AuditLogger(db_path).iter_events()] == ["user-1", "user-2"]
+
+
+def test_writer_rejects_bad_event_at_submit_and_isolates_batch_failures(tmp_path) -> None:
+    db_path = str(tmp_path / "audit.db")
+
+    with AsyncAuditWriter(db_path, batch_size=100, max_latency=0.5) as writer:
+        with pytest.raises(ValueError, match="context"):
+            writer.submit(actor="a", action="b", target="c", result="ok", context={"x": object()})
+        before = _submit(writer, 0)
+        context = {"seq": 1}
+        mutated = writer.submit(actor="user-1", action="login", target="web", result="ok", context=context)
+        # Mutating the context after submit slips past validation and fails in the batch.
+        context["bad"] = object()
+        after = _submit(writer, 2)
+        writer.flush(timeout=5)
+
+        with pytest.raises(TypeError):
+            mutated.result(timeout=5)
+        assert [before.result()["id"], after.result()["id"]] == [1, 2]
+
+    assert [event["actor"] for event in AuditLogger(db_path).iter_events()] == ["user-0", "user-2"]
+
+
+def test_writer_submits_racing_close_either_commit_or_fail(tmp_path) -> None:
+    writer = AsyncAuditWriter(str(tmp_path / "audit.db"), max_latency=0.001)
+    futures = []
+    errors = []
+
+    def submit_many() -> None:
+        for index in range(200):
+            try:
+                futures.append(_submit(writer, index))
+            except RuntimeError:
+                errors.append(index)
+
+    threads = [threading.Thread(target=submit_many) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    writer.close()
+    for thread in threads:
+        thread.join()
+
+    assert len(futures) + len(errors) == 800
+    assert all(future.result(timeout=5)["id"] > 0 for future in futures)